@@ -0,0 +1,107 @@
+"""Compare the codecs of the data cache on typical ffcsv payloads.
+
+By default, the payloads are the tablefile responses recorded in the test cassettes.
+Alternatively, pass paths of CSV files:
+
+    uv run python benchmarks/cache_codecs.py [data.csv ...]
+
+For every codec and level, the CSV payloads are written to the cache and read back
+(`cache.cache_data` and `cache.read_from_cache`). Codecs whose optional dependency is
+missing are skipped.
+"""
+
+import io
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+import yaml
+from tabulate import tabulate
+
+from pystatis import cache, codec
+
+CASSETTES = Path(__file__).parents[1] / "tests" / "cassettes"
+CANDIDATES = [
+    ("deflate", 9),
+    ("deflate", 6),
+    ("deflate", 1),
+    ("zstd", 3),
+    ("zstd", 9),
+    ("lz4", 0),
+    ("none", None),
+]
+REPEAT = 3
+
+
+def load_cassette_payloads() -> list[bytes]:
+    """Extract the CSV files of the zipped tablefile responses in the test cassettes."""
+    payloads = []
+    for cassette in sorted(CASSETTES.glob("*.yaml")):
+        for interaction in yaml.safe_load(cassette.read_text(encoding="utf-8"))["interactions"]:
+            body = interaction["response"]["body"].get("string")
+            if isinstance(body, bytes) and body.startswith(b"PK"):
+                with zipfile.ZipFile(io.BytesIO(body)) as zip_:
+                    payloads.append(zip_.read(zip_.filelist[0].filename))
+
+    return payloads
+
+
+def benchmark(payloads: list[bytes], name: str, level: int | None) -> list[object] | None:
+    """Write and read all payloads with a codec, return a row of the result table."""
+    try:
+        codec_ = codec.get_codec(name, level)
+        with codec_.writer(io.BytesIO(), "probe.csv"):
+            pass
+    except ImportError:
+        return None
+
+    write_time = read_time = 0.0
+    with (
+        tempfile.TemporaryDirectory() as cache_dir,
+        mock.patch.object(cache, "get_codec", return_value=codec_),
+    ):
+        for _ in range(REPEAT):
+            for i, payload in enumerate(payloads):
+                params = {"name": f"payload-{i}"}
+
+                started = time.perf_counter()
+                cache.cache_data(cache_dir, f"payload-{i}", params, payload, "csv")
+                write_time += time.perf_counter() - started
+
+                started = time.perf_counter()
+                assert cache.read_from_cache(cache_dir, f"payload-{i}", params) == payload
+                read_time += time.perf_counter() - started
+
+        size = sum(path.stat().st_size for path in Path(cache_dir).glob(f"*/*/*{codec_.suffix}"))
+
+    raw_size = sum(len(payload) for payload in payloads)
+
+    return [
+        name,
+        "default" if level is None else level,
+        f"{write_time / REPEAT * 1000:.1f}",
+        f"{read_time / REPEAT * 1000:.1f}",
+        f"{raw_size / size:.2f}",
+    ]
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        payloads = [Path(path).read_bytes() for path in sys.argv[1:]]
+    else:
+        payloads = load_cassette_payloads()
+
+    print(
+        f"{len(payloads)} payloads, {sum(len(payload) for payload in payloads) / 1e6:.1f} MB,"
+        f" mean of {REPEAT} runs"
+    )
+
+    rows = [row for name, level in CANDIDATES if (row := benchmark(payloads, name, level))]
+    print(tabulate(rows, headers=["codec", "level", "write [ms]", "read [ms]", "ratio"]))
+
+
+if __name__ == "__main__":
+    main()
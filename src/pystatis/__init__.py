@@ -9,6 +9,7 @@ print("Version:", pystatis.__version__)
 ```
 """
 
+from pystatis.bulk import check_updates, fetch_tables
 from pystatis.cache import clear_cache
 from pystatis.config import setup_credentials
 from pystatis.find import Find
@@ -18,7 +19,9 @@ from pystatis.table import Table
 __version__ = "0.5.5"
 
 __all__ = [
+    "check_updates",
     "clear_cache",
+    "fetch_tables",
     "Find",
     "logincheck",
     "setup_credentials",
@@ -0,0 +1,189 @@
+"""Module provides functions to download many tables or check them for updates concurrently."""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Iterable
+
+from pystatis import config, db, http_helper, manifest, throttle
+from pystatis.table import Table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8
+# format of the "Updated" field of the metadata, e.g. "28.12.2022 09:26:09h"
+UPDATED_FORMAT = "%d.%m.%Y %H:%M:%Sh"
+# formats of the `since` argument of `check_updates`, the same as of the `stand` param
+SINCE_FORMATS = ("%d.%m.%Y %H:%M", "%d.%m.%Y")
+
+
+def fetch_tables(
+    names: Iterable[str], workers: int = DEFAULT_WORKERS, **get_data_kwargs: Any
+) -> dict[str, Table | Exception]:
+    """Download, cache and parse many tables in parallel.
+
+    Tables are fetched by a bounded thread pool. On top of the number of workers, the number
+    of tables fetched at the same time from one database is limited, because GENESIS, Zensus
+    and Regionalstatistik each restrict the number of parallel requests per user. The limit
+    starts at the `max_parallel_tables` setting and adapts to the observed latency and errors
+    of the database up to `max_parallel_tables_limit`, see `throttle.AdaptiveLimit`.
+
+    Basic usage:
+
+    ```python
+    import pystatis
+
+    results = pystatis.fetch_tables(["12211-0001", "1000A-0000"], workers=4, language="en")
+    ```
+
+    Args:
+        names (Iterable[str]): The unique identifiers of the tables to fetch.
+        workers (int, optional): Maximum number of worker threads. Defaults to 8.
+        **get_data_kwargs: Keyword arguments passed on to `Table.get_data`.
+
+    Returns:
+        dict[str, Table | Exception]: For every table name either the `Table` with its data
+            and metadata or the exception raised while fetching it.
+    """
+    if workers < 1:
+        raise ValueError(f"workers has to be a positive integer, got {workers}.")
+
+    unique_names = list(dict.fromkeys(names))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pystatis") as executor:
+        futures = {
+            name: executor.submit(_fetch_table, name, get_data_kwargs) for name in unique_names
+        }
+
+    results: dict[str, Table | Exception] = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to fetch table %s: %s", name, e)
+            results[name] = e
+
+    return results
+
+
+def check_updates(
+    names: Iterable[str],
+    since: datetime | date | str | None = None,
+    workers: int = DEFAULT_WORKERS,
+) -> dict[str, bool | Exception]:
+    """Check which tables were updated in GENESIS-Online without downloading them.
+
+    Only the metadata of every table is requested, in parallel and bypassing the response
+    cache (see `response_cache`), and its "Updated" time is compared with `since`. Without
+    `since`, a table counts as updated if it is newer than any of its cached versions or
+    if it is not cached at all. A cached version is as recent as the time it was downloaded
+    or last revalidated, see `http_helper.revalidate`.
+
+    Basic usage:
+
+    ```python
+    import pystatis
+
+    updates = pystatis.check_updates(["12211-0001", "1000A-0000"], since="01.01.2024")
+    updated = [name for name, is_updated in updates.items() if is_updated is True]
+    ```
+
+    Args:
+        names (Iterable[str]): The unique identifiers of the tables to check.
+        since (datetime | date | str, optional): Report tables updated after this time,
+            e.g. "24.12.2001 19:15" or "24.12.2001". GENESIS-Online reports German time.
+            Defaults to the time the tables were cached.
+        workers (int, optional): Maximum number of worker threads. Defaults to 8.
+
+    Returns:
+        dict[str, bool | Exception]: For every table name either whether it was updated
+            or the exception raised while checking it.
+    """
+    if workers < 1:
+        raise ValueError(f"workers has to be a positive integer, got {workers}.")
+
+    since_ = _parse_since(since)
+    unique_names = list(dict.fromkeys(names))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pystatis") as executor:
+        futures = {name: executor.submit(_check_update, name, since_) for name in unique_names}
+
+    results: dict[str, bool | Exception] = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error("Failed to check table %s for updates: %s", name, e)
+            results[name] = e
+
+    return results
+
+
+def _fetch_table(name: str, get_data_kwargs: dict[str, Any]) -> Table:
+    """Fetch a single table while holding a slot of its database."""
+    db_name = db.select_db_by_credentials(db.identify_db_matches(name))
+
+    with throttle.get_adaptive_limit(db_name).slot():
+        table = Table(name=name)
+        table.get_data(**get_data_kwargs)
+
+    return table
+
+
+def _check_update(name: str, since: datetime | None) -> bool:
+    """Check if a table was updated after `since` or after it was cached."""
+    updated = _get_last_update(name)
+
+    if since is None:
+        cached = _get_cache_time(name)
+        if cached is None:
+            return True
+        # GENESIS-Online reports German time, which is ahead of UTC, so no update is missed
+        since = datetime.fromtimestamp(cached, timezone.utc).replace(tzinfo=None)
+
+    return updated > since
+
+
+def _get_last_update(name: str) -> datetime:
+    """Get the time a table was last updated from its metadata."""
+    db_name = db.select_db_by_credentials(db.identify_db_matches(name))
+    response = http_helper.get_data_from_endpoint("metadata", "table", {"name": name}, db_name)
+
+    return datetime.strptime(json.loads(response.content)["Object"]["Updated"], UPDATED_FORMAT)
+
+
+def _get_cache_time(name: str) -> float | None:
+    """Get the time the least recent of the cached variants of a table was cached.
+
+    Returns:
+        float | None: Seconds since the epoch or None if the table is not cached.
+    """
+    latest: dict[str, float] = {}
+    for entry in manifest.get_entries(config.get_cache_dir(), name=name):
+        cached = max(entry.created, entry.checked or 0.0)
+        latest[entry.key] = max(latest.get(entry.key, 0.0), cached)
+
+    return min(latest.values(), default=None)
+
+
+def _parse_since(since: datetime | date | str | None) -> datetime | None:
+    """Convert the `since` argument of `check_updates` into a naive datetime."""
+    if since is None:
+        return None
+
+    if isinstance(since, datetime):
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return since
+
+    if isinstance(since, date):
+        return datetime.combine(since, datetime.min.time())
+
+    for since_format in SINCE_FORMATS:
+        try:
+            return datetime.strptime(since.strip(), since_format)
+        except ValueError:
+            continue
+
+    raise ValueError(f'since has to be formatted like "24.12.2001 19:15", got "{since}".')
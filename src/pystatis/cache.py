@@ -3,20 +3,164 @@
 import hashlib
 import json
 import logging
+import os
 import re
 import shutil
-import zipfile
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
 from datetime import date
-from operator import attrgetter
 from pathlib import Path
-from typing import Optional
+from types import ModuleType
+from typing import Any, Hashable, Iterable, Iterator, Optional
 
-from pystatis import config
+import numpy as np
+import pandas as pd
+
+from pystatis import codec, config, manifest
 from pystatis.types import ParamDict
 
 logger = logging.getLogger(__name__)
 
 JOB_ID_PATTERN = r"_\d+"
+# seconds between two attempts to acquire a lock file
+LOCK_POLL_INTERVAL = 0.5
+# seconds after which a lock file is considered left over by a crashed process
+LOCK_STALE_AFTER = 2 * 60 * 60
+EVICTION_STRATEGIES = ("lru", "lfu")
+FRAME_FORMATS = ("parquet", "feather")
+# version of the cache keys, cache directories indexed with older keys are migrated
+CACHE_KEY_VERSION = 1
+# values GENESIS-Online assumes for omitted params of a data request (tablefile, resultfile)
+DEFAULT_PARAMS = {"area": "all", "compress": "false", "language": "de", "quality": "off"}
+# params holding a comma-separated list whose order does not matter
+LIST_PARAMS = frozenset({"regionalkey"})
+
+
+class MemoryCache:
+    """A thread-safe LRU cache in memory, limited by the size of its values in bytes.
+
+    Holds the decoded data and the parsed data frames of the most recently used cache entries,
+    so they are served without reading from disk or parsing again. Keys are tuples whose
+    first two items are the cache directory and the cache key, see `get_cache_key`.
+
+    Args:
+        max_size (int): Maximum total size of the values in bytes, 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int = 0) -> None:
+        self.max_size = max_size
+        self.size = 0
+        self._values: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Get a value and mark it as the most recently used, None if it is not cached."""
+        with self._lock:
+            if key not in self._values:
+                return None
+
+            self._values.move_to_end(key)
+
+            return self._values[key][0]
+
+    def put(self, key: Hashable, value: bytes | pd.DataFrame) -> None:
+        """Cache a value, evicting the least recently used values if the cache is full."""
+        if isinstance(value, pd.DataFrame):
+            size = int(value.memory_usage(deep=True).sum())
+        else:
+            size = len(value)
+
+        with self._lock:
+            self._pop(key)
+            if size > self.max_size:
+                return
+
+            self._values[key] = (value, size)
+            self.size += size
+            self._shrink()
+
+    def discard(self, cache_dir: str, prefix: str) -> None:
+        """Remove the values of a cache key or of all cache keys starting with `<prefix>/`."""
+        with self._lock:
+            for key in list(self._values):
+                if key[0] == cache_dir and (key[1] == prefix or key[1].startswith(f"{prefix}/")):
+                    self._pop(key)
+
+    def resize(self, max_size: int) -> None:
+        """Change the maximum size, evicting values if necessary."""
+        with self._lock:
+            self.max_size = max_size
+            self._shrink()
+
+    def clear(self) -> None:
+        """Remove all values."""
+        with self._lock:
+            self._values.clear()
+            self.size = 0
+
+    def _pop(self, key: Hashable) -> None:
+        if key in self._values:
+            self.size -= self._values.pop(key)[1]
+
+    def _shrink(self) -> None:
+        while self.size > self.max_size:
+            self.size -= self._values.popitem(last=False)[1][1]
+
+
+_memory_cache = MemoryCache()
+
+
+def get_memory_cache() -> MemoryCache:
+    """Get the memory cache of this process, sized by `memory_cache` in the `data` section of the config."""
+    _memory_cache.resize(int(config.get_memory_cache() * 1024 * 1024))
+
+    return _memory_cache
+
+
+@dataclass
+class EvictionPolicy:
+    """Limits of the data cache, enforced whenever data is cached and by `gc`.
+
+    Expired versions and versions exceeding `max_versions` are removed first. If the cache
+    is still larger than `max_size`, the least recently ("lru") or least frequently ("lfu")
+    read versions are removed until it fits. A limit of 0 disables it.
+
+    Args:
+        max_size (float): Maximum total size of the cache in megabytes.
+        max_versions (int): Maximum number of versions kept per data request.
+        ttl (float): Days after which a cached version expires.
+        strategy (str): The versions removed first to meet `max_size`, "lru" or "lfu".
+    """
+
+    max_size: float = 0.0
+    max_versions: int = 0
+    ttl: float = 0.0
+    strategy: str = "lru"
+
+    def __post_init__(self) -> None:
+        if self.strategy not in EVICTION_STRATEGIES:
+            raise ValueError(
+                f"Unknown eviction strategy {self.strategy}, use one of {EVICTION_STRATEGIES}."
+            )
+
+    @classmethod
+    def from_config(cls) -> "EvictionPolicy":
+        """Create the eviction policy from the `data` section of the config."""
+        return cls(
+            max_size=config.get_cache_max_size(),
+            max_versions=config.get_cache_max_versions(),
+            ttl=config.get_cache_ttl(),
+            strategy=config.get_cache_eviction(),
+        )
+
+    @property
+    def is_bounded(self) -> bool:
+        """True if any limit is set."""
+        return self.max_size > 0 or self.max_versions > 0 or self.ttl > 0
 
 
 def cache_data(
@@ -28,7 +172,8 @@ def cache_data(
 ) -> None:
     """Compress and archive data within the configured cache directory.
 
-    Data will be stored in a zip file within the cache directory.
+    Data will be stored in a file compressed with the configured codec (see `codec`)
+    within the cache directory.
     The folder structure will be `<name>/<endpoint>/<method>/<hash(params)>`.
     This allows to cache different results for different params.
 
@@ -40,36 +185,96 @@ def cache_data(
         content_type (str): The content type of the data, e.g. "csv" or "zip".
     """
     # pylint: disable=too-many-arguments
+    cache_stream(cache_dir, name, params, [data], content_type)
+
+
+def cache_stream(
+    cache_dir: str,
+    name: Optional[str],
+    params: ParamDict,
+    chunks: Iterable[bytes],
+    content_type: str,
+) -> bool:
+    """Write data chunk by chunk into the cache without holding it in memory.
+
+    Works like `cache_data`, but consumes an iterable of byte chunks, e.g. a streamed response.
+    CSV data is compressed on the fly with the configured codec, zip data is written as it is.
+    The archive is written to a temporary file first and only moved into the cache when it
+    is complete, so readers never see a partially written version. The version is then
+    recorded in the cache index, see `manifest`.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        chunks (Iterable[bytes]): The raw bytes content of the response in chunks.
+        content_type (str): The content type of the data, e.g. "csv" or "zip".
+
+    Returns:
+        bool: True, if the data was cached, False if the data is not cacheable.
+    """
+    # pylint: disable=too-many-arguments
     if name is None or content_type not in ["csv", "zip"]:
-        return
+        return False
 
     data_dir = _build_file_path(cache_dir, name, params)
-    file_name = f"{str(date.today()).replace('-', '')}.{content_type}"
-    file_path = data_dir / file_name
-    file_path.parent.mkdir(parents=True, exist_ok=True)
-
-    if content_type in ["csv"]:
-        # we have to first save the content to a text file, before we can add it to a
-        #   compressed archive, and finally have to delete the file so only the archive remains
-        with open(file_path, "wb") as file:
-            file.write(data)
-
-        with zipfile.ZipFile(
-            str(file_path).replace(f".{content_type}", ".zip"),
-            "w",
-            compression=zipfile.ZIP_DEFLATED,
-            compresslevel=9,
-        ) as myzip:
-            myzip.write(file_path, arcname=file_name)
-
-        file_path.unlink()
-
-    elif content_type == "zip":
-        with open(file_path, "wb") as file:
-            file.write(data)
+    version = str(date.today()).replace("-", "")
+    # zip data is an archive already, so it is stored as it is
+    codec_ = get_codec() if content_type == "csv" else codec.DeflateCodec()
+    file_path = data_dir / f"{version}{codec_.suffix}"
+    data_dir.parent.mkdir(parents=True, exist_ok=True)
+    checksum = hashlib.blake2b(digest_size=16)
+
+    fd, tmp_name = tempfile.mkstemp(dir=data_dir.parent, suffix=".part")
+    try:
+        with open(fd, "wb") as file:
+            with (
+                codec_.writer(file, f"{version}.csv")
+                if content_type == "csv"
+                else nullcontext(file)
+            ) as stream:
+                for chunk in chunks:
+                    checksum.update(chunk)
+                    stream.write(chunk)
+
+        data_dir.mkdir(exist_ok=True)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    key = get_cache_key(name, params)
+    # the same version was cached today already, possibly with another codec,
+    # and its data frames were parsed from the replaced data
+    for stale_path in data_dir.glob(f"{version}.*"):
+        if stale_path != file_path:
+            stale_path.unlink(missing_ok=True)
+
+    now = time.time()
+    entry = manifest.Entry(
+        key=key,
+        version=version,
+        name=name,
+        params=_serialize_params(params),
+        file_name=file_path.name,
+        content_type=content_type,
+        size=file_path.stat().st_size,
+        checksum=checksum.hexdigest(),
+        created=now,
+        last_access=now,
+        codec=codec_.name,
+    )
+    manifest.add_entry(cache_dir, entry)
+    _memory_cache.discard(cache_dir, key)
 
     logger.info("Data was successfully cached under %s.", file_path)
 
+    policy = EvictionPolicy.from_config()
+    if policy.is_bounded:
+        _evict(cache_dir, policy, key=entry.key, keep=entry)
+
+    return True
+
 
 def read_from_cache(
     cache_dir: str,
@@ -89,19 +294,291 @@ def read_from_cache(
     if name is None:
         return bytes()
 
+    memory_cache = get_memory_cache()
+    memory_key = (cache_dir, get_cache_key(name, params), "bytes")
+    if (data := memory_cache.get(memory_key)) is not None:
+        return data
+
+    while (entry := get_latest_entry(cache_dir, name, params)) is not None:
+        try:
+            data = codec.get_codec(entry.codec).read(Path(cache_dir) / entry.key / entry.file_name)
+        except FileNotFoundError:
+            # the file was deleted behind our back, fall back to an older version
+            manifest.remove_entries(cache_dir, key=entry.key, version=entry.version)
+            continue
+
+        manifest.touch(cache_dir, entry.key, entry.version)
+        if memory_cache.max_size > 0:
+            memory_cache.put(memory_key, data)
+            if not is_latest_entry(cache_dir, name, params, entry):
+                # a newer version was cached while this one was read
+                memory_cache.discard(cache_dir, entry.key)
+
+        return data
+
+    raise FileNotFoundError(f"No cached data for {name} with the given params.")
+
+
+def get_codec() -> codec.Codec:
+    """Get the codec new data is cached with, see `cache_codec` in the `data` section of the config."""
+    return codec.get_codec(*config.get_cache_codec())
+
+
+def cache_frame(
+    cache_dir: str,
+    name: str,
+    params: ParamDict,
+    variant: str,
+    frame: pd.DataFrame,
+    frame_format: str,
+    entry: Optional[manifest.Entry] = None,
+) -> bool:
+    """Store a parsed data frame next to the latest cached version of its raw data.
+
+    The data frame belongs to this version, so it is replaced as soon as a newer version
+    is cached and removed together with its version. Data frames that cannot be stored
+    in a columnar format are skipped, as are data frames parsed from a version that is
+    no longer the latest one, e.g. after a revalidation cached newer data meanwhile.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        variant (str): Distinguishes data frames parsed differently from the same data,
+            e.g. "pretty" or "raw".
+        frame (pd.DataFrame): The parsed data frame.
+        frame_format (str): One of `FRAME_FORMATS`.
+        entry (manifest.Entry, optional): The version the data frame was parsed from.
+            Defaults to the latest version.
+
+    Returns:
+        bool: True, if the data frame was cached.
+    """
+    # pylint: disable=too-many-arguments
+    if entry is None:
+        entry = get_latest_entry(cache_dir, name, params)
+    if entry is None or not is_latest_entry(cache_dir, name, params, entry):
+        return False
+
+    file_path = _get_frame_path(cache_dir, entry, variant, frame_format)
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, suffix=".part")
+    os.close(fd)
+    try:
+        if frame_format == "parquet":
+            frame.to_parquet(tmp_name)
+        else:
+            frame.reset_index(drop=True).to_feather(tmp_name)
+        os.replace(tmp_name, file_path)
+    except (ValueError, TypeError, NotImplementedError) as e:
+        logger.warning("Failed to cache the data frame of %s. Reason: %s", name, e)
+        return False
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+
+    if not is_latest_entry(cache_dir, name, params, entry):
+        # the version was replaced while the data frame was written
+        file_path.unlink(missing_ok=True)
+        return False
+
+    # the size of a version includes its data frames, so they count for `max_size`
+    entry.size = sum(path.stat().st_size for path in file_path.parent.glob(f"{entry.version}.*"))
+    manifest.add_entry(cache_dir, entry)
+
+    return True
+
+
+def read_frame(
+    cache_dir: str,
+    name: str,
+    params: ParamDict,
+    variant: str,
+    frame_format: str,
+) -> Optional[pd.DataFrame]:
+    """Read the data frame cached for the latest version of a data request.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        variant (str): The variant of the data frame, see `cache_frame`.
+        frame_format (str): One of `FRAME_FORMATS`.
+
+    Returns:
+        pd.DataFrame | None: The data frame or None if none is cached for the latest version.
+    """
+    entry = get_latest_entry(cache_dir, name, params)
+    if entry is None:
+        return None
+
+    file_path = _get_frame_path(cache_dir, entry, variant, frame_format)
+    if not file_path.exists():
+        return None
+
+    if frame_format == "parquet":
+        frame = pd.read_parquet(file_path)
+    else:
+        frame = pd.read_feather(file_path)
+
+    # missing values of object columns come back as None, pandas parses them as NaN
+    objects = frame.select_dtypes("object").columns
+    frame[objects] = frame[objects].where(frame[objects].notna(), np.nan)
+
+    manifest.touch(cache_dir, entry.key, entry.version)
+
+    return frame
+
+
+def _get_frame_path(cache_dir: str, entry: manifest.Entry, variant: str, frame_format: str) -> Path:
+    """Build the path of a data frame cached for a version, `<version>.<variant>.<format>`."""
+    if frame_format not in FRAME_FORMATS:
+        raise ValueError(f"Unknown frame format {frame_format}, use one of {FRAME_FORMATS}.")
+
+    _import_pyarrow()
+
+    return Path(cache_dir) / entry.key / f"{entry.version}.{variant}.{frame_format}"
+
+
+def _import_pyarrow() -> ModuleType:
+    """Import the optional `pyarrow` dependency of the frame cache."""
+    try:
+        import pyarrow  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError(
+            "Caching data frames requires pyarrow. "
+            "Please install it with `pip install pystatis[frames]` or set `frame_cache = off`."
+        ) from e
+
+    return pyarrow
+
+
+def get_latest_entry(cache_dir: str, name: str, params: ParamDict) -> Optional[manifest.Entry]:
+    """Get the index entry of the latest cached version of a data request.
+
+    Versions cached before the index existed are indexed on first access.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+
+    Returns:
+        manifest.Entry | None: The entry of the latest version or None if nothing is cached.
+    """
+    migrate_cache_keys(cache_dir)
+    key = get_cache_key(name, params)
+    entry = manifest.get_latest_entry(cache_dir, key)
+
+    if entry is None:
+        entry = _index_versions(cache_dir, name, params)
+
+    return entry
+
+
+def is_latest_entry(cache_dir: str, name: str, params: ParamDict, entry: manifest.Entry) -> bool:
+    """Check if a cached version is still the latest one of its data request.
+
+    A version cached again on the same day keeps its version, so the time it was cached
+    is compared as well.
+    """
+    latest = get_latest_entry(cache_dir, name, params)
+
+    return latest is not None and (latest.version, latest.created) == (
+        entry.version,
+        entry.created,
+    )
+
+
+def _index_versions(cache_dir: str, name: str, params: ParamDict) -> Optional[manifest.Entry]:
+    """Add the versions found in the cache directory of a data request to the index.
+
+    Returns:
+        manifest.Entry | None: The entry of the latest version or None if nothing is cached.
+    """
     data_dir = _build_file_path(cache_dir, name, params)
+    legacy_key = _get_legacy_cache_key(name, params)
+    legacy_dir = Path(cache_dir) / legacy_key
+    if not data_dir.is_dir() and legacy_dir.is_dir():
+        # cached before the params were canonicalized, maybe indexed by `gc` under the old key
+        legacy_dir.rename(data_dir)
+        manifest.remove_entries(cache_dir, key=legacy_key)
+    if not data_dir.is_dir():
+        return None
+
+    entries = _index_directory(
+        cache_dir, data_dir, get_cache_key(name, params), name, _serialize_params(params)
+    )
+
+    return max(entries, key=lambda entry: entry.version, default=None)
 
-    latest_version = sorted(
-        data_dir.glob("*"),
-        key=attrgetter("stem"),
-    )[-1]
-    file_name = latest_version.name
-    file_path = data_dir / file_name
-    with zipfile.ZipFile(file_path, "r") as zipfile_:
-        single_file = zipfile_.filelist[0].filename
-        data = zipfile_.read(single_file)
 
-    return data
+def _index_cache_dir(cache_dir: str) -> int:
+    """Add the versions of all cache directories missing in the index, e.g. before evicting.
+
+    Directories written before the index existed are otherwise only indexed when their
+    data request is read again, see `_index_versions`. Their params are unknown, so they
+    are indexed under the key of their directory with the params `null`.
+
+    Returns:
+        int: The number of indexed versions.
+    """
+    indexed = {entry.key for entry in manifest.get_entries(cache_dir)}
+    count = 0
+
+    for name_dir in Path(cache_dir).iterdir():
+        # skip the index, the local state of the job subsystem and cached responses
+        if not name_dir.is_dir() or name_dir.name.startswith("."):
+            continue
+
+        for data_dir in name_dir.iterdir():
+            key = f"{name_dir.name}/{data_dir.name}"
+            if data_dir.is_dir() and key not in indexed:
+                count += len(_index_directory(cache_dir, data_dir, key, name_dir.name, "null"))
+
+    return count
+
+
+def _index_directory(
+    cache_dir: str, data_dir: Path, key: str, name: str, params: str
+) -> list[manifest.Entry]:
+    """Add the versions found in a cache directory to the index.
+
+    The codec of each version is recognized by the suffix of its file, see `codec.find_codec`.
+
+    Returns:
+        list[manifest.Entry]: The entries of the indexed versions.
+    """
+    entries = []
+    for file_path in data_dir.iterdir():
+        codec_ = codec.find_codec(file_path.name)
+        if codec_ is None:
+            continue
+
+        # skip data frames and temporary files, versions are dates
+        version = file_path.name.removesuffix(codec_.suffix)
+        if not version.isdigit():
+            continue
+
+        stat = file_path.stat()
+        entries.append(
+            manifest.Entry(
+                key=key,
+                version=version,
+                name=name,
+                params=params,
+                file_name=file_path.name,
+                content_type="zip" if codec_ is codec.DeflateCodec else "csv",
+                size=stat.st_size,
+                checksum=None,
+                created=stat.st_mtime,
+                last_access=stat.st_mtime,
+                codec=codec_.name,
+            )
+        )
+
+    for entry in entries:
+        manifest.add_entry(cache_dir, entry)
+
+    return entries
 
 
 def _build_file_path(cache_dir: str, name: str, params: ParamDict) -> Path:
@@ -119,18 +596,150 @@ def _build_file_path(cache_dir: str, name: str, params: ParamDict) -> Path:
     Returns:
         Path: The path object to the directory where the data will be downloaded/cached.
     """
-    params_ = params.copy()
-    # we have to delete the job key here because otherwise we will not have a cache hit
+    data_dir = Path(cache_dir) / get_cache_key(name, params)
+
+    return data_dir
+
+
+def get_cache_key(name: str, params: ParamDict) -> str:
+    """Build the key identifying a data request in the cache, `<name>/<hash(params)>`.
+
+    The params are canonicalized first, so equivalent requests share a key,
+    see `canonicalize_params`.
+
+    Args:
+        name (str): The unique identifier for an object in Destatis.
+        params (dict): The query parameters for a given call to the Destatis API.
+
+    Returns:
+        str: The cache key, also the relative path of the cached data within the cache dir.
+    """
     # we use 10 digits because this is enough security to avoid hash collisions
-    if "job" in params_:
-        del params_["job"]
+    params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
+    params_hash.update(_serialize_params(params).encode("UTF-8"))
+
+    return f"{name}/{params_hash.hexdigest()}"
+
+
+def _serialize_params(params: ParamDict) -> str:
+    """Serialize the params of a data request as they are hashed for the cache key."""
+    return json.dumps(canonicalize_params(params), sort_keys=True)
+
+
+def canonicalize_params(
+    params: ParamDict, defaults: Optional[dict[str, str]] = None
+) -> dict[str, str]:
+    """Normalize the params of a data request, so equivalent requests get the same cache key.
 
+    The job flag, empty params and params with their default value are dropped. Values are
+    stripped and lowercased, except for the name, and the items of comma-separated lists
+    (see `LIST_PARAMS`) are sorted.
+
+    Args:
+        params (dict): The dictionary holding the params for this data request.
+        defaults (dict, optional): The values assumed for omitted params of the endpoint.
+            Defaults to `DEFAULT_PARAMS` of the data endpoint.
+
+    Returns:
+        dict: The canonical params, sorted by their names.
+    """
+    if defaults is None:
+        defaults = DEFAULT_PARAMS
+
+    canonical = {}
+    for param, value in params.items():
+        param = param.strip().lower()
+        # we have to delete the job key here because otherwise we will not have a cache hit
+        if param == "job" or value is None:
+            continue
+
+        if isinstance(value, bool):
+            value = "true" if value else "false"
+        value = str(value).strip()
+        if param != "name":
+            value = value.lower()
+        if param in LIST_PARAMS:
+            value = ",".join(sorted({item.strip() for item in value.split(",")} - {""}))
+
+        if value and value != defaults.get(param):
+            canonical[param] = value
+
+    return dict(sorted(canonical.items()))
+
+
+def _get_legacy_cache_key(name: str, params: ParamDict) -> str:
+    """Get the cache key of a data request as it was built before `canonicalize_params`."""
+    params_ = params.copy()
+    params_.pop("job", None)
     params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
     params_hash.update(json.dumps(params_).encode("UTF-8"))
 
-    data_dir = Path(cache_dir) / name / params_hash.hexdigest()
+    return f"{name}/{params_hash.hexdigest()}"
 
-    return data_dir
+
+_migrated_cache_dirs: set[str] = set()
+_migration_lock = threading.Lock()
+
+
+def migrate_cache_keys(cache_dir: str) -> int:
+    """Move the versions indexed under outdated cache keys to their current keys.
+
+    Cache keys used to hash the params as they were given, so equivalent requests were
+    cached under different keys. The migration runs once per cache directory and is recorded
+    in the index, see `manifest.get_key_version`. If a version is cached under several old
+    keys, only the first one is kept. Directories never indexed are moved on first access.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+
+    Returns:
+        int: The number of moved versions.
+    """
+    with _migration_lock:
+        if cache_dir in _migrated_cache_dirs:
+            return 0
+
+        moved = 0
+        if manifest.get_key_version(cache_dir) < CACHE_KEY_VERSION:
+            for entry in manifest.get_entries(cache_dir):
+                params = json.loads(entry.params)
+                # versions indexed by `gc` without their params stay where they are
+                if params is not None and get_cache_key(entry.name, params) != entry.key:
+                    _move_version(cache_dir, entry, params)
+                    moved += 1
+
+            manifest.set_key_version(cache_dir, CACHE_KEY_VERSION)
+
+        _migrated_cache_dirs.add(cache_dir)
+
+    if moved:
+        logger.info("Moved %s cached versions to canonical cache keys.", moved)
+
+    return moved
+
+
+def _move_version(cache_dir: str, entry: manifest.Entry, params: ParamDict) -> None:
+    """Move a cached version and its data frames to the current cache key of its params."""
+    key = get_cache_key(entry.name, params)
+    old_dir = Path(cache_dir) / entry.key
+    data_dir = Path(cache_dir) / key
+    data_dir.mkdir(parents=True, exist_ok=True)
+    exists = any(other.version == entry.version for other in manifest.get_entries(cache_dir, key))
+
+    for file_path in old_dir.glob(f"{entry.version}.*"):
+        if exists:
+            file_path.unlink(missing_ok=True)
+        else:
+            os.replace(file_path, data_dir / file_path.name)
+
+    manifest.remove_entries(cache_dir, key=entry.key, version=entry.version)
+    if not exists:
+        manifest.add_entry(cache_dir, replace(entry, key=key, params=_serialize_params(params)))
+
+    try:
+        old_dir.rmdir()
+    except OSError:
+        pass
 
 
 def normalize_name(name: str) -> str:
@@ -148,6 +757,55 @@ def normalize_name(name: str) -> str:
     return name
 
 
+@contextmanager
+def file_lock(
+    cache_dir: str,
+    name: str,
+    params: ParamDict,
+    poll_interval: float = LOCK_POLL_INTERVAL,
+    stale_after: float = LOCK_STALE_AFTER,
+) -> Iterator[None]:
+    """Hold a lock file for a data request, so other processes do not download the same data.
+
+    The lock file is created next to the cache directory of the request. Creating it with
+    `O_EXCL` is atomic on all platforms. A lock file older than `stale_after` seconds is left
+    over by a crashed process and removed.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        name (str): The unique identifier in GENESIS-Online.
+        params (dict): The dictionary holding the params for this data request.
+        poll_interval (float, optional): Seconds between two attempts to acquire the lock.
+        stale_after (float, optional): Seconds after which a lock file is considered stale.
+    """
+    data_dir = _build_file_path(cache_dir, name, params)
+    lock_file = data_dir.with_name(f"{data_dir.name}.lock")
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+
+    while True:
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - lock_file.stat().st_mtime > stale_after:
+                    logger.warning("Removing stale lock file %s.", lock_file)
+                    lock_file.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+
+            time.sleep(poll_interval)
+        else:
+            break
+
+    try:
+        with open(fd, "w", encoding="utf-8") as file:
+            file.write(str(os.getpid()))
+        yield
+    finally:
+        lock_file.unlink(missing_ok=True)
+
+
 def hit_in_cash(
     cache_dir: str,
     name: Optional[str],
@@ -166,8 +824,106 @@ def hit_in_cash(
     if name is None:
         return False
 
-    data_dir = _build_file_path(cache_dir, name, params)
-    return data_dir.exists()
+    if get_memory_cache().get((cache_dir, get_cache_key(name, params), "bytes")) is not None:
+        return True
+
+    return get_latest_entry(cache_dir, name, params) is not None
+
+
+def gc(policy: Optional[EvictionPolicy] = None) -> int:
+    """Remove cached versions exceeding the limits of the eviction policy.
+
+    Versions missing in the index, e.g. written before it existed, are indexed first.
+
+    Args:
+        policy (EvictionPolicy, optional): The limits to enforce.
+            Defaults to the policy configured in the `data` section of the config.
+
+    Returns:
+        int: The number of removed versions.
+    """
+    cache_dir = config.get_cache_dir()
+    migrate_cache_keys(cache_dir)
+    _index_cache_dir(cache_dir)
+
+    return _evict(cache_dir, policy or EvictionPolicy.from_config())
+
+
+def _evict(
+    cache_dir: str,
+    policy: EvictionPolicy,
+    key: Optional[str] = None,
+    keep: Optional[manifest.Entry] = None,
+) -> int:
+    """Remove cached versions exceeding the limits of the eviction policy.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        policy (EvictionPolicy): The limits to enforce.
+        key (str, optional): Only enforce `max_versions` for this cache key,
+            e.g. after a new version was cached. Defaults to all keys.
+        keep (manifest.Entry, optional): A version never removed, e.g. the one just cached.
+
+    Returns:
+        int: The number of removed versions.
+    """
+    evicted: dict[tuple[str, str], manifest.Entry] = {}
+
+    if policy.ttl > 0:
+        for entry in manifest.get_entries(
+            cache_dir, created_before=time.time() - policy.ttl * 24 * 60 * 60
+        ):
+            evicted[(entry.key, entry.version)] = entry
+
+    if policy.max_versions > 0:
+        versions: dict[str, int] = {}
+        for entry in manifest.get_entries(cache_dir, key=key):
+            versions[entry.key] = versions.get(entry.key, 0) + 1
+            if versions[entry.key] > policy.max_versions:
+                evicted[(entry.key, entry.version)] = entry
+
+    if keep is not None:
+        evicted.pop((keep.key, keep.version), None)
+
+    if policy.max_size > 0:
+        size = manifest.get_total_size(cache_dir) - sum(entry.size for entry in evicted.values())
+        max_size = policy.max_size * 1024 * 1024
+
+        if size > max_size:
+            for entry in manifest.get_entries(cache_dir, order=policy.strategy):
+                if size <= max_size:
+                    break
+                if (entry.key, entry.version) in evicted or (
+                    keep is not None and (entry.key, entry.version) == (keep.key, keep.version)
+                ):
+                    continue
+
+                evicted[(entry.key, entry.version)] = entry
+                size -= entry.size
+
+    for entry in evicted.values():
+        _remove_version(cache_dir, entry)
+
+    if evicted:
+        logger.info("Removed %s cached versions.", len(evicted))
+
+    return len(evicted)
+
+
+def _remove_version(cache_dir: str, entry: manifest.Entry) -> None:
+    """Delete a cached version, its data frames and its index entry, and its directories once empty."""
+    data_dir = Path(cache_dir) / entry.key
+    (data_dir / entry.file_name).unlink(missing_ok=True)
+    for file_path in data_dir.glob(f"{entry.version}.*"):
+        file_path.unlink(missing_ok=True)
+    manifest.remove_entries(cache_dir, key=entry.key, version=entry.version)
+    _memory_cache.discard(cache_dir, entry.key)
+
+    for directory in (data_dir, data_dir.parent):
+        try:
+            directory.rmdir()
+        except OSError:
+            break
 
 
 def clear_cache(name: Optional[str] = None) -> None:
@@ -181,6 +937,9 @@ def clear_cache(name: Optional[str] = None) -> None:
     # remove specified file (directory) from the data cache
     # or clear complete cache (remove childs, preserve base)
     file_paths = [cache_dir / name] if name is not None else list(cache_dir.iterdir())
+    if name is None:
+        # open files cannot be deleted on Windows
+        manifest.close()
 
     for file_path in file_paths:
         # delete if file or symlink, otherwise remove complete tree
@@ -193,3 +952,9 @@ def clear_cache(name: Optional[str] = None) -> None:
             logger.warning("Failed to delete %s. Reason: %s", file_path, e)
 
         logger.info("Removed files: %s", file_paths)
+
+    if name is not None:
+        manifest.remove_entries(str(cache_dir), name=name)
+        _memory_cache.discard(str(cache_dir), name)
+    else:
+        _memory_cache.clear()
@@ -0,0 +1,144 @@
+"""Module provides a circuit breaker per database to fail fast while a database is down.
+
+After `circuit_failure_threshold` consecutive failed requests (timeouts, connection errors,
+server errors) against a database, the circuit of the database opens: further requests fail
+immediately with a `CircuitOpenError` instead of waiting for their timeouts. Cached data
+is still served by `http_helper.load_data`. After `circuit_cooldown` seconds the next request
+probes the database with `helloworld/whoami` and closes the circuit again if it answers.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from pystatis import config, db, http_helper
+from pystatis.exception import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Track consecutive failures of a database and suspend requests while it is down.
+
+    Args:
+        db_name (str): The database guarded by this circuit breaker.
+        failure_threshold (int): Number of consecutive failures opening the circuit.
+        cooldown (float): Seconds the circuit stays open before the database is probed.
+        probe (Callable[[], bool]): Check if the database is available again.
+    """
+
+    def __init__(
+        self,
+        db_name: str,
+        failure_threshold: int,
+        cooldown: float,
+        probe: Callable[[], bool],
+    ) -> None:
+        self.db_name = db_name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._probe = probe
+        self._failures = 0
+        self._opened = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_closed(self) -> bool:
+        """True if requests are let through without further checks."""
+        return self.state == CLOSED
+
+    def before_request(self) -> None:
+        """Check if a request may be sent, probing the database once the cooldown is over.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or the database is still unavailable.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+
+            if self.state == HALF_OPEN or time.monotonic() - self._opened < self.cooldown:
+                raise CircuitOpenError(
+                    f"Requests to {self.db_name} are suspended after {self._failures} "
+                    "consecutive failures. Try again later."
+                )
+
+            # only the first request after the cooldown probes the database
+            self.state = HALF_OPEN
+
+        try:
+            is_available = self._probe()
+        except Exception:  # pylint: disable=broad-exception-caught
+            is_available = False
+
+        with self._lock:
+            if is_available:
+                logger.info("Database %s is available again.", self.db_name)
+                self.state = CLOSED
+                self._failures = 0
+                return
+
+            self.state = OPEN
+            self._opened = time.monotonic()
+
+        raise CircuitOpenError(f"Database {self.db_name} is still unavailable. Try again later.")
+
+    def record_success(self) -> None:
+        """Record a request answered by the database."""
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit after too many consecutive failures."""
+        with self._lock:
+            self._failures += 1
+
+            if self.state == CLOSED and self._failures >= self.failure_threshold:
+                logger.warning(
+                    "Database %s failed %s times in a row. Suspending requests for %s seconds.",
+                    self.db_name,
+                    self._failures,
+                    self.cooldown,
+                )
+                self.state = OPEN
+                self._opened = time.monotonic()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_circuit_breaker(db_name: str) -> CircuitBreaker:
+    """Get the circuit breaker of a database."""
+    with _lock:
+        breaker = _breakers.get(db_name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                db_name,
+                failure_threshold=config.get_circuit_failure_threshold(),
+                cooldown=config.get_circuit_cooldown(),
+                probe=lambda: _whoami(db_name),
+            )
+            _breakers[db_name] = breaker
+
+    return breaker
+
+
+def reset() -> None:
+    """Close all circuits and forget all failures."""
+    with _lock:
+        _breakers.clear()
+
+
+def _whoami(db_name: str) -> bool:
+    """Probe a database with the lightweight `helloworld/whoami` request."""
+    url = f"{db.get_host(db_name)}helloworld/whoami"
+    response = http_helper.get_session(db_name).get(url, timeout=(5, 15))
+
+    return response.status_code == 200
@@ -0,0 +1,155 @@
+"""Module provides the compression codecs of the data cache.
+
+The codec used for new cache entries is set with `cache_codec` in the `[data]` section of the
+config, its level with `cache_compresslevel`. The codec of every entry is recorded in the cache
+index (see `manifest`), so entries written with another codec stay readable.
+
+- "deflate": A zip archive, readable without pystatis. The default.
+- "zstd": Zstandard, much faster than deflate at a similar ratio. Requires `zstandard`.
+- "lz4": LZ4, the fastest codec with a lower ratio. Requires `lz4`.
+- "none": Uncompressed.
+
+Further codecs can be added to `CODECS`.
+"""
+
+import importlib
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from types import ModuleType
+from typing import BinaryIO, Iterator
+
+
+class Codec:
+    """Compresses a single file of the data cache.
+
+    Args:
+        level (int, optional): The compression level, None for the default of the codec.
+    """
+
+    name = "none"
+    suffix = ".csv"
+
+    def __init__(self, level: int | None = None) -> None:
+        self.level = level
+
+    @contextmanager
+    def writer(self, file: BinaryIO, member: str) -> Iterator[BinaryIO]:
+        """Open a stream compressing everything written to it into `file`.
+
+        Args:
+            file (BinaryIO): The file the compressed data is written to.
+            member (str): The name of the data within an archive.
+        """
+        yield file
+
+    def read(self, path: Path) -> bytes:
+        """Read and decompress a cached file."""
+        return path.read_bytes()
+
+
+class DeflateCodec(Codec):
+    """A zip archive with a single DEFLATE compressed member."""
+
+    name = "deflate"
+    suffix = ".zip"
+
+    @contextmanager
+    def writer(self, file: BinaryIO, member: str) -> Iterator[BinaryIO]:
+        level = 6 if self.level is None else self.level
+        with zipfile.ZipFile(
+            file, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level
+        ) as zip_:
+            with zip_.open(member, "w") as entry:
+                yield entry
+
+    def read(self, path: Path) -> bytes:
+        with zipfile.ZipFile(path, "r") as zip_:
+            return zip_.read(zip_.filelist[0].filename)
+
+
+class ZstdCodec(Codec):
+    """A Zstandard frame."""
+
+    name = "zstd"
+    suffix = ".csv.zst"
+
+    @contextmanager
+    def writer(self, file: BinaryIO, member: str) -> Iterator[BinaryIO]:
+        zstandard = _import_optional("zstandard", self.name)
+        compressor = zstandard.ZstdCompressor(level=3 if self.level is None else self.level)
+        with compressor.stream_writer(file, closefd=False) as writer:
+            yield writer
+
+    def read(self, path: Path) -> bytes:
+        zstandard = _import_optional("zstandard", self.name)
+        with open(path, "rb") as file:
+            return zstandard.ZstdDecompressor().stream_reader(file).read()
+
+
+class Lz4Codec(Codec):
+    """An LZ4 frame."""
+
+    name = "lz4"
+    suffix = ".csv.lz4"
+
+    @contextmanager
+    def writer(self, file: BinaryIO, member: str) -> Iterator[BinaryIO]:
+        lz4_frame = _import_optional("lz4.frame", self.name)
+        with lz4_frame.open(
+            file, "wb", compression_level=0 if self.level is None else self.level
+        ) as writer:
+            yield writer
+
+    def read(self, path: Path) -> bytes:
+        lz4_frame = _import_optional("lz4.frame", self.name)
+        return lz4_frame.decompress(path.read_bytes())
+
+
+CODECS: dict[str, type[Codec]] = {
+    codec.name: codec for codec in (DeflateCodec, ZstdCodec, Lz4Codec, Codec)
+}
+
+
+def get_codec(name: str, level: int | None = None) -> Codec:
+    """Get a codec by its name.
+
+    Args:
+        name (str): One of `CODECS`.
+        level (int, optional): The compression level, None for the default of the codec.
+
+    Raises:
+        ValueError: If the codec is unknown.
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown cache codec {name}, use one of {list(CODECS)}.")
+
+    return CODECS[name](level)
+
+
+def find_codec(file_name: str) -> type[Codec] | None:
+    """Find the codec a cached file was written with by its suffix.
+
+    Args:
+        file_name (str): The name of the cached file, e.g. "20240101.csv.zst".
+
+    Returns:
+        type[Codec] | None: The codec or None if no codec writes files with this suffix.
+    """
+    # ".csv.zst" before ".csv"
+    for codec in sorted(CODECS.values(), key=lambda codec: len(codec.suffix), reverse=True):
+        if file_name.endswith(codec.suffix):
+            return codec
+
+    return None
+
+
+def _import_optional(module: str, codec: str) -> ModuleType:
+    """Import the optional dependency of a codec."""
+    try:
+        return importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(
+            f"The {codec} cache codec requires {module.split('.')[0]}. "
+            f"Please install it with `pip install pystatis[{codec}]`."
+        ) from e
@@ -31,6 +31,31 @@ from pystatis.exception import PystatisConfigError
 
 PKG_NAME = __name__.split(".", maxsplit=1)[0]
 DEFAULT_CONFIG_DIR = str(Path().home() / f".{PKG_NAME}")
+DEFAULT_CACHE_MAX_SIZE = 0.0
+DEFAULT_CACHE_MAX_VERSIONS = 0
+DEFAULT_CACHE_TTL = 0.0
+DEFAULT_CACHE_EVICTION = "lru"
+DEFAULT_FRAME_CACHE = "off"
+DEFAULT_CACHE_CODEC = "deflate"
+DEFAULT_MEMORY_CACHE = 0.0
+# hours responses of the metadata, catalogue and find endpoints are cached
+DEFAULT_RESPONSE_TTL = 24.0
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_PARALLEL_TABLES = 4
+DEFAULT_MAX_PARALLEL_TABLES_LIMIT = 16
+DEFAULT_RATE_LIMIT = 5.0
+DEFAULT_MAX_IN_FLIGHT = 5
+DEFAULT_POLL_INITIAL_DELAY = 5.0
+DEFAULT_POLL_FACTOR = 1.5
+DEFAULT_POLL_MAX_DELAY = 60.0
+DEFAULT_POLL_JITTER = 0.1
+DEFAULT_RETRY_MAX_ATTEMPTS = 4
+DEFAULT_RETRY_BACKOFF = 2.0
+DEFAULT_RETRY_MAX_BACKOFF = 60.0
+DEFAULT_RETRY_DEADLINE = 900.0
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_COOLDOWN = 60.0
+DEFAULT_HEDGE_PERCENTILE = 95.0
 SupportedDb = Literal["genesis", "zensus", "regio"]
 SUPPORTED_DB: list[str] = list(get_args(SupportedDb))
 REGEX_DB = {
@@ -310,6 +335,39 @@ def create_default_config() -> None:
     config.add_section("data")
     cache_dir = Path(DEFAULT_CONFIG_DIR) / "data"
     config.set("data", "cache_dir", str(cache_dir))
+    config.set("data", "file_lock", "false")
+    config.set("data", "cache_max_size", str(DEFAULT_CACHE_MAX_SIZE))
+    config.set("data", "cache_max_versions", str(DEFAULT_CACHE_MAX_VERSIONS))
+    config.set("data", "cache_ttl", str(DEFAULT_CACHE_TTL))
+    config.set("data", "cache_eviction", DEFAULT_CACHE_EVICTION)
+    config.set("data", "frame_cache", DEFAULT_FRAME_CACHE)
+    config.set("data", "cache_codec", DEFAULT_CACHE_CODEC)
+    config.set("data", "cache_compresslevel", "")
+    config.set("data", "memory_cache", str(DEFAULT_MEMORY_CACHE))
+    config.set("data", "metadata_ttl", str(DEFAULT_RESPONSE_TTL))
+    config.set("data", "catalogue_ttl", str(DEFAULT_RESPONSE_TTL))
+    config.set("data", "find_ttl", str(DEFAULT_RESPONSE_TTL))
+
+    config.add_section("http")
+    config.set("http", "pool_maxsize", str(DEFAULT_POOL_MAXSIZE))
+    config.set("http", "max_parallel_tables", str(DEFAULT_MAX_PARALLEL_TABLES))
+    config.set("http", "max_parallel_tables_limit", str(DEFAULT_MAX_PARALLEL_TABLES_LIMIT))
+    config.set("http", "rate_limit", str(DEFAULT_RATE_LIMIT))
+    config.set("http", "max_in_flight", str(DEFAULT_MAX_IN_FLIGHT))
+    config.set("http", "retry_max_attempts", str(DEFAULT_RETRY_MAX_ATTEMPTS))
+    config.set("http", "retry_backoff", str(DEFAULT_RETRY_BACKOFF))
+    config.set("http", "retry_max_backoff", str(DEFAULT_RETRY_MAX_BACKOFF))
+    config.set("http", "retry_deadline", str(DEFAULT_RETRY_DEADLINE))
+    config.set("http", "circuit_failure_threshold", str(DEFAULT_CIRCUIT_FAILURE_THRESHOLD))
+    config.set("http", "circuit_cooldown", str(DEFAULT_CIRCUIT_COOLDOWN))
+    config.set("http", "hedge_requests", "false")
+    config.set("http", "hedge_percentile", str(DEFAULT_HEDGE_PERCENTILE))
+
+    config.add_section("jobs")
+    config.set("jobs", "poll_initial_delay", str(DEFAULT_POLL_INITIAL_DELAY))
+    config.set("jobs", "poll_factor", str(DEFAULT_POLL_FACTOR))
+    config.set("jobs", "poll_max_delay", str(DEFAULT_POLL_MAX_DELAY))
+    config.set("jobs", "poll_jitter", str(DEFAULT_POLL_JITTER))
 
 
 def get_supported_db() -> list[str]:
@@ -327,6 +385,192 @@ def get_cache_dir() -> str:
     return config.get("data", "cache_dir")
 
 
+def get_file_lock() -> bool:
+    """Check if processes sharing the cache directory coordinate downloads with lock files.
+
+    Falls back to False for configs created before the `file_lock` option existed.
+    """
+    return config.getboolean("data", "file_lock", fallback=False)
+
+
+def get_frame_cache() -> str | None:
+    """Get the format parsed data frames are cached in, see `cache.cache_frame`.
+
+    Falls back to "off" for configs created before the `frame_cache` option existed.
+
+    Returns:
+        str | None: "parquet" or "feather", None if data frames are not cached.
+    """
+    frame_format = config.get("data", "frame_cache", fallback=DEFAULT_FRAME_CACHE)
+
+    return None if frame_format == "off" else frame_format
+
+
+def get_cache_max_size() -> float:
+    """Get the maximum total size of the data cache in megabytes, 0 for no limit."""
+    return config.getfloat("data", "cache_max_size", fallback=DEFAULT_CACHE_MAX_SIZE)
+
+
+def get_cache_max_versions() -> int:
+    """Get the maximum number of versions cached per data request, 0 for no limit."""
+    return config.getint("data", "cache_max_versions", fallback=DEFAULT_CACHE_MAX_VERSIONS)
+
+
+def get_cache_ttl() -> float:
+    """Get the days after which a cached version expires, 0 for no limit."""
+    return config.getfloat("data", "cache_ttl", fallback=DEFAULT_CACHE_TTL)
+
+
+def get_cache_eviction() -> str:
+    """Get the strategy removing versions to meet the maximum size, "lru" or "lfu"."""
+    return config.get("data", "cache_eviction", fallback=DEFAULT_CACHE_EVICTION)
+
+
+def get_cache_codec() -> tuple[str, int | None]:
+    """Get the codec new data is cached with and its compression level.
+
+    Returns:
+        tuple[str, int | None]: The name of the codec and the compression level or None
+            for the default level of the codec.
+    """
+    level = config.get("data", "cache_compresslevel", fallback="")
+
+    return (
+        config.get("data", "cache_codec", fallback=DEFAULT_CACHE_CODEC),
+        int(level) if level else None,
+    )
+
+
+def get_memory_cache() -> float:
+    """Get the size of the in-memory cache of the data in megabytes, 0 to disable it."""
+    return config.getfloat("data", "memory_cache", fallback=DEFAULT_MEMORY_CACHE)
+
+
+def get_response_ttl(endpoint: str) -> float:
+    """Get the hours the responses of an endpoint are cached, 0 if they are not.
+
+    Falls back to the default for configs created before the `<endpoint>_ttl` options existed.
+    """
+    return max(config.getfloat("data", f"{endpoint}_ttl", fallback=DEFAULT_RESPONSE_TTL), 0.0)
+
+
+def get_pool_maxsize() -> int:
+    """Get the maximum number of pooled keep-alive connections per database.
+
+    Falls back to the default for configs created before the `http` section existed.
+    """
+    return config.getint("http", "pool_maxsize", fallback=DEFAULT_POOL_MAXSIZE)
+
+
+def get_max_parallel_tables(db_name: str) -> int:
+    """Get the number of tables that are downloaded in parallel from a database at first.
+
+    The number adapts to the health of the database up to `max_parallel_tables_limit`.
+    A `max_parallel_tables` option in the database section takes precedence over the
+    default in the `http` section.
+    """
+    default = config.getint("http", "max_parallel_tables", fallback=DEFAULT_MAX_PARALLEL_TABLES)
+    return config.getint(db_name, "max_parallel_tables", fallback=default)
+
+
+def get_max_parallel_tables_limit(db_name: str) -> int:
+    """Get the upper bound up to which the number of parallel table downloads adapts.
+
+    The number starts at `max_parallel_tables` and grows while the database answers
+    quickly, see `throttle.AdaptiveLimit`. A `max_parallel_tables_limit` option in the
+    database section takes precedence over the default in the `http` section.
+    """
+    default = config.getint(
+        "http", "max_parallel_tables_limit", fallback=DEFAULT_MAX_PARALLEL_TABLES_LIMIT
+    )
+    return config.getint(db_name, "max_parallel_tables_limit", fallback=default)
+
+
+def get_rate_limit(db_name: str) -> float:
+    """Get the maximum number of requests per second sent to a database, 0 for no limit.
+
+    A `rate_limit` option in the database section takes precedence over the
+    default in the `http` section.
+    """
+    default = config.getfloat("http", "rate_limit", fallback=DEFAULT_RATE_LIMIT)
+    return config.getfloat(db_name, "rate_limit", fallback=default)
+
+
+def get_max_in_flight(db_name: str) -> int:
+    """Get the maximum number of requests running at the same time against a database.
+
+    A `max_in_flight` option in the database section takes precedence over the
+    default in the `http` section.
+    """
+    default = config.getint("http", "max_in_flight", fallback=DEFAULT_MAX_IN_FLIGHT)
+    return config.getint(db_name, "max_in_flight", fallback=default)
+
+
+def get_retry_max_attempts() -> int:
+    """Get the maximum number of attempts of a request, including the first one."""
+    return config.getint("http", "retry_max_attempts", fallback=DEFAULT_RETRY_MAX_ATTEMPTS)
+
+
+def get_retry_backoff() -> float:
+    """Get the seconds to wait before the first retry of a request."""
+    return config.getfloat("http", "retry_backoff", fallback=DEFAULT_RETRY_BACKOFF)
+
+
+def get_retry_max_backoff() -> float:
+    """Get the maximum seconds to wait between two attempts of a request."""
+    return config.getfloat("http", "retry_max_backoff", fallback=DEFAULT_RETRY_MAX_BACKOFF)
+
+
+def get_retry_deadline() -> float:
+    """Get the maximum seconds from the first attempt of a request until its last retry."""
+    return config.getfloat("http", "retry_deadline", fallback=DEFAULT_RETRY_DEADLINE)
+
+
+def get_circuit_failure_threshold() -> int:
+    """Get the number of consecutive failures after which the circuit of a database opens."""
+    return config.getint(
+        "http", "circuit_failure_threshold", fallback=DEFAULT_CIRCUIT_FAILURE_THRESHOLD
+    )
+
+
+def get_circuit_cooldown() -> float:
+    """Get the seconds an open circuit waits before it probes the database again."""
+    return config.getfloat("http", "circuit_cooldown", fallback=DEFAULT_CIRCUIT_COOLDOWN)
+
+
+def get_hedge_requests() -> bool:
+    """Check if slow requests are hedged, see `hedging.hedge`.
+
+    Falls back to False for configs created before the `hedge_requests` option existed.
+    """
+    return config.getboolean("http", "hedge_requests", fallback=False)
+
+
+def get_hedge_percentile() -> float:
+    """Get the percentile of the recent latencies after which a hedged request is sent."""
+    return config.getfloat("http", "hedge_percentile", fallback=DEFAULT_HEDGE_PERCENTILE)
+
+
+def get_poll_initial_delay() -> float:
+    """Get the seconds before the first poll of a job."""
+    return config.getfloat("jobs", "poll_initial_delay", fallback=DEFAULT_POLL_INITIAL_DELAY)
+
+
+def get_poll_factor() -> float:
+    """Get the growth factor of the delay between two polls of a job."""
+    return config.getfloat("jobs", "poll_factor", fallback=DEFAULT_POLL_FACTOR)
+
+
+def get_poll_max_delay() -> float:
+    """Get the maximum seconds between two polls of a job."""
+    return config.getfloat("jobs", "poll_max_delay", fallback=DEFAULT_POLL_MAX_DELAY)
+
+
+def get_poll_jitter() -> float:
+    """Get the relative random variation of the delays between the polls of a job."""
+    return config.getfloat("jobs", "poll_jitter", fallback=DEFAULT_POLL_JITTER)
+
+
 def delete_config() -> None:
     """Delete the config file."""
     if config_exists():
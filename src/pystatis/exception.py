@@ -23,3 +23,15 @@ class TableNotFoundError(Exception):
     """Raised when table is not found in the database (API Error Code 90)."""
 
     pass
+
+
+class CircuitOpenError(Exception):
+    """Raised when requests to a database are suspended after repeated failures."""
+
+    pass
+
+
+class RetryLimitExceededError(Exception):
+    """Raised when a request still fails after all retries (timeouts, connection errors, HTTP 5xx)."""
+
+    pass
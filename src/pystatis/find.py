@@ -1,11 +1,12 @@
 """Implements find endpoint to retrieve results based on query"""
 
+import asyncio
 import json
 from typing import Any
 
 import pandas as pd
 
-from pystatis.http_helper import load_data
+from pystatis.http_helper import load_data, load_data_async
 from pystatis.results import Results
 
 pd.set_option("max_colwidth", None)
@@ -27,6 +28,7 @@ class Find:
 
     Methods:
         run(): Queries the API and prints summary.
+        arun(): Asynchronous variant of run().
         summary(): Prints summary of all results.
     """
 
@@ -65,6 +67,23 @@ class Find:
 
         print(self.summary())
 
+    async def arun(self) -> None:
+        """
+        Asynchronous variant of `run()`. All four categories are queried concurrently.
+
+        Requires the optional async dependencies (`pip install pystatis[async]`).
+        """
+        self.statistics, self.variables, self.tables, self.cubes = await asyncio.gather(
+            self._aget_find_results("statistics"),
+            self._aget_find_results("variables"),
+            self._aget_find_results("tables"),
+            self._aget_find_results("cubes"),
+        )
+
+        self.is_run = True
+
+        print(self.summary())
+
     def summary(self) -> str:
         """
         Returns:
@@ -110,6 +129,27 @@ class Find:
             pd.DataFrame
         """
 
+        response = load_data(
+            endpoint="find",
+            method="find",
+            params=self._build_find_params(category, **kwargs),
+            db_name=self.db_name,
+        )
+
+        return self._parse_find_results(response, category)
+
+    async def _aget_find_results(self, category: str, **kwargs: Any) -> "Results":
+        """Asynchronous variant of `_get_find_results`."""
+        response = await load_data_async(
+            endpoint="find",
+            method="find",
+            params=self._build_find_params(category, **kwargs),
+            db_name=self.db_name,
+        )
+
+        return self._parse_find_results(response, category)
+
+    def _build_find_params(self, category: str, **kwargs: Any) -> dict[str, Any]:
         params = {
             "term": self.query,
             "category": category,
@@ -117,15 +157,12 @@ class Find:
 
         params |= kwargs
 
-        response = load_data(
-            endpoint="find",
-            method="find",
-            params=params,
-            db_name=self.db_name,
-        )
-        response = json.loads(response)
-        assert isinstance(response, dict)  # nosec assert_used
-        response_dict = response[category.capitalize()]
+        return params
+
+    def _parse_find_results(self, response: bytes, category: str) -> "Results":
+        response_json = json.loads(response)
+        assert isinstance(response_json, dict)  # nosec assert_used
+        response_dict = response_json[category.capitalize()]
         response_df = pd.DataFrame(response_dict).replace("\n", " ", regex=True)
 
         return Results(response_df, category, db_name=self.db_name)
@@ -0,0 +1,179 @@
+"""Module provides hedged requests for small, idempotent endpoints with a long latency tail.
+
+Most `metadata`, `catalogue` and `find` requests are answered within a second, but a few
+take much longer. With `hedge_requests = true` in the `[http]` section of the config, a
+second identical request is sent once the first one is slower than `hedge_percentile`
+percent of the recent requests against the same database and endpoint. Whichever request
+answers first is used, the other one is cancelled.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+from collections import deque
+from concurrent import futures
+from typing import Awaitable, Callable, TypeVar
+
+from pystatis import config
+
+logger = logging.getLogger(__name__)
+
+# endpoints whose requests are small and idempotent, so they can be sent twice
+HEDGE_ENDPOINTS = frozenset({"metadata", "catalogue", "find"})
+# number of recent latencies kept per database and endpoint
+LATENCY_WINDOW = 100
+# no requests are hedged before this many latencies are observed
+MIN_SAMPLES = 20
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """A thread-safe window of the most recent latencies.
+
+    Args:
+        size (int): The number of latencies kept.
+    """
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._latencies: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float) -> None:
+        """Add the latency of a request, dropping the oldest one if the window is full."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def percentile(self, percent: float) -> float:
+        """Get the latency not exceeded by `percent` percent of the recent requests.
+
+        Raises:
+            ValueError: If no latency was recorded yet.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        if not latencies:
+            raise ValueError("No latencies recorded.")
+
+        index = min(max(math.ceil(percent / 100 * len(latencies)) - 1, 0), len(latencies) - 1)
+
+        return latencies[index]
+
+
+_windows: dict[tuple[str, str], LatencyWindow] = {}
+_lock = threading.Lock()
+_executor: futures.ThreadPoolExecutor | None = None
+
+
+def get_latency_window(db_name: str, endpoint: str) -> LatencyWindow:
+    """Get the recent latencies of requests against an endpoint of a database."""
+    with _lock:
+        window = _windows.get((db_name, endpoint))
+        if window is None:
+            window = _windows[(db_name, endpoint)] = LatencyWindow()
+
+    return window
+
+
+def observe(db_name: str, endpoint: str, latency: float) -> None:
+    """Record the latency of a request against an endpoint of a database."""
+    get_latency_window(db_name, endpoint).record(latency)
+
+
+def get_hedge_delay(db_name: str, endpoint: str) -> float | None:
+    """Get the seconds after which a hedged request is sent.
+
+    Returns:
+        float | None: The configured percentile of the recent latencies or None if requests
+            against the endpoint are not hedged.
+    """
+    if endpoint not in HEDGE_ENDPOINTS or not config.get_hedge_requests():
+        return None
+
+    window = get_latency_window(db_name, endpoint)
+    if len(window) < MIN_SAMPLES:
+        return None
+
+    return window.percentile(config.get_hedge_percentile())
+
+
+def hedge(send: Callable[[], T], delay: float, cancel: Callable[[T], None]) -> T:
+    """Send a request and a second identical one if the first takes longer than `delay`.
+
+    Requests already on the wire cannot be aborted by `requests`, so the response of
+    the slower request is passed to `cancel` once it arrives.
+
+    Args:
+        send (Callable[[], T]): Send the request and return the response.
+        delay (float): Seconds to wait for the first response before hedging.
+        cancel (Callable[[T], None]): Release the response of the slower request.
+
+    Returns:
+        T: The first successful response.
+    """
+    executor = _get_executor()
+    pending = [executor.submit(send)]
+
+    done, _ = futures.wait(pending, timeout=delay)
+    if not done:
+        logger.debug("No response after %.2f seconds, sending a hedged request.", delay)
+        pending.append(executor.submit(send))
+
+    error: BaseException | None = None
+    for future in futures.as_completed(pending):
+        error = future.exception()
+        if error is None:
+            for other in pending:
+                if other is not future and not other.cancel():
+                    other.add_done_callback(
+                        lambda f: cancel(f.result()) if f.exception() is None else None
+                    )
+            return future.result()
+
+    assert error is not None  # nosec assert_used
+    raise error
+
+
+async def ahedge(send: Callable[[], Awaitable[T]], delay: float) -> T:
+    """Asynchronous variant of `hedge`, cancelling the slower request right away."""
+    pending = [asyncio.ensure_future(send())]
+
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            logger.debug("No response after %.2f seconds, sending a hedged request.", delay)
+            pending.append(asyncio.ensure_future(send()))
+
+        error: BaseException | None = None
+        for next_done in asyncio.as_completed(pending):
+            try:
+                return await next_done
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                error = e
+
+        assert error is not None  # nosec assert_used
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def reset() -> None:
+    """Forget all observed latencies."""
+    with _lock:
+        _windows.clear()
+
+
+def _get_executor() -> futures.ThreadPoolExecutor:
+    global _executor  # pylint: disable=global-statement
+
+    with _lock:
+        if _executor is None:
+            _executor = futures.ThreadPoolExecutor(thread_name_prefix="pystatis-hedge")
+
+    return _executor
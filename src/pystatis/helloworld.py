@@ -3,7 +3,7 @@
 import requests
 
 from pystatis import db
-from pystatis.http_helper import _check_invalid_status_code
+from pystatis.http_helper import _check_invalid_status_code, get_session
 
 
 def whoami(db_name: str) -> str:
@@ -20,7 +20,7 @@ def whoami(db_name: str) -> str:
     url = f"{db.get_host(db_name)}" + "helloworld/whoami"
 
     try:
-        response = requests.get(url, timeout=(30, 15))
+        response = get_session(db_name).get(url, timeout=(30, 15))
     except requests.exceptions.Timeout:
         raise TimeoutError("Login request timed out after 15 minutes")
 
@@ -56,7 +56,7 @@ def logincheck(db_name: str) -> str:
         "language": "de",
     }
 
-    response = requests.post(url, headers=headers, data=params, timeout=(30, 15))
+    response = get_session(db_name).post(url, headers=headers, data=params, timeout=(30, 15))
 
     # NOTE: Cannot use get_data_from_endpoint due to colliding
     # and misleading usage of "Status" key in API response
@@ -1,20 +1,80 @@
 """Wrapper module for the data endpoint."""
 
+import asyncio
+import itertools
 import json
 import logging
+import random
 import re
+import threading
 import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from dataclasses import dataclass
+from types import ModuleType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Iterator,
+    NoReturn,
+    TypeAlias,
+)
 
 import requests
-
-from pystatis import cache, config, db
-from pystatis.exception import DestatisStatusError, NoNewerDataError, TableNotFoundError
+from requests.adapters import HTTPAdapter
+
+from pystatis import (
+    cache,
+    circuit,
+    config,
+    db,
+    hedging,
+    jobs,
+    manifest,
+    response_cache,
+    throttle,
+)
+from pystatis.exception import (
+    DestatisStatusError,
+    NoNewerDataError,
+    RetryLimitExceededError,
+    TableNotFoundError,
+)
 from pystatis.types import ParamDict
 
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 JOB_ID_PATTERN = re.compile(r"(?<=:\s).*_\d+")
 JOB_TIMEOUT = 3000
+# size of the chunks in which streamed data responses are written to the cache
+CHUNK_SIZE = 1024 * 1024
+# content types of data responses, whose body is never a JSON status envelope
+DATA_CONTENT_TYPES = ("csv", "zip", "octet-stream")
+# HTTP status codes of transient errors, requests failing with them are retried
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+AnyResponse: TypeAlias = "requests.Response | httpx.Response"
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_async_client_closers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGenerator[None, None]]" = weakref.WeakKeyDictionary()
+# downloads running right now by their cache key, shared by identical concurrent requests
+_in_flight: dict[str, "Future[bytes]"] = {}
+_in_flight_lock = threading.Lock()
+# revalidations of cached data running in the background by their cache key
+_revalidating: dict[str, "Future[bool]"] = {}
+_revalidate_lock = threading.Lock()
+_revalidate_executor: ThreadPoolExecutor | None = None
+# parsed JSON bodies of responses, so every response is decoded at most once
+_json_bodies: "weakref.WeakKeyDictionary[AnyResponse, dict | None]" = weakref.WeakKeyDictionary()
 
 
 def load_data(
@@ -22,11 +82,20 @@ def load_data(
     method: str,
     params: ParamDict,
     db_name: str | None = None,
+    refresh: bool = False,
 ) -> bytes:
     """Load data identified by endpoint, method and params.
 
     Either load data from cache (previous download) or from Destatis.
     If no database is given, params has to have a valid value for "name" key.
+    With `refresh`, cached data is returned right away and a newer version is downloaded
+    in the background if there is one, see `revalidate`.
+
+    Identical data requests running at the same time in different threads share a single
+    download. With the `file_lock` option in the `data` section of the config, processes
+    sharing the cache directory also wait for each other instead of downloading the same data.
+    Responses of the `metadata`, `catalogue` and `find` endpoints are cached for a time to
+    live, see `response_cache`.
 
     Args:
         endpoint (str): The endpoint for this data request.
@@ -34,6 +103,8 @@ def load_data(
         params (dict): The dictionary holding the params for this data request.
         db_name (str, optional): The database to use for this data request.
             One of "genesis", "zensus", "regio". Defaults to None.
+        refresh (bool, optional): Revalidate cached tables in the background.
+            Defaults to False.
 
     Returns:
         bytes: The response content as bytes data.
@@ -48,46 +119,384 @@ def load_data(
         if cache.hit_in_cash(cache_dir, name, params):
             data = cache.read_from_cache(cache_dir, name, params)
             logger.info("Data was loaded from cache.")
+            if refresh and method == "tablefile":
+                revalidate(params, db_name)
         else:
-            response = get_data_from_endpoint(endpoint, method, params, db_name)
-            content_type = response.headers.get("Content-Type", "text/csv").split("/")[-1]
-            data = response.content
+            data = _single_flight(
+                cache.get_cache_key(name, params),
+                lambda: _download_data(cache_dir, name, endpoint, method, params, db_name),
+            )
+    elif response_cache.get_ttl(endpoint, method) > 0:
+        db_name = _resolve_db_name(params, db_name)
+        cached = response_cache.read_response(cache_dir, endpoint, method, params, db_name)
+        if cached is not None:
+            data = cached
+            logger.info("Response was loaded from cache.")
+        else:
+            data = get_data_from_endpoint(endpoint, method, params, db_name).content
+            response_cache.cache_response(cache_dir, endpoint, method, params, db_name, data)
+    else:
+        response = get_data_from_endpoint(endpoint, method, params, db_name)
+        data = response.content
+
+    return data
 
-            # status code 98 means that the table is too big
-            # we have to start a job and wait for it to be ready
-            response_status_code = 200
-            try:
-                # test for job-relevant status code
-                response_status_code = response.json().get("Status").get("Code")
-            except (json.decoder.JSONDecodeError, requests.exceptions.JSONDecodeError):
-                pass
-
-            if response_status_code == 98:
-                job_response = start_job(endpoint, method, params)
-                job_id = get_job_id_from_response(job_response)
-                logger.warning(
-                    "Verarbeitung im Hintergrund erfolgreich gestartet. Job-ID: %s.",
-                    job_id,
-                )
-                response = get_data_from_resultfile(job_id, params, db_name)
-                assert isinstance(response.content, bytes)  # nosec assert_used
-                content_type = response.headers.get("Content-Type", "text/csv").split("/")[-1]
-                data = response.content
 
-            cache.cache_data(cache_dir, name, params, data, content_type)
+def _single_flight(key: str, download: Callable[[], bytes]) -> bytes:
+    """Run a download once for all threads requesting the same key at the same time."""
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        is_leader = future is None
+        if future is None:
+            future = _in_flight[key] = Future()
 
-            # bytes response in case of zip content type cannot be directly decoded, so we have to load the zip first!
-            if content_type == "zip":
-                data = cache.read_from_cache(cache_dir, name, params)
+    if not is_leader:
+        logger.info("Waiting for an identical request running in another thread.")
+        return future.result()
+
+    try:
+        data = download()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
     else:
-        response = get_data_from_endpoint(endpoint, method, params, db_name)
+        future.set_result(data)
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+
+    return data
+
+
+def revalidate(params: ParamDict, db_name: str | None = None) -> "Future[bool]":
+    """Download a newer version of a cached table in the background if there is one.
+
+    The tablefile is requested with `stand` set to the time the cached version was
+    downloaded. GENESIS-Online answers with status code 50 (`NoNewerDataError`) if the
+    table was not updated since, then only the time of the check is recorded in the cache
+    index (`manifest.Entry.checked`). Otherwise the new data is cached and replaces the
+    cached version for later requests. A revalidation already running for the same
+    request is shared.
+
+    Args:
+        params (dict): The dictionary holding the params for this data request.
+        db_name (str, optional): The database to use for this data request.
+            One of "genesis", "zensus", "regio". Defaults to None.
+
+    Returns:
+        Future[bool]: Resolves to True if a newer version was cached.
+    """
+    global _revalidate_executor  # pylint: disable=global-statement
+
+    cache_dir = config.get_cache_dir()
+    name = cache.normalize_name(params["name"])
+    key = cache.get_cache_key(name, params)
+
+    with _revalidate_lock:
+        future = _revalidating.get(key)
+        if future is not None:
+            return future
+
+        if _revalidate_executor is None:
+            _revalidate_executor = ThreadPoolExecutor(thread_name_prefix="pystatis-revalidate")
+        future = _revalidating[key] = _revalidate_executor.submit(
+            _revalidate, cache_dir, name, params, db_name
+        )
+
+    def done(future: "Future[bool]") -> None:
+        with _revalidate_lock:
+            _revalidating.pop(key, None)
+        if (error := future.exception()) is not None:
+            logger.warning("Failed to revalidate the cached data of %s: %s", name, error)
+
+    future.add_done_callback(done)
+
+    return future
+
+
+def _revalidate(cache_dir: str, name: str, params: ParamDict, db_name: str | None) -> bool:
+    """Revalidate the cached version of a table, see `revalidate`."""
+    entry = cache.get_latest_entry(cache_dir, name, params)
+    if entry is None:
+        return False
+
+    # the cache records UTC, which is behind German time, so no update is missed
+    stand = time.strftime("%d.%m.%Y %H:%M", time.gmtime(entry.created))
+    try:
+        response = get_data_from_endpoint(
+            "data", "tablefile", {**params, "stand": stand}, db_name, stream=True
+        )
+        if _get_destatis_status_code(response) == 98:
+            # the table is too big, so we start a job for it, again with `stand`, as the
+            # server may check the size first; `JobManager.submit` would return the
+            # cached version instead
+            response.close()
+            jobs.record_large_request(params)
+            job_response = start_job("data", "tablefile", {**params, "stand": stand}, db_name)
+        else:
+            job_response = None
+    except NoNewerDataError:
+        manifest.set_checked(cache_dir, entry.key, entry.version)
+        logger.info("The cached data of %s is up to date.", name)
+        return False
+
+    # the data is cached under the original params, not those with `stand`
+    if job_response is not None:
+        if not _is_json_response(job_response):
+            _cache_response(cache_dir, name, params, job_response)
+        else:
+            job_id = get_job_id_from_response(job_response)
+            if not job_id:
+                raise DestatisStatusError(f"Could not start a job for {params['name']}.")
+            jobs.get_job_manager().watch(job_id, params, db_name).result()
+    else:
+        _cache_response(cache_dir, name, params, response)
+
+    logger.info("Cached a newer version of %s.", name)
+
+    return True
+
+
+def _download_data(
+    cache_dir: str,
+    name: str,
+    endpoint: str,
+    method: str,
+    params: ParamDict,
+    db_name: str | None,
+) -> bytes:
+    """Download data into the cache, see `load_data`."""
+    lock = cache.file_lock(cache_dir, name, params) if config.get_file_lock() else nullcontext()
+
+    with lock:
+        if cache.hit_in_cash(cache_dir, name, params):
+            # downloaded by another process while waiting for the lock
+            logger.info("Data was loaded from cache.")
+            return cache.read_from_cache(cache_dir, name, params)
+
+        if (
+            resumed := jobs.get_job_manager().resume(params) or jobs.get_job_manager().reuse(params)
+        ) is not None:
+            # a job for this request was started by an earlier process
+            return resumed.result()
+
+        if method == "tablefile" and jobs.is_large_request(params):
+            # the table was too big before, so we start a job right away
+            return jobs.get_job_manager().submit(params, db_name).result()
+
+        response = get_data_from_endpoint(endpoint, method, params, db_name, stream=True)
+
+        # status code 98 means that the table is too big
+        # we have to start a job and wait for it to be ready
+        if _get_destatis_status_code(response) == 98:
+            response.close()
+            jobs.record_large_request(params)
+            # the shared job manager polls all running jobs together and caches the result
+            return jobs.get_job_manager().submit(params, db_name).result()
+
+        return _cache_response(cache_dir, name, params, response)
+
+
+async def load_data_async(
+    endpoint: str,
+    method: str,
+    params: ParamDict,
+    db_name: str | None = None,
+    refresh: bool = False,
+) -> bytes:
+    """Asynchronous variant of `load_data`.
+
+    Requests are sent with `httpx` and waiting for background jobs does not block the event loop.
+    Cache access runs in a worker thread.
+    Requires the optional async dependencies (`pip install pystatis[async]`).
+
+    Args:
+        endpoint (str): The endpoint for this data request.
+        method (str): The method for this data request.
+        params (dict): The dictionary holding the params for this data request.
+        db_name (str, optional): The database to use for this data request.
+            One of "genesis", "zensus", "regio". Defaults to None.
+        refresh (bool, optional): Revalidate cached tables in the background.
+            Defaults to False.
+
+    Returns:
+        bytes: The response content as bytes data.
+    """
+    cache_dir = config.get_cache_dir()
+    name = params.get("name")
+
+    if name is not None:
+        name = cache.normalize_name(name)
+
+    if endpoint == "data":
+        if await asyncio.to_thread(cache.hit_in_cash, cache_dir, name, params):
+            data = await asyncio.to_thread(cache.read_from_cache, cache_dir, name, params)
+            logger.info("Data was loaded from cache.")
+            if refresh and method == "tablefile":
+                revalidate(params, db_name)
+        else:
+            # the number of tables downloaded in parallel adapts to the health of the database
+            adaptive_limit = throttle.get_adaptive_limit(_resolve_db_name(params, db_name))
+            async with adaptive_limit.aslot():
+                data = await _download_data_async(
+                    cache_dir, name, endpoint, method, params, db_name
+                )
+    elif response_cache.get_ttl(endpoint, method) > 0:
+        db_name = _resolve_db_name(params, db_name)
+        cached = await asyncio.to_thread(
+            response_cache.read_response, cache_dir, endpoint, method, params, db_name
+        )
+        if cached is not None:
+            data = cached
+            logger.info("Response was loaded from cache.")
+        else:
+            response = await get_data_from_endpoint_async(endpoint, method, params, db_name)
+            data = response.content
+            await asyncio.to_thread(
+                response_cache.cache_response, cache_dir, endpoint, method, params, db_name, data
+            )
+    else:
+        response = await get_data_from_endpoint_async(endpoint, method, params, db_name)
         data = response.content
 
     return data
 
 
+async def _download_data_async(
+    cache_dir: str,
+    name: str,
+    endpoint: str,
+    method: str,
+    params: ParamDict,
+    db_name: str | None,
+) -> bytes:
+    """Download data into the cache, see `load_data_async`.
+
+    Background jobs are left to the shared job manager, like in `load_data`,
+    and awaited without blocking the event loop.
+    """
+    manager = jobs.get_job_manager()
+
+    if await asyncio.to_thread(_has_job, method, params):
+        # a job for this request was started by an earlier process or the table was
+        # too big before, the job manager resumes or starts the job
+        return await asyncio.wrap_future(manager.submit(params, db_name))
+
+    response = await get_data_from_endpoint_async(endpoint, method, params, db_name)
+
+    # status code 98 means that the table is too big
+    if _get_destatis_status_code(response) == 98:
+        await asyncio.to_thread(jobs.record_large_request, params)
+        return await asyncio.wrap_future(manager.submit(params, db_name))
+
+    return await asyncio.to_thread(_cache_response, cache_dir, name, params, response)
+
+
+def _has_job(method: str, params: ParamDict) -> bool:
+    """Check if a request is journaled with a job or was too big for a direct download before."""
+    return (
+        jobs.get_journaled_job(params) is not None
+        or jobs.get_finished_job(params) is not None
+        or (method == "tablefile" and jobs.is_large_request(params))
+    )
+
+
+def _cache_response(
+    cache_dir: str, name: str | None, params: ParamDict, response: AnyResponse
+) -> bytes:
+    """Cache the content of a data response and return it as uncompressed bytes.
+
+    The content is written chunk by chunk into the cache, so a streamed response
+    is never held in memory as a whole in addition to the cached data.
+    """
+    content_type = response.headers.get("Content-Type", "text/csv").split("/")[-1]
+
+    if isinstance(response, requests.Response):
+        chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+    else:
+        chunks = response.iter_bytes(chunk_size=CHUNK_SIZE)
+
+    if not cache.cache_stream(cache_dir, name, params, chunks, content_type):
+        return response.content
+
+    # read back the single file from the archive, also required to decode zip content
+    return cache.read_from_cache(cache_dir, name, params)
+
+
+def _is_json_response(response: AnyResponse) -> bool:
+    """Check if the content type of a response announces a JSON body."""
+    return "json" in response.headers.get("Content-Type", "")
+
+
+def _is_data_response(response: AnyResponse) -> bool:
+    """Check if the content type of a response announces a data body (CSV, zip, ...)."""
+    content_type = response.headers.get("Content-Type", "")
+    return any(data_type in content_type for data_type in DATA_CONTENT_TYPES)
+
+
+def _get_json_body(response: AnyResponse, sniff: bool = True) -> dict | None:
+    """Classify a response and parse its JSON body, if any, exactly once.
+
+    Data responses are recognized by their content type and never decoded. A body without
+    a telling content type is only decoded if its first bytes look like JSON.
+
+    Args:
+        response (requests.Response | httpx.Response): The response to classify.
+        sniff (bool, optional): Look at the first bytes of a body without a telling content type.
+            Has to be False for a streamed body that must stay unread. Defaults to True.
+
+    Returns:
+        dict | None: The parsed JSON object or None if the body is not a JSON object.
+    """
+    if response in _json_bodies:
+        return _json_bodies[response]
+
+    if _is_json_response(response):
+        is_json = True
+    elif _is_data_response(response):
+        is_json = False
+    elif not sniff:
+        # undecided, the body may be sniffed by a later call
+        return None
+    else:
+        is_json = response.content[:64].lstrip()[:1] == b"{"
+
+    body = None
+    if is_json:
+        try:
+            body = response.json()
+        # catch possible errors raised by .json() (and only .json())
+        except (
+            UnicodeDecodeError,
+            json.decoder.JSONDecodeError,
+            requests.exceptions.JSONDecodeError,
+        ):
+            body = None
+
+    if not isinstance(body, dict):
+        body = None
+
+    _json_bodies[response] = body
+    return body
+
+
+def _get_destatis_status_code(response: AnyResponse) -> int:
+    """Get the Destatis status code of a response, 200 if the response has no status."""
+    # do not read (and try to decode) the body of data responses
+    body = _get_json_body(response, sniff=False)
+    if body is None:
+        return 200
+
+    # test for job-relevant status code
+    return (body.get("Status") or {}).get("Code", 200)
+
+
 def get_data_from_endpoint(
-    endpoint: str, method: str, params: ParamDict, db_name: str | None = None
+    endpoint: str,
+    method: str,
+    params: ParamDict,
+    db_name: str | None = None,
+    stream: bool = False,
 ) -> requests.Response:
     """
     Wrapper method which constructs a url for querying data from Destatis and
@@ -99,24 +508,271 @@ def get_data_from_endpoint(
         params (dict): dictionary of query parameters
         db_name (str, optional): The database to use for this data request.
             One of "genesis", "zensus", "regio". Defaults to None.
+        stream (bool, optional): Do not download the response body immediately,
+            so it can be consumed in chunks, e.g. with `response.iter_content()`.
+            The Destatis status is then only checked for JSON responses. Defaults to False.
 
     Returns:
         requests.Response: the response object holding the response from calling the Destatis endpoint.
     """
+    db_name = _resolve_db_name(params, db_name)
+    url, headers = _build_request(db_name, endpoint, method)
+    policy = RetryPolicy.from_config()
+    delays = policy.delays()
+    deadline = time.monotonic() + policy.deadline
+
+    breaker = circuit.get_circuit_breaker(db_name)
+
+    for attempt in range(1, policy.max_attempts + 1):
+        breaker.before_request()
+        started = time.perf_counter()
+        # params is used to calculate hash for caching so don't alter params dict here!
+        try:
+            response = _send(
+                db_name,
+                endpoint,
+                lambda: get_session(db_name).post(
+                    url, headers=headers, data=params, timeout=(30, 300), stream=stream
+                ),
+                stream=stream,
+            )
+        except requests.exceptions.Timeout as tout:
+            _record_attempt(db_name, endpoint, method, time.perf_counter() - started, None)
+            _log_timeout(endpoint, method)
+            error: Exception = tout
+            reached_server = isinstance(tout, requests.exceptions.ReadTimeout)
+        except requests.exceptions.ConnectionError as e:
+            _record_attempt(db_name, endpoint, method, time.perf_counter() - started, None)
+            error = e
+            reached_server = False
+        else:
+            _record_attempt(db_name, endpoint, method, time.perf_counter() - started, response)
+            if response.status_code not in RETRY_STATUS_CODES:
+                break
+
+            error = requests.exceptions.HTTPError(
+                f"The server returned a {response.status_code} status code."
+            )
+            reached_server = response.status_code == 504
+            delays = _retry_after(response, delays)
+            response.close()
+
+        if reached_server and _is_job_start(params):
+            _raise_job_start_failed(endpoint, method, error)
+
+        delay = next(delays)
+        if attempt == policy.max_attempts or time.monotonic() + delay > deadline:
+            _raise_retry_limit_exceeded(endpoint, method, attempt, error)
+
+        _log_retry(endpoint, method, attempt, policy.max_attempts, delay, error)
+        time.sleep(delay)
+
+    response.encoding = "UTF-8"
+    _check_response(response, method, stream)
+
+    return response
+
+
+async def get_data_from_endpoint_async(
+    endpoint: str, method: str, params: ParamDict, db_name: str | None = None
+) -> "httpx.Response":
+    """Asynchronous variant of `get_data_from_endpoint` based on `httpx`.
+
+    Args:
+        endpoint (str): Destatis endpoint (eg. data, catalogue, ..)
+        method (str): Destatis method (eg. tablefile, ...)
+        params (dict): dictionary of query parameters
+        db_name (str, optional): The database to use for this data request.
+            One of "genesis", "zensus", "regio". Defaults to None.
+
+    Returns:
+        httpx.Response: the response object holding the response from calling the Destatis endpoint.
+    """
+    httpx = _import_httpx()
+    db_name = _resolve_db_name(params, db_name)
+    url, headers = _build_request(db_name, endpoint, method)
+
+    policy = RetryPolicy.from_config()
+    delays = policy.delays()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline
 
-    def get_response(db_name: str, params: ParamDict) -> requests.Response:
-        db_host, db_user, db_pw = db.get_settings(db_name)
-        url = f"{db_host}{endpoint}/{method}"
+    breaker = circuit.get_circuit_breaker(db_name)
 
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "username": db_user,
-            "password": db_pw,
-        }
+    for attempt in range(1, policy.max_attempts + 1):
+        if not breaker.is_closed:
+            # probing the database blocks, so it runs in a worker thread
+            await asyncio.to_thread(breaker.before_request)
 
-        return requests.post(url, headers=headers, data=params, timeout=(30, 300))
+        started = loop.time()
+        try:
+            response = await _send_async(
+                db_name,
+                endpoint,
+                lambda: get_async_client(db_name).post(url, headers=headers, data=params),
+            )
+        except httpx.TimeoutException as tout:
+            _record_attempt(db_name, endpoint, method, loop.time() - started, None)
+            _log_timeout(endpoint, method)
+            error: Exception = tout
+            reached_server = isinstance(tout, httpx.ReadTimeout)
+        except httpx.TransportError as e:
+            _record_attempt(db_name, endpoint, method, loop.time() - started, None)
+            error = e
+            reached_server = False
+        else:
+            _record_attempt(db_name, endpoint, method, loop.time() - started, response)
+            if response.status_code not in RETRY_STATUS_CODES:
+                break
 
-    # Determine database by matching regex to item code
+            error = httpx.HTTPStatusError(
+                f"The server returned a {response.status_code} status code.",
+                request=response.request,
+                response=response,
+            )
+            reached_server = response.status_code == 504
+            delays = _retry_after(response, delays)
+
+        if reached_server and _is_job_start(params):
+            _raise_job_start_failed(endpoint, method, error)
+
+        delay = next(delays)
+        if attempt == policy.max_attempts or loop.time() + delay > deadline:
+            _raise_retry_limit_exceeded(endpoint, method, attempt, error)
+
+        _log_retry(endpoint, method, attempt, policy.max_attempts, delay, error)
+        await asyncio.sleep(delay)
+
+    response.encoding = "UTF-8"
+    _check_response(response, method)
+
+    return response
+
+
+def _send(
+    db_name: str, endpoint: str, send: Callable[[], requests.Response], stream: bool = False
+) -> requests.Response:
+    """Send a request within the limits of the database, hedged if enabled for the endpoint.
+
+    Args:
+        db_name (str): The database the request is sent to.
+        endpoint (str): The endpoint of the request, see `hedging.HEDGE_ENDPOINTS`.
+        send (Callable[[], requests.Response]): Send the request once.
+        stream (bool, optional): The body of the response is read later, the in-flight
+            slot is held until then, see `_release_when_read`. Defaults to False.
+
+    Returns:
+        requests.Response: The first response received.
+    """
+
+    def send_throttled() -> requests.Response:
+        slot = ExitStack()
+        slot.enter_context(throttle.throttle(db_name))
+        try:
+            started = time.perf_counter()
+            response = send()
+        except BaseException:
+            slot.close()
+            raise
+        hedging.observe(db_name, endpoint, time.perf_counter() - started)
+
+        if stream:
+            _release_when_read(response, slot.close)
+        else:
+            slot.close()
+
+        return response
+
+    if (delay := hedging.get_hedge_delay(db_name, endpoint)) is None:
+        return send_throttled()
+
+    return hedging.hedge(send_throttled, delay, cancel=lambda response: response.close())
+
+
+def _release_when_read(response: requests.Response, release: Callable[[], None]) -> None:
+    """Call `release` once the body of a streamed response is read or the response is closed.
+
+    The body is read through `iter_content`, also by `response.content`. A response that is
+    dropped without either is released when it is garbage collected.
+    """
+    iter_content = response.iter_content
+    close = response.close
+
+    def iter_content_then_release(*args: Any, **kwargs: Any) -> Iterator[bytes]:
+        try:
+            yield from iter_content(*args, **kwargs)
+        finally:
+            release()
+
+    def close_then_release() -> None:
+        try:
+            close()
+        finally:
+            release()
+
+    response.iter_content = iter_content_then_release  # type: ignore[method-assign]
+    response.close = close_then_release  # type: ignore[method-assign]
+    weakref.finalize(response, release)
+
+
+async def _send_async(
+    db_name: str, endpoint: str, send: "Callable[[], Awaitable[httpx.Response]]"
+) -> "httpx.Response":
+    """Asynchronous variant of `_send`."""
+    loop = asyncio.get_running_loop()
+
+    async def send_throttled() -> "httpx.Response":
+        async with throttle.athrottle(db_name):
+            started = loop.time()
+            response = await send()
+        hedging.observe(db_name, endpoint, loop.time() - started)
+
+        return response
+
+    if (delay := hedging.get_hedge_delay(db_name, endpoint)) is None:
+        return await send_throttled()
+
+    return await hedging.ahedge(send_throttled, delay)
+
+
+def _record_attempt(
+    db_name: str, endpoint: str, method: str, latency: float, response: "AnyResponse | None"
+) -> None:
+    """Feed the outcome of a request into the adaptive limit and the circuit breaker.
+
+    Args:
+        db_name (str): The database the request was sent to.
+        endpoint (str): The endpoint of the request.
+        method (str): The method of the request.
+        latency (float): Seconds the request took.
+        response (requests.Response | httpx.Response | None): The response or None if
+            the request failed with a timeout or a connection error.
+    """
+    throttle.observe(
+        db_name, endpoint, method, latency, response is not None and _is_healthy(response)
+    )
+
+    breaker = circuit.get_circuit_breaker(db_name)
+    if response is None or response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+def _is_healthy(response: AnyResponse) -> bool:
+    """Check if a response indicates a healthy server, see `throttle.AdaptiveLimit`.
+
+    Server errors, throttling and status code 98 (the server refused to compute a table
+    directly) are signs of an overloaded server.
+    """
+    if response.status_code >= 500 or response.status_code in RETRY_STATUS_CODES:
+        return False
+
+    return _get_destatis_status_code(response) != 98
+
+
+def _resolve_db_name(params: ParamDict, db_name: str | None) -> str:
+    """Determine the database by matching regex to item code if no database is given."""
     if db_name is None:
         table_name = params.get("name", params.get("selection", ""))
 
@@ -124,37 +780,276 @@ def get_data_from_endpoint(
         db_name = db.select_db_by_credentials(db_matches)
         logger.info("Database selected: %s", db_name)
 
-    # params is used to calculate hash for caching so don't alter params dict here!
-    try:
-        response = get_response(db_name, params)
-    except requests.exceptions.Timeout as tout:
-        logger.error(
-            "Initial request against %s/%s timed out after %s minutes. "
-            "Probably a problem with the API. "
-            "You can try again later or use the web interface.",
-            endpoint,
-            method,
-            300 // 60,
+    return db_name
+
+
+def _build_request(db_name: str, endpoint: str, method: str) -> tuple[str, dict[str, str]]:
+    """Build url and headers holding the credentials for a request against a database."""
+    db_host, db_user, db_pw = db.get_settings(db_name)
+    url = f"{db_host}{endpoint}/{method}"
+
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "username": db_user,
+        "password": db_pw,
+    }
+
+    return url, headers
+
+
+@dataclass
+class RetryPolicy:
+    """Retries of requests failing with a timeout, a connection error or a transient HTTP error.
+
+    The n-th retry waits `backoff * 2 ** (n - 1)` seconds, capped at `max_backoff` and
+    randomly shortened by up to half, so parallel clients do not retry in lockstep.
+    No retry is started that would end after `deadline` seconds since the first attempt.
+
+    Args:
+        max_attempts (int): Maximum number of attempts, including the first one.
+        backoff (float): Seconds to wait before the first retry.
+        max_backoff (float): Maximum seconds to wait between two attempts.
+        deadline (float): Maximum seconds from the first attempt until the last retry.
+    """
+
+    max_attempts: int = 4
+    backoff: float = 2.0
+    max_backoff: float = 60.0
+    deadline: float = 900.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        """Create the retry policy from the `http` section of the config."""
+        return cls(
+            max_attempts=config.get_retry_max_attempts(),
+            backoff=config.get_retry_backoff(),
+            max_backoff=config.get_retry_max_backoff(),
+            deadline=config.get_retry_deadline(),
         )
-        raise SystemExit(1) from tout
 
-    response.encoding = "UTF-8"
+    def delays(self) -> Iterator[float]:
+        """Generate the delays before the retries.
+
+        Yields:
+            float: The seconds to wait before the next attempt.
+        """
+        delay = self.backoff
+        while True:
+            yield delay * random.uniform(0.5, 1.0)  # nosec B311
+            delay = min(delay * 2, self.max_backoff)
+
+
+def _retry_after(response: AnyResponse, delays: Iterator[float]) -> Iterator[float]:
+    """Honour a `Retry-After` header (in seconds) for the next retry, if the server sent one."""
+    retry_after = response.headers.get("Retry-After", "")
+    if not retry_after.isdigit():
+        return delays
+
+    next(delays)
+    return itertools.chain([float(retry_after)], delays)
+
+
+def _log_retry(
+    endpoint: str, method: str, attempt: int, max_attempts: int, delay: float, error: Exception
+) -> None:
+    logger.warning(
+        "Request against %s/%s failed (attempt %s of %s): %s. Retrying in %.1f seconds.",
+        endpoint,
+        method,
+        attempt,
+        max_attempts,
+        error,
+        delay,
+    )
+
+
+def _raise_retry_limit_exceeded(
+    endpoint: str, method: str, attempts: int, error: Exception
+) -> NoReturn:
+    logger.error("Request against %s/%s failed %s times, giving up.", endpoint, method, attempts)
+    raise RetryLimitExceededError(
+        f"Request against {endpoint}/{method} failed after {attempts} attempts: {error}"
+    ) from error
+
+
+def _is_job_start(params: ParamDict) -> bool:
+    """Check if a request starts a background job, which must not be sent twice."""
+    return str(params.get("job", "")).lower() == "true"
+
+
+def _raise_job_start_failed(endpoint: str, method: str, error: Exception) -> NoReturn:
+    """Give up a request starting a job that may have reached the server.
+
+    Sending it again could start a second job, so it is not retried.
+    """
+    logger.error(
+        "Request against %s/%s starting a job failed, it is not retried as the job may "
+        "have been started anyway. See the result list (catalogue/results) for it.",
+        endpoint,
+        method,
+    )
+    raise RetryLimitExceededError(
+        f"Request against {endpoint}/{method} starting a job failed and is not retried: {error}"
+    ) from error
+
+
+def _log_timeout(endpoint: str, method: str) -> None:
+    logger.error(
+        "Initial request against %s/%s timed out after %s minutes. "
+        "Probably a problem with the API. "
+        "You can try again later or use the web interface.",
+        endpoint,
+        method,
+        300 // 60,
+    )
+
+
+def _check_response(response: AnyResponse, method: str, stream: bool = False) -> None:
+    """Check both the HTTP status code and the Destatis status code of a response."""
     _check_invalid_status_code(response)
 
     # logincheck endpoint only returns string status with failure/success information. No further check necessary.
+    # a streamed data body has to stay unread, only JSON status responses are checked then.
     if method != "logincheck":
-        _check_invalid_destatis_status_code(response)
+        _check_invalid_destatis_status_code(response, sniff=not stream)
 
-    return response
 
+def get_session(db_name: str) -> requests.Session:
+    """Get the shared keep-alive session for the given database.
+
+    Every database gets its own `requests.Session` with a connection pool, so consecutive
+    requests against the same host reuse open TCP/TLS connections instead of doing a new
+    handshake each time. Sessions are created lazily and can be used from multiple threads.
+
+    Args:
+        db_name (str): The database to get the session for.
+            One of "genesis", "zensus", "regio".
+
+    Returns:
+        requests.Session: the pooled session for this database.
+    """
+    with _sessions_lock:
+        session = _sessions.get(db_name)
+        if session is None:
+            pool_maxsize = config.get_pool_maxsize()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[db_name] = session
+            logger.debug("Created session for %s with pool size %d.", db_name, pool_maxsize)
+
+    return session
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions and their open connections.
+
+    New sessions are created on demand by the next request, e.g. after a change of the pool size.
+    """
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def get_async_client(db_name: str) -> "httpx.AsyncClient":
+    """Get the shared `httpx.AsyncClient` for the given database and the running event loop.
+
+    The async counterpart of `get_session`. Clients are bound to the event loop
+    they were created in, so every loop gets its own set of clients. They are closed
+    when the loop shuts down, e.g. at the end of `asyncio.run`, or by `close_async_clients`.
+
+    Args:
+        db_name (str): The database to get the client for.
+            One of "genesis", "zensus", "regio".
 
-def start_job(endpoint: str, method: str, params: ParamDict) -> requests.Response:
+    Returns:
+        httpx.AsyncClient: the pooled client for this database.
+    """
+    httpx = _import_httpx()
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+        _async_client_closers[loop] = _close_on_shutdown(clients)
+
+    client = clients.get(db_name)
+    if client is None:
+        pool_maxsize = config.get_pool_maxsize()
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+            ),
+            timeout=httpx.Timeout(300, connect=30),
+        )
+        clients[db_name] = client
+
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close all async clients of the running event loop."""
+    loop = asyncio.get_running_loop()
+    _async_clients.pop(loop, None)
+    if (closer := _async_client_closers.pop(loop, None)) is not None:
+        await closer.aclose()
+
+
+def _close_on_shutdown(
+    clients: "dict[str, httpx.AsyncClient]",
+) -> AsyncGenerator[None, None]:
+    """Close the clients of the running event loop when the loop shuts down.
+
+    Event loops close their unfinished async generators on shutdown (see
+    `loop.shutdown_asyncgens`, called by `asyncio.run`), so the clients are closed
+    in the `finally` block of an async generator suspended until then.
+
+    Returns:
+        AsyncGenerator[None, None]: The suspended generator, closing the clients on `aclose`.
+    """
+
+    async def keep_open() -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            for client in clients.values():
+                await client.aclose()
+
+    closer = keep_open()
+    # advance to the `yield` without awaiting, this registers the generator with the loop
+    try:
+        closer.__anext__().send(None)
+    except StopIteration:
+        pass
+
+    return closer
+
+
+def _import_httpx() -> ModuleType:
+    """Import the optional `httpx` dependency of the async API."""
+    try:
+        import httpx  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError(
+            "The async API of pystatis requires httpx. "
+            "Please install it with `pip install pystatis[async]`."
+        ) from e
+
+    return httpx
+
+
+def start_job(
+    endpoint: str, method: str, params: ParamDict, db_name: str | None = None
+) -> requests.Response:
     """Small helper function to start a job in the background.
 
     Args:
         endpoint (str): Destatis endpoint (eg. data, catalogue, ..)
         method (str): Destatis method (eg. tablefile, ...)
         params (dict): Dictionary of query parameters.
+        db_name (str, optional): The database to use for this data request.
+            One of "genesis", "zensus", "regio". Defaults to None.
 
     Returns:
         requests.Response: the response object holding the response from calling the Destatis endpoint.
@@ -166,12 +1061,29 @@ def start_job(endpoint: str, method: str, params: ParamDict) -> requests.Respons
     job_params["job"] = "true"
 
     # starting a job
-    response = get_data_from_endpoint(endpoint=endpoint, method=method, params=job_params)
+    response = get_data_from_endpoint(
+        endpoint=endpoint, method=method, params=job_params, db_name=db_name
+    )
 
     return response
 
 
-def get_job_id_from_response(response: requests.Response) -> str:
+async def start_job_async(
+    endpoint: str, method: str, params: ParamDict, db_name: str | None = None
+) -> "httpx.Response":
+    """Asynchronous variant of `start_job`."""
+    logger.warning(
+        "Die Tabelle ist zu groß, um direkt abgerufen zu werden. Es wird eine Verarbeitung im Hintergrund gestartet."
+    )
+    job_params = params.copy()
+    job_params["job"] = "true"
+
+    return await get_data_from_endpoint_async(
+        endpoint=endpoint, method=method, params=job_params, db_name=db_name
+    )
+
+
+def get_job_id_from_response(response: AnyResponse) -> str:
     """Get the job ID of a successfully started job.
 
     Args:
@@ -181,11 +1093,8 @@ def get_job_id_from_response(response: requests.Response) -> str:
         str: the job id.
     """
     # check out job_id & inform user
-    content = ""
-    try:
-        content = response.json().get("Status").get("Content")
-    except json.JSONDecodeError:
-        pass
+    body = _get_json_body(response) or {}
+    content = (body.get("Status") or {}).get("Content") or ""
 
     match_result = JOB_ID_PATTERN.search(content)
     job_id = match_result.group() if match_result is not None else ""
@@ -194,7 +1103,7 @@ def get_job_id_from_response(response: requests.Response) -> str:
 
 
 def get_data_from_resultfile(
-    job_id: str, params: ParamDict, db_name: str | None = None
+    job_id: str, params: ParamDict, db_name: str | None = None, stream: bool = False
 ) -> requests.Response:
     """Get data from a job once it is finished or when the timeout is reached.
 
@@ -203,15 +1112,14 @@ def get_data_from_resultfile(
         params (dict): Dictionary of query parameters.
         db_name (str, optional): The database to use for this data request.
             One of "genesis", "zensus", "regio". Defaults to None.
+        stream (bool, optional): Stream the result file, see `get_data_from_endpoint`.
+            Defaults to False.
 
     Returns:
         requests.Response: the response object holding the response from calling the Destatis endpoint.
     """
-    job_params = {
-        "selection": job_id,
-        "area": "user",
-        "pagelength": "1",
-    }
+    job_params = _build_job_params(job_id)
+    delays = _get_poll_delays(params)
 
     time_ = time.perf_counter()
 
@@ -220,41 +1128,106 @@ def get_data_from_resultfile(
             response = get_data_from_endpoint(
                 endpoint="catalogue", method="results", params=job_params, db_name=db_name
             )
+            if _job_is_finished(response, job_id):
+                jobs.record_job_duration(params["name"], time.perf_counter() - time_)
+                break
+        except DestatisStatusError:
+            logger.info("Verarbeitung im Hintergrund läuft noch...")
+
+        time.sleep(next(delays))
+    else:
+        _raise_job_timeout()
+
+    params = params.copy()
+    params["name"] = job_id
+    response = get_data_from_endpoint(
+        endpoint="data", method="resultfile", params=params, db_name=db_name, stream=stream
+    )
+    return response
 
-            jobs = response.json().get("List")
-            if len(jobs) > 0:
-                logger.info(
-                    (
-                        "Verarbeitung im Hintergrund abgeschlossen. "
-                        "Ergebnis kann jetzt abgerufen werden über "
-                        "/data/resultfile und Job-ID: %s."
-                    ),
-                    job_id,
+
+async def get_data_from_resultfile_async(
+    job_id: str, params: ParamDict, db_name: str | None = None
+) -> "httpx.Response":
+    """Asynchronous variant of `get_data_from_resultfile`.
+
+    Waiting between two status requests is done with `asyncio.sleep`,
+    so the event loop stays responsive while the job is running.
+    """
+    job_params = _build_job_params(job_id)
+    delays = _get_poll_delays(params)
+
+    loop = asyncio.get_running_loop()
+    time_ = loop.time()
+
+    while (loop.time() - time_) < JOB_TIMEOUT:
+        try:
+            response = await get_data_from_endpoint_async(
+                endpoint="catalogue", method="results", params=job_params, db_name=db_name
+            )
+            if _job_is_finished(response, job_id):
+                await asyncio.to_thread(
+                    jobs.record_job_duration, params["name"], loop.time() - time_
                 )
                 break
         except DestatisStatusError:
             logger.info("Verarbeitung im Hintergrund läuft noch...")
 
-        time.sleep(5)
+        await asyncio.sleep(next(delays))
     else:
-        logger.error(
-            "Verarbeitungsfenster von %s Minuten überschritten. Job-Datei konnte nicht heruntergeladen werden.",
-            JOB_TIMEOUT // 60,
-        )
-        raise TimeoutError(
-            f"Verarbeitungsfenster von {JOB_TIMEOUT // 60} Minuten überschritten. "
-            "Job-Datei konnte nicht heruntergeladen werden."
-        )
+        _raise_job_timeout()
 
     params = params.copy()
     params["name"] = job_id
-    response = get_data_from_endpoint(
+    return await get_data_from_endpoint_async(
         endpoint="data", method="resultfile", params=params, db_name=db_name
     )
-    return response
 
 
-def _check_invalid_status_code(response: requests.Response) -> None:
+def _get_poll_delays(params: ParamDict) -> Iterator[float]:
+    """Get the delays between the status requests of a job, see `jobs.PollingStrategy`."""
+    strategy = jobs.PollingStrategy.from_config()
+    return strategy.delays(jobs.estimate_initial_delay(params["name"], strategy))
+
+
+def _build_job_params(job_id: str) -> ParamDict:
+    """Build the params to look up a job in the result list of the user."""
+    return {
+        "selection": job_id,
+        "area": "user",
+        "pagelength": "1",
+    }
+
+
+def _job_is_finished(response: AnyResponse, job_id: str) -> bool:
+    """Check if the result list of the user contains the result of the job."""
+    jobs = (_get_json_body(response) or {}).get("List")
+    if jobs:
+        logger.info(
+            (
+                "Verarbeitung im Hintergrund abgeschlossen. "
+                "Ergebnis kann jetzt abgerufen werden über "
+                "/data/resultfile und Job-ID: %s."
+            ),
+            job_id,
+        )
+        return True
+
+    return False
+
+
+def _raise_job_timeout() -> NoReturn:
+    logger.error(
+        "Verarbeitungsfenster von %s Minuten überschritten. Job-Datei konnte nicht heruntergeladen werden.",
+        JOB_TIMEOUT // 60,
+    )
+    raise TimeoutError(
+        f"Verarbeitungsfenster von {JOB_TIMEOUT // 60} Minuten überschritten. "
+        "Job-Datei konnte nicht heruntergeladen werden."
+    )
+
+
+def _check_invalid_status_code(response: AnyResponse) -> None:
     """
     Helper method which handles the status code from the response
 
@@ -265,10 +1238,7 @@ def _check_invalid_status_code(response: requests.Response) -> None:
         AssertionError: Assert that status is not 4xx or 5xx
     """
     if response.status_code // 100 in [4, 5]:
-        try:
-            body = response.json()
-        except json.JSONDecodeError:
-            body = {}
+        body = _get_json_body(response) or {}
 
         content = body.get("Content")
         code = body.get("Code")
@@ -278,24 +1248,18 @@ def _check_invalid_status_code(response: requests.Response) -> None:
         )
 
 
-def _check_invalid_destatis_status_code(response: requests.Response) -> None:
+def _check_invalid_destatis_status_code(response: AnyResponse, sniff: bool = True) -> None:
     """
     Helper method which handles the status code returned from Destatis
     (if exists)
 
     Args:
         response (requests.Response): The response object from the request
+        sniff (bool, optional): Look at the first bytes of a body without a telling
+            content type, see `_get_json_body`. Defaults to True.
 
     """
-    try:
-        response_dict = response.json()
-    # catch possible errors raised by .json() (and only .json())
-    except (
-        UnicodeDecodeError,
-        json.decoder.JSONDecodeError,
-        requests.exceptions.JSONDecodeError,
-    ):
-        response_dict = None
+    response_dict = _get_json_body(response, sniff)
 
     if response_dict is not None:
         _check_destatis_status(response_dict.get("Status", {}))
@@ -0,0 +1,633 @@
+"""Module provides a manager for background jobs (tables too large for direct download).
+
+Destatis answers requests for large tables with status code 98. These tables have to be
+requested again with `job=true`, which starts a job in the background whose result appears
+in the result list of the user (`catalogue/results`) once it is finished.
+
+The `JobManager` takes care of many such jobs at once: it starts all jobs immediately,
+polls their status together with a single result list request per database and downloads
+each result as soon as it is ready. Callers get a `concurrent.futures.Future` per request.
+
+Jobs are recorded in a journal within the cache directory, so a later process requesting
+the same data resumes waiting for a pending job instead of starting a new one, and downloads
+the result of a recently finished job again as long as it is in the result list of the user.
+"""
+
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Iterator
+
+from pystatis import cache, config, http_helper
+from pystatis.exception import DestatisStatusError
+from pystatis.types import ParamDict
+
+logger = logging.getLogger(__name__)
+
+# maximum number of entries of the result list fetched with a single request
+RESULTS_PAGELENGTH = 2500
+# longest time the poller sleeps at once, so it notices newly added jobs
+MAX_POLLER_SLEEP = 1.0
+# number of past job durations kept per table
+HISTORY_LENGTH = 10
+# seconds for which the result of a finished job is considered for reuse
+RESULT_REUSE_WINDOW = 24 * 60 * 60
+
+_state_lock = threading.Lock()
+
+
+@dataclass
+class PollingStrategy:
+    """Exponential backoff with jitter for polling the status of background jobs.
+
+    The first poll happens after `initial_delay` seconds, every further delay is `factor` times
+    the previous one, capped at `max_delay`. Each delay is randomly varied by +/- `jitter`
+    (a fraction of the delay), so many clients do not poll in lockstep.
+
+    Args:
+        initial_delay (float): Seconds before the first poll.
+        factor (float): Growth factor of the delay between two polls.
+        max_delay (float): Maximum seconds between two polls.
+        jitter (float): Relative random variation of every delay, between 0 and 1.
+    """
+
+    initial_delay: float = 5.0
+    factor: float = 1.5
+    max_delay: float = 60.0
+    jitter: float = 0.1
+
+    @classmethod
+    def from_config(cls) -> "PollingStrategy":
+        """Create the polling strategy from the `jobs` section of the config."""
+        return cls(
+            initial_delay=config.get_poll_initial_delay(),
+            factor=config.get_poll_factor(),
+            max_delay=config.get_poll_max_delay(),
+            jitter=config.get_poll_jitter(),
+        )
+
+    def delays(self, initial_delay: float | None = None) -> Iterator[float]:
+        """Generate the delays between the polls of a job.
+
+        Args:
+            initial_delay (float, optional): Seconds before the first poll,
+                e.g. estimated with `estimate_initial_delay`. Defaults to `self.initial_delay`.
+
+        Yields:
+            float: The seconds to wait before the next poll.
+        """
+        delay = self.initial_delay if initial_delay is None else initial_delay
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)  # nosec B311
+            delay = min(max(delay, self.initial_delay) * self.factor, self.max_delay)
+
+
+def estimate_initial_delay(name: str, strategy: PollingStrategy) -> float:
+    """Estimate when the job for a table will be finished from past jobs of this table.
+
+    The estimate is a bit shorter than the median of the recorded durations, so a job
+    that is as fast as usual is collected with the first poll.
+
+    Args:
+        name (str): The unique identifier of the table.
+        strategy (PollingStrategy): The strategy whose initial delay is used without history.
+
+    Returns:
+        float: The seconds to wait before the first poll.
+    """
+    durations = _read_state("history").get(cache.normalize_name(name), [])
+    if not durations:
+        return strategy.initial_delay
+
+    return max(strategy.initial_delay, 0.8 * statistics.median(durations))
+
+
+def record_job_duration(name: str, duration: float) -> None:
+    """Record how long a job for a table took to finish."""
+    name = cache.normalize_name(name)
+
+    with _state_lock:
+        history = _read_state("history")
+        history[name] = (history.get(name, []) + [round(duration, 1)])[-HISTORY_LENGTH:]
+        _write_state("history", history)
+
+
+def is_large_request(params: ParamDict) -> bool:
+    """Check if a tablefile request was too large for a direct download before.
+
+    Args:
+        params (dict): The params of the tablefile request, including "name".
+
+    Returns:
+        bool: True if the request was answered with status code 98 before,
+            so a job should be started right away.
+    """
+    return _get_journal_key(params) in _read_state("large")
+
+
+def record_large_request(params: ParamDict) -> None:
+    """Record that a tablefile request was answered with status code 98."""
+    key = _get_journal_key(params)
+
+    with _state_lock:
+        large = _read_state("large")
+        if key not in large:
+            large[key] = time.time()
+            _write_state("large", large)
+
+
+def forget_large_request(params: ParamDict) -> None:
+    """Forget a request recorded as large once its data is returned directly again."""
+    key = _get_journal_key(params)
+
+    with _state_lock:
+        large = _read_state("large")
+        if large.pop(key, None) is not None:
+            _write_state("large", large)
+
+
+def get_journaled_job(params: ParamDict) -> dict[str, Any] | None:
+    """Get the journal entry of a pending job started for the given tablefile request.
+
+    Args:
+        params (dict): The params of the tablefile request, including "name".
+
+    Returns:
+        dict | None: The entry with "job_id", "db_name" and "started" (seconds since the
+            epoch) or None if no job is pending for this request.
+    """
+    entry = _read_state("journal").get(_get_journal_key(params))
+    if entry is None or "finished" in entry:
+        return None
+
+    return entry
+
+
+def get_finished_job(params: ParamDict) -> dict[str, Any] | None:
+    """Get the journal entry of a recently finished job for the given tablefile request.
+
+    The result of the job may have been deleted from the result list of the user since,
+    so it has to be looked up there before it is downloaded.
+
+    Args:
+        params (dict): The params of the tablefile request, including "name".
+
+    Returns:
+        dict | None: The entry with "job_id", "db_name", "started" and "finished"
+            (seconds since the epoch) or None if no job finished within `RESULT_REUSE_WINDOW`.
+    """
+    entry = _read_state("journal").get(_get_journal_key(params))
+    if entry is None or time.time() - entry.get("finished", 0) > RESULT_REUSE_WINDOW:
+        return None
+
+    return entry
+
+
+def journal_job(job_id: str, params: ParamDict, db_name: str) -> None:
+    """Record a pending job in the journal, keeping the entry of a resumed or reused job."""
+    key = _get_journal_key(params)
+
+    with _state_lock:
+        journal = _read_state("journal")
+        entry = journal.get(key)
+        if entry is None or entry["job_id"] != job_id:
+            journal[key] = {"job_id": job_id, "db_name": db_name, "started": time.time()}
+            _write_state("journal", _prune_journal(journal))
+
+
+def mark_job_finished(params: ParamDict) -> None:
+    """Mark the job of a tablefile request as finished once its result is downloaded."""
+    key = _get_journal_key(params)
+
+    with _state_lock:
+        journal = _read_state("journal")
+        entry = journal.get(key)
+        if entry is not None and "finished" not in entry:
+            entry["finished"] = time.time()
+            _write_state("journal", _prune_journal(journal))
+
+
+def remove_journaled_job(params: ParamDict) -> None:
+    """Remove the job of a tablefile request from the journal."""
+    key = _get_journal_key(params)
+
+    with _state_lock:
+        journal = _read_state("journal")
+        if journal.pop(key, None) is not None:
+            _write_state("journal", journal)
+
+
+def _prune_journal(journal: dict[str, Any]) -> dict[str, Any]:
+    """Drop the entries of jobs finished longer than `RESULT_REUSE_WINDOW` ago."""
+    now = time.time()
+    return {
+        key: entry
+        for key, entry in journal.items()
+        if now - entry.get("finished", now) <= RESULT_REUSE_WINDOW
+    }
+
+
+def _get_journal_key(params: ParamDict) -> str:
+    """Get the key of a request in the journal, the same as its key in the data cache."""
+    return cache.get_cache_key(cache.normalize_name(params["name"]), params)
+
+
+def _get_state_file(state: str) -> Path:
+    """Get the path of a local state file of the job subsystem within the cache directory."""
+    return Path(config.get_cache_dir()) / ".jobs" / f"{state}.json"
+
+
+def _read_state(state: str) -> dict:
+    """Read a local state file of the job subsystem, an empty dict if it does not exist."""
+    try:
+        with open(_get_state_file(state), encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(state: str, content: dict) -> None:
+    """Atomically replace a local state file of the job subsystem."""
+    file_path = _get_state_file(state)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, suffix=".part")
+    with open(fd, "w", encoding="utf-8") as file:
+        json.dump(content, file)
+    os.replace(tmp_name, file_path)
+
+
+@dataclass
+class _Job:
+    """A started job waiting for its result."""
+
+    job_id: str
+    params: ParamDict
+    db_name: str
+    future: Future
+    delays: Iterator[float]
+    started: float = field(default_factory=time.perf_counter)
+    # seconds until the next poll, counted down by the time the poller sleeps
+    remaining: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.remaining = next(self.delays)
+
+
+class JobManager:
+    """Start, poll and download many background jobs together.
+
+    Basic usage:
+
+    ```python
+    from pystatis.jobs import JobManager
+
+    with JobManager() as manager:
+        futures = [manager.submit(params, db_name="regio") for params in all_params]
+        data = [future.result() for future in futures]
+    ```
+
+    Args:
+        polling (PollingStrategy, optional): When to poll the status of a job.
+            Defaults to None, meaning `PollingStrategy.from_config()`.
+        timeout (float, optional): Seconds after which a job is given up.
+            Defaults to None, meaning `http_helper.JOB_TIMEOUT`.
+        max_workers (int, optional): Number of threads used to start jobs and
+            download results. Defaults to 4.
+    """
+
+    def __init__(
+        self,
+        polling: PollingStrategy | None = None,
+        timeout: float | None = None,
+        max_workers: int = 4,
+    ) -> None:
+        self.polling = polling if polling is not None else PollingStrategy.from_config()
+        self.timeout = timeout if timeout is not None else http_helper.JOB_TIMEOUT
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="pystatis-jobs")
+        self._pending: dict[str, dict[str, _Job]] = {}
+        self._lock = threading.Lock()
+        self._poller: threading.Thread | None = None
+        self._is_shutdown = False
+
+    def __enter__(self) -> "JobManager":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.shutdown()
+
+    def submit(self, params: ParamDict, db_name: str | None = None) -> "Future[bytes]":
+        """Start a job for a tablefile request and return a future for its data.
+
+        The job is started right away in a worker thread. If the data is already cached,
+        the future is resolved from cache without starting a job.
+
+        Args:
+            params (dict): The params of the tablefile request, including "name".
+            db_name (str, optional): The database to use for this data request.
+                One of "genesis", "zensus", "regio". Defaults to None.
+
+        Returns:
+            Future[bytes]: A future resolving to the uncompressed data as bytes.
+        """
+        future: Future[bytes] = Future()
+        self._executor.submit(self._start, future, params, db_name)
+        return future
+
+    def watch(
+        self, job_id: str, params: ParamDict, db_name: str | None = None, elapsed: float = 0.0
+    ) -> "Future[bytes]":
+        """Wait for an already started job and return a future for its data.
+
+        Args:
+            job_id (str): Job ID generated by Destatis API.
+            params (dict): The params of the tablefile request that started the job.
+            db_name (str, optional): The database to use for this data request.
+                One of "genesis", "zensus", "regio". Defaults to None.
+            elapsed (float, optional): Seconds since the job was started. Defaults to 0.
+
+        Returns:
+            Future[bytes]: A future resolving to the uncompressed data as bytes.
+        """
+        future: Future[bytes] = Future()
+        db_name = http_helper._resolve_db_name(params, db_name)
+        self._add(self._create_job(job_id, params, db_name, future, elapsed))
+        return future
+
+    def resume(self, params: ParamDict) -> "Future[bytes] | None":
+        """Resume waiting for a job started for the same request by an earlier process.
+
+        Args:
+            params (dict): The params of the tablefile request, including "name".
+
+        Returns:
+            Future[bytes] | None: A future resolving to the uncompressed data as bytes or
+                None if there is no pending job for this request in the journal.
+        """
+        entry = get_journaled_job(params)
+        if entry is None:
+            return None
+
+        logger.warning(
+            "Verarbeitung im Hintergrund wird fortgesetzt. Job-ID: %s.",
+            entry["job_id"],
+        )
+        return self.watch(
+            entry["job_id"], params, entry["db_name"], max(time.time() - entry["started"], 0.0)
+        )
+
+    def reuse(self, params: ParamDict) -> "Future[bytes] | None":
+        """Download the result of a job finished recently for the same request again.
+
+        This happens e.g. if the cache was cleared in the meantime or another process
+        shares the job journal but not the data. The result is only downloaded if it is
+        still in the result list of the user.
+
+        Args:
+            params (dict): The params of the tablefile request, including "name".
+
+        Returns:
+            Future[bytes] | None: A future resolving to the uncompressed data as bytes or
+                None if there is no finished result for this request.
+        """
+        entry = get_finished_job(params)
+        if entry is None:
+            return None
+
+        job_id, db_name = entry["job_id"], entry["db_name"]
+        if job_id not in self._get_finished_jobs(db_name, [job_id]):
+            remove_journaled_job(params)
+            return None
+
+        logger.warning("Ergebnis eines früheren Jobs wird wiederverwendet. Job-ID: %s.", job_id)
+
+        future: Future[bytes] = Future()
+        future.set_running_or_notify_cancel()
+        self._executor.submit(self._download, self._create_job(job_id, params, db_name, future))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads. Jobs still pending are no longer polled and fail."""
+        with self._lock:
+            self._is_shutdown = True
+            for job in (job for jobs in self._pending.values() for job in jobs.values()):
+                job.future.set_exception(CancelledError(f"Job {job.job_id} was not awaited."))
+            self._pending.clear()
+
+        self._executor.shutdown(wait=wait)
+
+    def _start(self, future: "Future[bytes]", params: ParamDict, db_name: str | None) -> None:
+        """Start a job for the given request (worker thread)."""
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            cache_dir = config.get_cache_dir()
+            name = cache.normalize_name(params["name"])
+            if cache.hit_in_cash(cache_dir, name, params):
+                future.set_result(cache.read_from_cache(cache_dir, name, params))
+                return
+
+            if (resumed := self.resume(params) or self.reuse(params)) is not None:
+                resumed.add_done_callback(lambda resumed: _chain(resumed, future))
+                return
+
+            db_name = http_helper._resolve_db_name(params, db_name)
+            job_response = http_helper.start_job("data", "tablefile", params, db_name)
+
+            # small tables are returned directly instead of starting a job
+            if not http_helper._is_json_response(job_response):
+                forget_large_request(params)
+                future.set_result(
+                    http_helper._cache_response(cache_dir, name, params, job_response)
+                )
+                return
+
+            job_id = http_helper.get_job_id_from_response(job_response)
+            if not job_id:
+                raise DestatisStatusError(f"Could not start a job for {params['name']}.")
+
+            record_large_request(params)
+
+            logger.warning(
+                "Verarbeitung im Hintergrund erfolgreich gestartet. Job-ID: %s.",
+                job_id,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            future.set_exception(e)
+            return
+
+        self._add(self._create_job(job_id, params, db_name, future), running=True)
+
+    def _create_job(
+        self,
+        job_id: str,
+        params: ParamDict,
+        db_name: str,
+        future: "Future[bytes]",
+        elapsed: float = 0.0,
+    ) -> _Job:
+        journal_job(job_id, params, db_name)
+
+        initial_delay = max(estimate_initial_delay(params["name"], self.polling) - elapsed, 0.0)
+        return _Job(
+            job_id,
+            params,
+            db_name,
+            future,
+            self.polling.delays(initial_delay),
+            started=time.perf_counter() - elapsed,
+        )
+
+    def _add(self, job: _Job, running: bool = False) -> None:
+        """Register a job for polling and start the poller thread if necessary."""
+        if not running and not job.future.set_running_or_notify_cancel():
+            return
+
+        with self._lock:
+            self._pending.setdefault(job.db_name, {})[job.job_id] = job
+
+            if self._poller is None:
+                self._poller = threading.Thread(
+                    target=self._poll, name="pystatis-job-poller", daemon=True
+                )
+                self._poller.start()
+
+    def _poll(self) -> None:
+        """Poll all pending jobs until none is left (poller thread)."""
+        while True:
+            with self._lock:
+                pending = {db_name: dict(jobs) for db_name, jobs in self._pending.items() if jobs}
+                if not pending or self._is_shutdown:
+                    self._poller = None
+                    return
+
+            # sleep until the next job is due, but wake up regularly to pick up new jobs
+            sleeping = [job for jobs in pending.values() for job in jobs.values()]
+            sleep = min(max(min(job.remaining for job in sleeping), 0.0), MAX_POLLER_SLEEP)
+            time.sleep(sleep)
+            for job in sleeping:
+                job.remaining -= sleep
+
+            with self._lock:
+                pending = {db_name: dict(jobs) for db_name, jobs in self._pending.items() if jobs}
+
+            for db_name, jobs in pending.items():
+                # one result list request covers all jobs of a database, so poll them all
+                # as soon as one of them is due
+                if all(job.remaining > 0 for job in jobs.values()):
+                    continue
+
+                finished = self._get_finished_jobs(db_name, jobs)
+                for job_id, job in jobs.items():
+                    if job_id in finished:
+                        record_job_duration(job.params["name"], time.perf_counter() - job.started)
+                        self._executor.submit(self._download, self._pop(db_name, job_id))
+                    elif job.remaining <= 0:
+                        job.remaining = next(job.delays)
+
+            for job in (job for jobs in pending.values() for job in jobs.values()):
+                if time.perf_counter() - job.started > self.timeout and self._pop(
+                    job.db_name, job.job_id
+                ):
+                    remove_journaled_job(job.params)
+                    job.future.set_exception(
+                        TimeoutError(
+                            f"Verarbeitungsfenster von {self.timeout // 60:.0f} Minuten "
+                            f"überschritten. Job-Datei für {job.job_id} konnte nicht "
+                            "heruntergeladen werden."
+                        )
+                    )
+
+    def _get_finished_jobs(self, db_name: str, job_ids: Collection[str]) -> list[str]:
+        """Get the IDs of all finished jobs of a database with a single result list request."""
+        if len(job_ids) == 1:
+            job_params = http_helper._build_job_params(next(iter(job_ids)))
+        else:
+            job_params = {"selection": "*", "area": "user", "pagelength": str(RESULTS_PAGELENGTH)}
+
+        try:
+            response = http_helper.get_data_from_endpoint(
+                endpoint="catalogue", method="results", params=job_params, db_name=db_name
+            )
+        except DestatisStatusError:
+            logger.info("Verarbeitung im Hintergrund läuft noch...")
+            return []
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Could not poll the status of the jobs: %s", e)
+            return []
+
+        body = http_helper._get_json_body(response) or {}
+        results = {result.get("Code") for result in body.get("List") or []}
+        finished = [job_id for job_id in job_ids if job_id in results]
+
+        for job_id in finished:
+            logger.info(
+                (
+                    "Verarbeitung im Hintergrund abgeschlossen. "
+                    "Ergebnis kann jetzt abgerufen werden über "
+                    "/data/resultfile und Job-ID: %s."
+                ),
+                job_id,
+            )
+
+        return finished
+
+    def _pop(self, db_name: str, job_id: str) -> _Job | None:
+        with self._lock:
+            return self._pending.get(db_name, {}).pop(job_id, None)
+
+    def _download(self, job: _Job | None) -> None:
+        """Download and cache the result of a finished job (worker thread)."""
+        if job is None:
+            return
+
+        try:
+            params = job.params.copy()
+            params["name"] = job.job_id
+            response = http_helper.get_data_from_endpoint(
+                endpoint="data",
+                method="resultfile",
+                params=params,
+                db_name=job.db_name,
+                stream=True,
+            )
+            name = cache.normalize_name(job.params["name"])
+            data = http_helper._cache_response(config.get_cache_dir(), name, job.params, response)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            job.future.set_exception(e)
+            return
+
+        mark_job_finished(job.params)
+        job.future.set_result(data)
+
+
+def _chain(source: "Future[bytes]", target: "Future[bytes]") -> None:
+    """Copy the outcome of a finished future to another future."""
+    if (exception := source.exception()) is not None:
+        target.set_exception(exception)
+    else:
+        target.set_result(source.result())
+
+
+_job_manager: JobManager | None = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get the shared job manager used by `http_helper.load_data`."""
+    global _job_manager  # pylint: disable=global-statement
+
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+
+    return _job_manager
@@ -0,0 +1,266 @@
+"""Module provides an index of the data cache in a SQLite database within the cache directory.
+
+Every cached version of a data request is recorded with its cache key, name, params,
+version date, content type, file size, checksum and time of the last access. Finding the
+latest version of a request is a single indexed query instead of listing and sorting the
+files of its cache directory, which is slow with many entries on network storage.
+
+Caches written before the index existed are indexed lazily, see `cache.hit_in_cash`.
+The version of the cache keys (see `cache.CACHE_KEY_VERSION`) is stored as the
+`user_version` of the database, see `get_key_version`.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+MANIFEST_FILE = ".manifest.sqlite"
+# seconds to wait for a write lock held by another thread or process
+MANIFEST_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    name TEXT NOT NULL,
+    params TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    codec TEXT NOT NULL DEFAULT 'deflate',
+    checked REAL,
+    PRIMARY KEY (key, version)
+);
+CREATE INDEX IF NOT EXISTS entries_name ON entries (name);
+"""
+
+
+@dataclass
+class Entry:
+    """A cached version of a data request.
+
+    Args:
+        key (str): The cache key of the request, see `cache.get_cache_key`.
+        version (str): The date the version was cached, e.g. "20240131".
+        name (str): The unique identifier in GENESIS-Online.
+        params (str): The canonical params of the request as JSON, see
+            `cache.canonicalize_params`.
+        file_name (str): The name of the file within the cache directory of the key.
+        content_type (str): The content type of the cached data, e.g. "csv" or "zip".
+        size (int): The size of the file and the data frames cached for it in bytes.
+        checksum (str | None): The BLAKE2b digest of the data, None if the version was
+            cached before the index existed.
+        created (float): Seconds since the epoch the version was cached.
+        last_access (float): Seconds since the epoch the version was last read.
+        hits (int, optional): Number of times the version was read. Defaults to 0.
+        codec (str, optional): The codec the file is compressed with, see `codec.CODECS`.
+            Defaults to "deflate".
+        checked (float | None, optional): Seconds since the epoch GENESIS-Online last
+            confirmed that there is no newer data, see `http_helper.revalidate`.
+            Defaults to None.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    key: str
+    version: str
+    name: str
+    params: str
+    file_name: str
+    content_type: str
+    size: int
+    checksum: str | None
+    created: float
+    last_access: float
+    hits: int = 0
+    codec: str = "deflate"
+    checked: float | None = None
+
+
+# orders of `get_entries`, the latest version of each key first or the entries to evict first
+ORDERS = {
+    "version": "key, version DESC",
+    "lru": "last_access",
+    "lfu": "hits, last_access",
+}
+
+
+def add_entry(cache_dir: str, entry: Entry) -> None:
+    """Record a cached version, replacing an entry for the same key and version."""
+    with _connect(cache_dir) as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES "
+            "(:key, :version, :name, :params, :file_name, :content_type, :size, :checksum, "
+            ":created, :last_access, :hits, :codec, :checked)",
+            asdict(entry),
+        )
+
+
+def get_latest_entry(cache_dir: str, key: str) -> Entry | None:
+    """Get the latest version cached for a key.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        key (str): The cache key of the request.
+
+    Returns:
+        Entry | None: The entry of the latest version or None if the key is not indexed.
+    """
+    with _connect(cache_dir) as connection:
+        row = connection.execute(
+            "SELECT * FROM entries WHERE key = ? ORDER BY version DESC LIMIT 1", (key,)
+        ).fetchone()
+
+    return Entry(*row) if row is not None else None
+
+
+def get_entries(
+    cache_dir: str,
+    key: str | None = None,
+    created_before: float | None = None,
+    order: str = "version",
+    name: str | None = None,
+) -> list[Entry]:
+    """Get the entries of the index.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        key (str, optional): Only get entries of this cache key.
+        created_before (float, optional): Only get entries cached before this time
+            in seconds since the epoch.
+        order (str, optional): One of `ORDERS`. Defaults to "version".
+        name (str, optional): Only get entries of this name.
+
+    Returns:
+        list[Entry]: The matching entries.
+    """
+    conditions = []
+    if key is not None:
+        conditions.append("key = :key")
+    if created_before is not None:
+        conditions.append("created < :created_before")
+    if name is not None:
+        conditions.append("name = :name")
+    where = " AND ".join(conditions) or "1"
+
+    with _connect(cache_dir) as connection:
+        rows = connection.execute(
+            f"SELECT * FROM entries WHERE {where} ORDER BY {ORDERS[order]}",  # nosec B608
+            {"key": key, "created_before": created_before, "name": name},
+        ).fetchall()
+
+    return [Entry(*row) for row in rows]
+
+
+def get_total_size(cache_dir: str) -> int:
+    """Get the total size in bytes of all indexed versions."""
+    with _connect(cache_dir) as connection:
+        (size,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+
+    return size
+
+
+def touch(cache_dir: str, key: str, version: str) -> None:
+    """Record the access of a cached version, see `Entry.last_access` and `Entry.hits`."""
+    with _connect(cache_dir) as connection:
+        connection.execute(
+            "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ? AND version = ?",
+            (time.time(), key, version),
+        )
+
+
+def set_checked(cache_dir: str, key: str, version: str) -> None:
+    """Record that a cached version is still the latest one, see `Entry.checked`."""
+    with _connect(cache_dir) as connection:
+        connection.execute(
+            "UPDATE entries SET checked = ? WHERE key = ? AND version = ?",
+            (time.time(), key, version),
+        )
+
+
+def remove_entries(
+    cache_dir: str, key: str | None = None, version: str | None = None, name: str | None = None
+) -> None:
+    """Remove entries from the index, e.g. after their files were deleted.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        key (str, optional): Only remove entries of this cache key.
+        version (str, optional): Only remove entries of this version.
+        name (str, optional): Only remove entries of this name.
+    """
+    conditions = {"key": key, "version": version, "name": name}
+    conditions = {column: value for column, value in conditions.items() if value is not None}
+    where = " AND ".join(f"{column} = :{column}" for column in conditions) or "1"
+
+    with _connect(cache_dir) as connection:
+        connection.execute(f"DELETE FROM entries WHERE {where}", conditions)  # nosec B608
+
+
+def get_key_version(cache_dir: str) -> int:
+    """Get the version of the cache keys in the index, 0 if it was never set."""
+    with _connect(cache_dir) as connection:
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+
+    return version
+
+
+def set_key_version(cache_dir: str, version: int) -> None:
+    """Set the version of the cache keys in the index, e.g. after migrating them."""
+    with _connect(cache_dir) as connection:
+        connection.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def close() -> None:
+    """Close the connections of the current thread, e.g. before the index files are deleted."""
+    connections = getattr(_local, "connections", {})
+    while connections:
+        _, (connection, _) = connections.popitem()
+        connection.close()
+
+
+# connections of the current thread by the path of the index, with the inode of its file
+_local = threading.local()
+
+
+@contextmanager
+def _connect(cache_dir: str) -> Iterator[sqlite3.Connection]:
+    """Open the index of a cache directory and commit on exit, creating it if necessary.
+
+    Every thread keeps one connection per index and creates the schema only when it opens
+    the connection. The connection is reopened if the file was deleted or replaced meanwhile,
+    e.g. by `cache.clear_cache`. An open connection keeps the inode of its file in use, so a
+    new file never has the same inode.
+    """
+    path = Path(cache_dir) / MANIFEST_FILE
+    connections: dict[Path, tuple[sqlite3.Connection, int]] = _local.__dict__.setdefault(
+        "connections", {}
+    )
+
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        inode = None
+
+    connection, connected_inode = connections.get(path, (None, None))
+    if connection is not None and connected_inode != inode:
+        connection.close()
+        connection = None
+
+    if connection is None:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(path, timeout=MANIFEST_TIMEOUT)
+        with connection:
+            connection.executescript(_SCHEMA)
+        connections[path] = (connection, os.stat(path).st_ino)
+
+    with connection:
+        yield connection
@@ -0,0 +1,147 @@
+"""Module provides a cache with a time to live for `metadata`, `catalogue` and `find` responses.
+
+Metadata, catalogues and search results change at most daily, but are requested again by
+every `Table.get_data`, `Results.show_metadata` and `Find` call. Their responses are stored
+as JSON files in the `.responses` directory within the cache directory and reused until
+they are older than the time to live of their endpoint, `metadata_ttl`, `catalogue_ttl`
+and `find_ttl` in hours in the `[data]` section of the config. A time to live of 0
+disables the cache for an endpoint.
+
+The result list and the jobs of the user (`catalogue/results`, `catalogue/jobs`) change
+with every job and are never cached.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from pystatis import cache, config
+from pystatis.types import ParamDict
+
+RESPONSE_DIR = ".responses"
+TTL_ENDPOINTS = ("metadata", "catalogue", "find")
+# methods whose responses depend on the state of the user
+UNCACHED_METHODS = frozenset({("catalogue", "results"), ("catalogue", "jobs")})
+
+
+def get_ttl(endpoint: str, method: str) -> float:
+    """Get the seconds the responses of an endpoint and method are cached, 0 if they are not."""
+    if endpoint not in TTL_ENDPOINTS or (endpoint, method) in UNCACHED_METHODS:
+        return 0.0
+
+    return config.get_response_ttl(endpoint) * 60 * 60
+
+
+def read_response(
+    cache_dir: str, endpoint: str, method: str, params: ParamDict, db_name: str
+) -> Optional[bytes]:
+    """Read a cached response if it is not older than the time to live of its endpoint.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        endpoint (str): The endpoint of the request.
+        method (str): The method of the request.
+        params (dict): The params of the request.
+        db_name (str): The database the request is sent to.
+
+    Returns:
+        bytes | None: The content of the response or None if it is not cached or expired.
+    """
+    ttl = get_ttl(endpoint, method)
+    if ttl <= 0:
+        return None
+
+    file_path = _get_file_path(cache_dir, endpoint, method, params, db_name)
+    try:
+        entry = json.loads(file_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if time.time() - entry["created"] > ttl:
+        return None
+
+    return entry["content"].encode("utf-8")
+
+
+def cache_response(
+    cache_dir: str,
+    endpoint: str,
+    method: str,
+    params: ParamDict,
+    db_name: str,
+    content: bytes,
+) -> bool:
+    """Store the content of a response, replacing a previously cached one.
+
+    The file is written to a temporary file first, so readers never see a partial response.
+
+    Args:
+        cache_dir (str): The cash directory as configured in the config.
+        endpoint (str): The endpoint of the request.
+        method (str): The method of the request.
+        params (dict): The params of the request.
+        db_name (str): The database the request is sent to.
+        content (bytes): The content of the response.
+
+    Returns:
+        bool: True, if the response was cached, False if it is not cacheable.
+    """
+    # pylint: disable=too-many-arguments
+    if get_ttl(endpoint, method) <= 0:
+        return False
+
+    try:
+        text = content.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+
+    file_path = _get_file_path(cache_dir, endpoint, method, params, db_name)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "created": time.time(),
+        "db_name": db_name,
+        "endpoint": endpoint,
+        "method": method,
+        "params": cache.canonicalize_params(params, defaults={}),
+        "content": text,
+    }
+
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, suffix=".part")
+    try:
+        with open(fd, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    return True
+
+
+def clear_responses(cache_dir: str, endpoint: Optional[str] = None) -> None:
+    """Remove all cached responses or only those of an endpoint."""
+    response_dir = Path(cache_dir) / RESPONSE_DIR
+    if endpoint is not None:
+        response_dir = response_dir / endpoint
+
+    shutil.rmtree(response_dir, ignore_errors=True)
+
+
+def _get_file_path(
+    cache_dir: str, endpoint: str, method: str, params: ParamDict, db_name: str
+) -> Path:
+    """Get the path of a cached response, `<endpoint>/<method>/<hash(db_name, params)>.json`."""
+    params_hash = hashlib.blake2s(digest_size=10, usedforsecurity=False)
+    # the defaults of data requests do not apply to these endpoints, so no params are dropped
+    params_hash.update(
+        json.dumps(
+            [db_name, cache.canonicalize_params(params, defaults={})], sort_keys=True
+        ).encode("UTF-8")
+    )
+
+    return Path(cache_dir) / RESPONSE_DIR / endpoint / method / f"{params_hash.hexdigest()}.json"
@@ -1,13 +1,14 @@
 """Module contains business logic related to destatis tables."""
 
+import asyncio
 import json
 from io import StringIO
-from typing import Any
+from typing import Any, Callable
 
 import pandas as pd
 
-from pystatis import config, db
-from pystatis.http_helper import load_data
+from pystatis import cache, config, db, manifest
+from pystatis.http_helper import load_data, load_data_async, revalidate
 
 
 class Table:
@@ -22,10 +23,22 @@ class Table:
 
     def __init__(self, name: str):
         self.name: str = name
-        self.raw_data = ""
+        self._raw_data: str | Callable[[], str] = ""
         self.data = pd.DataFrame()
         self.metadata: dict[str, Any] = {}
 
+    @property
+    def raw_data(self) -> str:
+        """The raw tablefile data, read from the cache on first access if `data` was."""
+        if callable(self._raw_data):
+            self._raw_data = self._raw_data()
+
+        return self._raw_data
+
+    @raw_data.setter
+    def raw_data(self, raw_data: str) -> None:
+        self._raw_data = raw_data
+
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-locals
     def get_data(
@@ -42,6 +55,7 @@ class Table:
         stand: str = "",
         language: str = "de",
         quality: str = "off",
+        refresh: bool = False,
     ) -> None:
         """Downloads raw data and metadata from GENESIS-Online.
 
@@ -130,8 +144,124 @@ class Table:
                 The explanation of the quality labels can be found online after retrieving the table values,
                 table -> explanation of symbols or at e.g.
                 https://www-genesis.destatis.de/genesis/online?operation=ergebnistabelleQualitaet&language=en&levelindex=3&levelid=1719342760835#abreadcrumb.
+            refresh (bool, optional): If the table is cached, return the cached version right away
+                and download a newer version in the background if there is one, see
+                `http_helper.revalidate`. The next call returns the newer version. Defaults to False.
+        """
+        params = self._build_params(
+            compress=compress,
+            area=area,
+            startyear=startyear,
+            endyear=endyear,
+            timeslices=timeslices,
+            regionalvariable=regionalvariable,
+            regionalkey=regionalkey,
+            stand=stand,
+            language=language,
+            quality=quality,
+        )
+
+        db_matches = db.identify_db_matches(self.name)
+        db_name = db.select_db_by_credentials(db_matches)
+
+        if self._load_cached_frame(params, prettify):
+            if refresh:
+                revalidate(params, db_name)
+        else:
+            entry = self._get_cached_version(params)
+            raw_data_bytes = load_data(
+                endpoint="data",
+                method="tablefile",
+                params=params,
+                db_name=db_name,
+                refresh=refresh,
+            )
+            self._set_data(raw_data_bytes, db_name, prettify, language)
+            self._cache_frame(params, prettify, entry or self._get_cached_version(params))
+
+        metadata = load_data(endpoint="metadata", method="table", params=params)
+        self._set_metadata(metadata)
+
+    # pylint: disable=too-many-arguments
+    async def aget_data(
+        self,
+        *,
+        prettify: bool = True,
+        compress: bool = True,
+        area: str = "all",
+        startyear: str = "",
+        endyear: str = "",
+        timeslices: str = "",
+        regionalvariable: str = "",
+        regionalkey: str = "",
+        stand: str = "",
+        language: str = "de",
+        quality: str = "off",
+        refresh: bool = False,
+    ) -> None:
+        """Asynchronous variant of `get_data`.
+
+        Data and metadata are downloaded concurrently without blocking the event loop.
+        Parsing the data frame runs in a worker thread.
+        Requires the optional async dependencies (`pip install pystatis[async]`).
+        See `get_data` for a description of all arguments.
         """
-        params = {
+        params = self._build_params(
+            compress=compress,
+            area=area,
+            startyear=startyear,
+            endyear=endyear,
+            timeslices=timeslices,
+            regionalvariable=regionalvariable,
+            regionalkey=regionalkey,
+            stand=stand,
+            language=language,
+            quality=quality,
+        )
+
+        db_matches = db.identify_db_matches(self.name)
+        db_name = db.select_db_by_credentials(db_matches)
+
+        if await asyncio.to_thread(self._load_cached_frame, params, prettify):
+            if refresh:
+                revalidate(params, db_name)
+            metadata = await load_data_async(endpoint="metadata", method="table", params=params)
+        else:
+            entry = await asyncio.to_thread(self._get_cached_version, params)
+            raw_data_bytes, metadata = await asyncio.gather(
+                load_data_async(
+                    endpoint="data",
+                    method="tablefile",
+                    params=params,
+                    db_name=db_name,
+                    refresh=refresh,
+                ),
+                load_data_async(endpoint="metadata", method="table", params=params),
+            )
+            await asyncio.to_thread(self._set_data, raw_data_bytes, db_name, prettify, language)
+            if entry is None:
+                entry = await asyncio.to_thread(self._get_cached_version, params)
+            await asyncio.to_thread(self._cache_frame, params, prettify, entry)
+
+        self._set_metadata(metadata)
+
+    # pylint: disable=too-many-arguments
+    def _build_params(
+        self,
+        *,
+        compress: bool,
+        area: str,
+        startyear: str,
+        endyear: str,
+        timeslices: str,
+        regionalvariable: str,
+        regionalkey: str,
+        stand: str,
+        language: str,
+        quality: str,
+    ) -> dict[str, str]:
+        """Build the query parameters for the tablefile and metadata requests."""
+        return {
             "area": area,
             "compress": "true" if compress else "false",
             "endyear": endyear,
@@ -147,12 +277,8 @@ class Table:
             "job": "false",
         }
 
-        db_matches = db.identify_db_matches(self.name)
-        db_name = db.select_db_by_credentials(db_matches)
-
-        raw_data_bytes = load_data(
-            endpoint="data", method="tablefile", params=params, db_name=db_name
-        )
+    def _set_data(self, raw_data_bytes: bytes, db_name: str, prettify: bool, language: str) -> None:
+        """Decode the raw tablefile data and parse it into a data frame."""
         try:
             raw_data_str = raw_data_bytes.decode("utf-8-sig")
         except (AttributeError, UnicodeDecodeError) as e:
@@ -182,8 +308,86 @@ class Table:
         if prettify:
             self.data = Table.parse_v5_table(self.data, db_name, language)
 
-        metadata = load_data(endpoint="metadata", method="table", params=params)
-        metadata = json.loads(metadata)
+    def _load_cached_frame(self, params: dict[str, str], prettify: bool) -> bool:
+        """Load the parsed data frame from the memory cache or the frame cache on disk.
+
+        The frame cache on disk is enabled by the `frame_cache` option of the config.
+        The raw data is only read from the cache when `raw_data` is accessed.
+
+        Returns:
+            bool: True, if the data frame was cached for the latest version of the raw data.
+        """
+        if not self._caches_frames():
+            return False
+
+        cache_dir = config.get_cache_dir()
+        name = cache.normalize_name(self.name)
+        variant = "pretty" if prettify else "raw"
+        memory_cache = cache.get_memory_cache()
+        memory_key = (cache_dir, cache.get_cache_key(name, params), variant)
+
+        data = memory_cache.get(memory_key)
+        if data is None and (frame_format := config.get_frame_cache()) is not None:
+            data = cache.read_frame(cache_dir, name, params, variant, frame_format)
+            if data is not None:
+                memory_cache.put(memory_key, data)
+
+        if data is None:
+            return False
+
+        # the cached data frame must not change when the caller modifies its copy
+        self.data = data.copy()
+        self._raw_data = lambda: cache.read_from_cache(cache_dir, name, params).decode("utf-8-sig")
+
+        return True
+
+    def _get_cached_version(self, params: dict[str, str]) -> manifest.Entry | None:
+        """Get the cached version of the raw data the data frame is parsed from.
+
+        Looked up before the raw data is loaded, so a version cached by a revalidation
+        while the old one is parsed is not mistaken for the parsed one. None if data
+        frames are not cached, so the cache index is not queried for nothing.
+        """
+        if not self._caches_frames():
+            return None
+
+        return cache.get_latest_entry(
+            config.get_cache_dir(), cache.normalize_name(self.name), params
+        )
+
+    @staticmethod
+    def _caches_frames() -> bool:
+        """Check if parsed data frames are cached in memory or on disk."""
+        return cache.get_memory_cache().max_size > 0 or config.get_frame_cache() is not None
+
+    def _cache_frame(
+        self, params: dict[str, str], prettify: bool, entry: manifest.Entry | None
+    ) -> None:
+        """Cache the parsed data frame in memory and on disk, see `_load_cached_frame`.
+
+        Nothing is cached if the version the data frame was parsed from is not the latest one.
+        """
+        cache_dir = config.get_cache_dir()
+        name = cache.normalize_name(self.name)
+        variant = "pretty" if prettify else "raw"
+
+        if entry is None or not cache.is_latest_entry(cache_dir, name, params, entry):
+            return
+
+        memory_cache = cache.get_memory_cache()
+        if memory_cache.max_size > 0:
+            key = cache.get_cache_key(name, params)
+            memory_cache.put((cache_dir, key, variant), self.data.copy())
+            if not cache.is_latest_entry(cache_dir, name, params, entry):
+                # a newer version was cached meanwhile
+                memory_cache.discard(cache_dir, key)
+
+        if (frame_format := config.get_frame_cache()) is not None:
+            cache.cache_frame(cache_dir, name, params, variant, self.data, frame_format, entry)
+
+    def _set_metadata(self, raw_metadata: bytes) -> None:
+        """Parse the raw response of the metadata endpoint."""
+        metadata = json.loads(raw_metadata)
         if not isinstance(metadata, dict):
             raise TypeError(f"Expected dict for metadata, got {type(metadata).__name__}")
 
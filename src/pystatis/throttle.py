@@ -0,0 +1,273 @@
+"""Module provides per-database limits for the rate and the concurrency of API requests.
+
+GENESIS, Zensus and Regionalstatistik restrict the number of parallel requests per user
+and cancel long-running requests once the limit is exceeded. Every request sent by
+`http_helper` therefore takes a token from the token bucket of its database, which refills
+with `rate_limit` tokens per second, and holds one of `max_in_flight` slots while it runs.
+Both limits are read from the config, see `config.get_rate_limit` and `config.get_max_in_flight`.
+
+On top of that, the number of tables fetched in parallel by `bulk.fetch_tables` and
+`http_helper.load_data_async` adapts to the health of each database: the `AdaptiveLimit`
+grows while requests are answered quickly and shrinks on timeouts, server errors and
+slow responses (additive increase, multiplicative decrease).
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+from pystatis import config
+
+# seconds between two attempts of a coroutine to get a slot of an `AdaptiveLimit`
+ADAPTIVE_POLL_INTERVAL = 0.1
+
+
+class TokenBucket:
+    """A thread-safe token bucket.
+
+    Args:
+        rate (float): Tokens added per second. Zero or less disables the limit.
+        capacity (float): Maximum number of tokens, i.e. the size of a burst.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait until it is available.
+
+        Tokens can be reserved ahead of time, so concurrent callers are lined up
+        one after another instead of all retrying at once.
+
+        Returns:
+            float: The seconds to wait before the request may be sent.
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return max(-self._tokens / self.rate, 0.0)
+
+
+class AdaptiveLimit:
+    """A concurrency limit adapting to the observed latency and errors of a database (AIMD).
+
+    Every healthy response raises the limit by `1 / limit`, i.e. by one per round of
+    `limit` requests. An unhealthy response (timeout, server error, status code 98) or a
+    response much slower than usual multiplies the limit by `decrease_factor`, at most once
+    per typical response time, so a single burst of errors does not collapse the limit.
+
+    The usual latency is averaged per kind of request, e.g. per endpoint and method, so
+    large table downloads are not compared with quick metadata requests and job polls.
+
+    Args:
+        initial (int): The limit to start with.
+        maximum (int): The upper bound of the limit.
+        minimum (int, optional): The lower bound of the limit. Defaults to 1.
+        decrease_factor (float, optional): Factor applied to the limit on congestion.
+            Defaults to 0.5.
+        latency_tolerance (float, optional): A response slower than this multiple of the
+            average latency is a sign of congestion. Defaults to 3.
+    """
+
+    # weight of a new latency in the exponentially weighted moving average
+    SMOOTHING = 0.1
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 3.0,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.latencies: dict[str, float] = {}
+        self._limit = float(min(max(initial, minimum), self.maximum))
+        self._in_use = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The number of slots that can be held at the same time."""
+        return int(self._limit)
+
+    def observe(self, latency: float, healthy: bool, kind: str = "") -> None:
+        """Adapt the limit to the outcome of a request.
+
+        Args:
+            latency (float): Seconds the request took.
+            healthy (bool): False if the request failed in a way indicating an overloaded server.
+            kind (str, optional): The kind of the request, its latency is only compared
+                with the average latency of the same kind. Defaults to "".
+        """
+        with self._condition:
+            average = self.latencies.get(kind)
+            is_slow = average is not None and latency > self.latency_tolerance * average
+
+            if healthy and not is_slow:
+                self._limit = min(self._limit + 1 / self._limit, self.maximum)
+                self._condition.notify_all()
+            elif time.monotonic() - self._last_decrease > max(average or 0.0, 1.0):
+                self._limit = max(self._limit * self.decrease_factor, self.minimum)
+                self._last_decrease = time.monotonic()
+
+            if healthy:
+                self.latencies[kind] = (
+                    latency
+                    if average is None
+                    else (1 - self.SMOOTHING) * average + self.SMOOTHING * latency
+                )
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Wait for a free slot and hold it until exit."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_use < self.limit)
+            self._in_use += 1
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[None]:
+        """Asynchronous variant of `slot`, waiting without blocking the event loop."""
+        while True:
+            with self._condition:
+                if self._in_use < self.limit:
+                    self._in_use += 1
+                    break
+
+            await asyncio.sleep(ADAPTIVE_POLL_INTERVAL)
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify()
+
+
+_buckets: dict[str, TokenBucket] = {}
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_adaptive_limits: dict[str, AdaptiveLimit] = {}
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+@contextmanager
+def throttle(db_name: str) -> Iterator[None]:
+    """Wait for a token and an in-flight slot of the database, hold the slot until exit.
+
+    Args:
+        db_name (str): The database the request is sent to.
+    """
+    if (delay := get_token_bucket(db_name).reserve()) > 0:
+        time.sleep(delay)
+
+    with get_semaphore(db_name):
+        yield
+
+
+@asynccontextmanager
+async def athrottle(db_name: str) -> AsyncIterator[None]:
+    """Asynchronous variant of `throttle`.
+
+    The token bucket is shared with synchronous requests, in-flight slots are counted
+    per event loop.
+    """
+    if (delay := get_token_bucket(db_name).reserve()) > 0:
+        await asyncio.sleep(delay)
+
+    async with get_async_semaphore(db_name):
+        yield
+
+
+def observe(db_name: str, endpoint: str, method: str, latency: float, healthy: bool) -> None:
+    """Record the outcome of a request against a database, see `AdaptiveLimit.observe`.
+
+    Latencies are averaged per endpoint and method.
+    """
+    get_adaptive_limit(db_name).observe(latency, healthy, kind=f"{endpoint}/{method}")
+
+
+def get_adaptive_limit(db_name: str) -> AdaptiveLimit:
+    """Get the adaptive limit of the number of tables fetched in parallel from a database.
+
+    It starts at `max_parallel_tables` and adapts up to `max_parallel_tables_limit`.
+    """
+    with _lock:
+        adaptive_limit = _adaptive_limits.get(db_name)
+        if adaptive_limit is None:
+            adaptive_limit = AdaptiveLimit(
+                initial=config.get_max_parallel_tables(db_name),
+                maximum=config.get_max_parallel_tables_limit(db_name),
+            )
+            _adaptive_limits[db_name] = adaptive_limit
+
+    return adaptive_limit
+
+
+def get_token_bucket(db_name: str) -> TokenBucket:
+    """Get the token bucket limiting the request rate against a database."""
+    with _lock:
+        bucket = _buckets.get(db_name)
+        if bucket is None:
+            rate = config.get_rate_limit(db_name)
+            bucket = TokenBucket(rate, capacity=max(rate, 1.0))
+            _buckets[db_name] = bucket
+
+    return bucket
+
+
+def get_semaphore(db_name: str) -> threading.BoundedSemaphore:
+    """Get the semaphore limiting the number of requests in flight against a database."""
+    with _lock:
+        semaphore = _semaphores.get(db_name)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(config.get_max_in_flight(db_name))
+            _semaphores[db_name] = semaphore
+
+    return semaphore
+
+
+def get_async_semaphore(db_name: str) -> asyncio.Semaphore:
+    """Get the semaphore limiting the number of requests in flight for the running event loop."""
+    semaphores = _async_semaphores.setdefault(asyncio.get_running_loop(), {})
+
+    semaphore = semaphores.get(db_name)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(config.get_max_in_flight(db_name))
+        semaphores[db_name] = semaphore
+
+    return semaphore
+
+
+def reset() -> None:
+    """Drop all limiters, so changed limits in the config take effect."""
+    with _lock:
+        _buckets.clear()
+        _semaphores.clear()
+        _adaptive_limits.clear()
+        _async_semaphores.clear()
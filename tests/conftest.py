@@ -1,5 +1,7 @@
 import pytest
 
+from pystatis import circuit, hedging, throttle
+
 
 @pytest.fixture(scope="module")
 def vcr_config():
@@ -32,3 +34,11 @@ def vcr_cassette_name(request):
         # Fallback
         test_name = request.node.name
         return test_name
+
+
+@pytest.fixture(autouse=True)
+def reset_limits():
+    """Start every test with full token buckets and closed circuits, regardless of earlier tests."""
+    throttle.reset()
+    circuit.reset()
+    hedging.reset()
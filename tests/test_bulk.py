@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+import pytest
+
+import pystatis
+from pystatis import cache
+from pystatis.table import Table
+
+
+def test_fetch_tables(mocker):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    get_data = mocker.patch.object(Table, "get_data")
+
+    results = pystatis.fetch_tables(["12211-0001", "1000A-0000", "12211-0001"], language="en")
+
+    assert list(results) == ["12211-0001", "1000A-0000"]
+    assert all(isinstance(table, Table) for table in results.values())
+    assert get_data.call_count == 2
+    get_data.assert_called_with(language="en")
+
+
+def test_fetch_tables_returns_errors_per_table(mocker):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+
+    def get_data(self, **kwargs):
+        if self.name == "12211-0001":
+            raise ValueError("broken table")
+
+    mocker.patch.object(Table, "get_data", get_data)
+
+    results = pystatis.fetch_tables(["12211-0001", "1000A-0000", "unknown"])
+
+    assert isinstance(results["12211-0001"], ValueError)
+    assert isinstance(results["1000A-0000"], Table)
+    assert isinstance(results["unknown"], ValueError)
+
+
+def test_fetch_tables_limits_parallel_tables_per_db(mocker):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    mocker.patch("pystatis.config.get_max_parallel_tables", return_value=2)
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def get_data(self, **kwargs):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+
+    mocker.patch.object(Table, "get_data", get_data)
+
+    names = [f"12211-000{i}" for i in range(6)]
+    results = pystatis.fetch_tables(names, workers=6)
+
+    assert all(isinstance(table, Table) for table in results.values())
+    assert max_running == 2
+
+
+def test_fetch_tables_invalid_workers():
+    with pytest.raises(ValueError):
+        pystatis.fetch_tables(["12211-0001"], workers=0)
+
+
+@pytest.fixture()
+def metadata(mocker):
+    """Answer metadata requests with the "Updated" time of every table."""
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    updated = {"12211-0001": "28.12.2022 09:26:09h", "1000A-0000": "04.09.2023 17:35:44h"}
+
+    def get_data_from_endpoint(endpoint, method, params, db_name):
+        content = json.dumps({"Object": {"Updated": updated[params["name"]]}}).encode()
+        return mocker.Mock(content=content)
+
+    return mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint", side_effect=get_data_from_endpoint
+    )
+
+
+def test_check_updates_since(metadata):
+    results = pystatis.check_updates(["12211-0001", "1000A-0000", "unknown"], since="01.01.2023")
+
+    assert results["12211-0001"] is False
+    assert results["1000A-0000"] is True
+    assert isinstance(results["unknown"], ValueError)
+    assert metadata.call_count == 2
+
+
+def test_check_updates_since_cached(metadata, mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    cache.cache_data(str(tmp_path), "12211-0001", {"name": "12211-0001"}, b"data", "csv")
+
+    results = pystatis.check_updates(["12211-0001", "1000A-0000"])
+
+    assert results == {"12211-0001": False, "1000A-0000": True}
+
+
+def test_check_updates_invalid_since():
+    with pytest.raises(ValueError):
+        pystatis.check_updates(["12211-0001"], since="2023-01-01")
@@ -1,16 +1,33 @@
+import json
+import os
 import shutil
+import threading
+import time
 from configparser import RawConfigParser
 from pathlib import Path
 
+import pandas as pd
 import pytest
 
-from pystatis import config
+from pystatis import config, manifest
 from pystatis.cache import (
+    EvictionPolicy,
+    MemoryCache,
     _build_file_path,
+    _get_legacy_cache_key,
+    _serialize_params,
     cache_data,
+    cache_frame,
+    cache_stream,
+    canonicalize_params,
     clear_cache,
+    file_lock,
+    gc,
+    get_cache_key,
     hit_in_cash,
+    migrate_cache_keys,
     normalize_name,
+    read_frame,
     read_from_cache,
 )
 
@@ -72,6 +89,36 @@ def test_read_from_cache(cache_dir, params):
     assert data == test_data
 
 
+def test_cache_stream(cache_dir, params):
+    chunks = [b"first chunk;", b"second chunk;", b"last chunk"]
+    assert cache_stream(cache_dir, "test-cache-stream", params, iter(chunks), "csv")
+
+    data_dir = _build_file_path(cache_dir, "test-cache-stream", params)
+
+    assert len(list(data_dir.glob("*.zip"))) == 1
+    assert not list(data_dir.parent.glob("*.part"))
+    assert read_from_cache(cache_dir, "test-cache-stream", params) == b"".join(chunks)
+
+
+def test_cache_stream_not_cacheable(cache_dir, params):
+    assert not cache_stream(cache_dir, None, params, [b"test"], "csv")
+    assert not cache_stream(cache_dir, "test-cache-stream", params, [b"{}"], "json")
+    assert not hit_in_cash(cache_dir, "test-cache-stream", params)
+
+
+def test_cache_stream_failure_leaves_no_version(cache_dir, params):
+    def chunks():
+        yield b"first chunk"
+        raise ConnectionError("connection lost")
+
+    with pytest.raises(ConnectionError):
+        cache_stream(cache_dir, "test-cache-stream-failure", params, chunks(), "csv")
+
+    data_dir = _build_file_path(cache_dir, "test-cache-stream-failure", params)
+    assert not hit_in_cash(cache_dir, "test-cache-stream-failure", params)
+    assert not list(data_dir.parent.glob("*.part"))
+
+
 def test_hit_cache(cache_dir, params):
     assert not hit_in_cash(cache_dir, "test-hit-cache", params)
     cache_data(cache_dir, "test-hit-cache", params, "test".encode(), "csv")
@@ -108,6 +155,67 @@ def test_ignore_jobs_in_params(cache_dir, params):
     assert hit_in_cash(cache_dir, name, params_)
 
 
+def test_equivalent_params_share_cache_key():
+    params = {
+        "name": "12411-0001",
+        "regionalkey": "05,01, 03",
+        "startyear": "2020",
+        "area": "all",
+        "language": "de",
+        "job": "true",
+    }
+    equivalent = {
+        "startyear": " 2020",
+        "regionalkey": "01,03,05",
+        "name": "12411-0001",
+        "endyear": "",
+        "quality": "OFF",
+    }
+
+    assert canonicalize_params(params) == {
+        "name": "12411-0001",
+        "regionalkey": "01,03,05",
+        "startyear": "2020",
+    }
+    assert get_cache_key("12411-0001", params) == get_cache_key("12411-0001", equivalent)
+    assert get_cache_key("12411-0001", params) != get_cache_key(
+        "12411-0001", {**params, "language": "en"}
+    )
+
+
+def test_migrate_cache_keys(tmp_path, params):
+    cache_dir = str(tmp_path)
+    name = "test-migrate-keys"
+    params_ = {**params, "name": name, "language": "de"}
+    cache_data(cache_dir, name, params_, b"test", "csv")
+
+    # move the version to its key before the params were canonicalized
+    entry = manifest.get_latest_entry(cache_dir, get_cache_key(name, params_))
+    legacy_key = _get_legacy_cache_key(name, params_)
+    (tmp_path / entry.key).rename(tmp_path / legacy_key)
+    manifest.remove_entries(cache_dir)
+    entry.key, entry.params = legacy_key, json.dumps(params_)
+    manifest.add_entry(cache_dir, entry)
+    manifest.set_key_version(cache_dir, 0)
+
+    assert migrate_cache_keys(cache_dir) == 1
+    assert manifest.get_key_version(cache_dir) == 1
+    assert not (tmp_path / legacy_key).exists()
+    assert read_from_cache(cache_dir, name, {"name": name}) == b"test"
+
+
+def test_read_from_cache_moves_unindexed_legacy_directory(tmp_path, params):
+    cache_dir = str(tmp_path)
+    name = "test-legacy-key"
+    cache_data(cache_dir, name, params, b"test", "csv")
+    (tmp_path / get_cache_key(name, params)).rename(tmp_path / _get_legacy_cache_key(name, params))
+    (tmp_path / manifest.MANIFEST_FILE).unlink()
+
+    assert hit_in_cash(cache_dir, name, params)
+    assert read_from_cache(cache_dir, name, params) == b"test"
+    assert _build_file_path(cache_dir, name, params).is_dir()
+
+
 def test_clean_cache(cache_dir, params):
     name = "test-clean-cache"
     cache_data(cache_dir, name, params, "test".encode(), "csv")
@@ -120,3 +228,283 @@ def test_clean_cache(cache_dir, params):
     clear_cache(name=name)
 
     assert not cached_data_file.exists() and not cached_data_file.is_file()
+    assert not hit_in_cash(cache_dir, name, params)
+
+
+def test_cache_data_is_indexed(cache_dir, params):
+    name = "test-cache-index"
+    cache_data(cache_dir, name, params, b"test", "csv")
+
+    entry = manifest.get_latest_entry(cache_dir, get_cache_key(name, params))
+
+    assert entry is not None
+    assert entry.name == name
+    assert entry.content_type == "csv"
+    assert (
+        _build_file_path(cache_dir, name, params) / entry.file_name
+    ).stat().st_size == entry.size
+
+
+def test_read_from_cache_indexes_legacy_versions(cache_dir, params):
+    name = "test-legacy-cache"
+    cache_data(cache_dir, name, params, b"old", "csv")
+    data_dir = _build_file_path(cache_dir, name, params)
+    old_version = next(data_dir.glob("*.zip"))
+    old_version.rename(data_dir / "20000101.zip")
+    shutil.copy(data_dir / "20000101.zip", data_dir / "20100101.zip")
+    (Path(cache_dir) / manifest.MANIFEST_FILE).unlink()
+
+    assert hit_in_cash(cache_dir, name, params)
+    assert read_from_cache(cache_dir, name, params) == b"old"
+    assert manifest.get_latest_entry(cache_dir, get_cache_key(name, params)).version == "20100101"
+
+
+def test_manifest_connection_is_reused(cache_dir, params, mocker):
+    name = "test-manifest-connection"
+    cache_data(cache_dir, name, params, b"test", "csv")
+    connect = mocker.spy(manifest.sqlite3, "connect")
+
+    assert hit_in_cash(cache_dir, name, params)
+    assert read_from_cache(cache_dir, name, params) == b"test"
+    connect.assert_not_called()
+
+    # a deleted index is created again
+    (Path(cache_dir) / manifest.MANIFEST_FILE).unlink()
+    assert read_from_cache(cache_dir, name, params) == b"test"
+    connect.assert_called_once()
+
+
+def test_read_from_cache_skips_deleted_versions(cache_dir, params):
+    name = "test-deleted-version"
+    key = get_cache_key(name, params)
+    cache_data(cache_dir, name, params, b"test", "csv")
+    entry = manifest.get_latest_entry(cache_dir, key)
+    entry.version = "99991231"
+    entry.file_name = "99991231.zip"
+    manifest.add_entry(cache_dir, entry)
+
+    assert read_from_cache(cache_dir, name, params) == b"test"
+    assert manifest.get_latest_entry(cache_dir, key).version != "99991231"
+
+
+def _cache_version(cache_dir, name, params, version, size=0, created=0.0):
+    """Add a fake version of a data request to the cache and its index."""
+    data_dir = _build_file_path(cache_dir, name, params)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / f"{version}.zip").write_bytes(b"x" * size)
+    manifest.add_entry(
+        cache_dir,
+        manifest.Entry(
+            key=get_cache_key(name, params),
+            version=version,
+            name=name,
+            params=_serialize_params(params),
+            file_name=f"{version}.zip",
+            content_type="csv",
+            size=size,
+            checksum=None,
+            created=created,
+            last_access=created,
+        ),
+    )
+
+
+def test_gc_keeps_max_versions(cache_dir, params):
+    for version in ["20240101", "20240201", "20240301"]:
+        _cache_version(cache_dir, "test-gc-versions", params, version)
+
+    assert gc(EvictionPolicy(max_versions=2)) == 1
+
+    data_dir = _build_file_path(cache_dir, "test-gc-versions", params)
+    assert sorted(path.stem for path in data_dir.glob("*")) == ["20240201", "20240301"]
+
+
+def test_gc_removes_expired_versions(cache_dir, params):
+    _cache_version(cache_dir, "test-gc-ttl", params, "20240101", created=0.0)
+
+    assert gc(EvictionPolicy(ttl=30)) == 1
+
+    assert not hit_in_cash(cache_dir, "test-gc-ttl", params)
+    assert not (Path(cache_dir) / "test-gc-ttl").exists()
+
+
+def test_gc_indexes_versions_cached_before_the_index(cache_dir, params):
+    # the layout of caches written before the index existed, next to the job state
+    data_dir = Path(cache_dir) / "test-gc-legacy" / "0123456789abcdef0123"
+    data_dir.mkdir(parents=True)
+    (data_dir / "20000101.zip").write_bytes(b"x" * 20 * 1024)
+    (Path(cache_dir) / ".jobs").mkdir()
+    (Path(cache_dir) / ".jobs" / "journal.json").write_text("{}")
+
+    assert gc(EvictionPolicy(max_size=0.01)) == 1
+
+    assert not (Path(cache_dir) / "test-gc-legacy").exists()
+    assert manifest.get_entries(cache_dir) == []
+    assert (Path(cache_dir) / ".jobs" / "journal.json").exists()
+
+
+@pytest.mark.parametrize("strategy, expected", [("lru", "test-gc-b"), ("lfu", "test-gc-a")])
+def test_gc_limits_size(cache_dir, params, strategy, expected):
+    megabyte = 1024 * 1024
+    _cache_version(cache_dir, "test-gc-a", params, "20240101", size=megabyte)
+    _cache_version(cache_dir, "test-gc-b", params, "20240101", size=megabyte)
+    # a is read more often, b more recently
+    manifest.touch(cache_dir, get_cache_key("test-gc-a", params), "20240101")
+    manifest.touch(cache_dir, get_cache_key("test-gc-a", params), "20240101")
+    manifest.touch(cache_dir, get_cache_key("test-gc-b", params), "20240101")
+
+    assert gc(EvictionPolicy(max_size=1.5, strategy=strategy)) == 1
+
+    assert hit_in_cash(cache_dir, expected, params)
+
+
+def test_cache_data_evicts_old_versions(cache_dir, params, config_):
+    config_.set("data", "cache_max_versions", "1")
+    _cache_version(cache_dir, "test-evict-on-write", params, "20000101")
+
+    cache_data(cache_dir, "test-evict-on-write", params, b"new", "csv")
+
+    data_dir = _build_file_path(cache_dir, "test-evict-on-write", params)
+    assert len(list(data_dir.glob("*"))) == 1
+    assert read_from_cache(cache_dir, "test-evict-on-write", params) == b"new"
+
+
+@pytest.mark.parametrize("frame_format", ["parquet", "feather"])
+def test_cache_frame(cache_dir, params, frame_format):
+    pytest.importorskip("pyarrow")
+    name = "test-cache-frame"
+    frame = pd.DataFrame({"Jahr": ["2020", "2021"], "Wert": [1.5, None]})
+    _cache_version(cache_dir, name, params, "20240101")
+
+    assert read_frame(cache_dir, name, params, "pretty", frame_format) is None
+    assert cache_frame(cache_dir, name, params, "pretty", frame, frame_format)
+    pd.testing.assert_frame_equal(
+        read_frame(cache_dir, name, params, "pretty", frame_format), frame
+    )
+    assert read_frame(cache_dir, name, params, "raw", frame_format) is None
+
+    # a newer version of the raw data invalidates the data frame
+    parsed = manifest.get_latest_entry(cache_dir, get_cache_key(name, params))
+    _cache_version(cache_dir, name, params, "20240201")
+    assert read_frame(cache_dir, name, params, "pretty", frame_format) is None
+    assert not cache_frame(cache_dir, name, params, "pretty", frame, frame_format, parsed)
+    assert read_frame(cache_dir, name, params, "pretty", frame_format) is None
+
+    gc(EvictionPolicy(max_versions=1))
+    assert not list(_build_file_path(cache_dir, name, params).glob(f"*.{frame_format}"))
+
+
+@pytest.mark.parametrize("codec", ["deflate", "zstd", "lz4", "none"])
+def test_cache_codecs(cache_dir, params, config_, codec):
+    if codec in ("zstd", "lz4"):
+        pytest.importorskip({"zstd": "zstandard", "lz4": "lz4"}[codec])
+    name = "test-cache-codec"
+    config_.set("data", "cache_codec", codec)
+
+    cache_data(cache_dir, name, params, b"Statistik_Code;Statistik_Label\n" * 100, "csv")
+
+    entry = manifest.get_latest_entry(cache_dir, get_cache_key(name, params))
+    assert entry.codec == codec
+    assert read_from_cache(cache_dir, name, params) == b"Statistik_Code;Statistik_Label\n" * 100
+
+    # a lost index is rebuilt from the files of every codec
+    (Path(cache_dir) / manifest.MANIFEST_FILE).unlink()
+    assert read_from_cache(cache_dir, name, params) == b"Statistik_Code;Statistik_Label\n" * 100
+    assert manifest.get_latest_entry(cache_dir, get_cache_key(name, params)).codec == codec
+
+
+def test_switching_codec_replaces_version_of_the_day(cache_dir, params, config_):
+    name = "test-switch-codec"
+    cache_data(cache_dir, name, params, b"deflate", "csv")
+    config_.set("data", "cache_codec", "none")
+
+    cache_data(cache_dir, name, params, b"none", "csv")
+
+    assert [path.suffix for path in _build_file_path(cache_dir, name, params).glob("*")] == [".csv"]
+    assert read_from_cache(cache_dir, name, params) == b"none"
+
+
+def test_recaching_version_of_the_day_removes_its_frames(cache_dir, params):
+    pytest.importorskip("pyarrow")
+    name = "test-recache-frames"
+    cache_data(cache_dir, name, params, b"old", "csv")
+    cache_frame(cache_dir, name, params, "pretty", pd.DataFrame({"Wert": [1]}), "parquet")
+
+    cache_data(cache_dir, name, params, b"new", "csv")
+
+    assert read_frame(cache_dir, name, params, "pretty", "parquet") is None
+    entry = manifest.get_latest_entry(cache_dir, get_cache_key(name, params))
+    data_dir = _build_file_path(cache_dir, name, params)
+    assert [path.name for path in data_dir.iterdir()] == [entry.file_name]
+    assert entry.size == (data_dir / entry.file_name).stat().st_size
+
+
+def test_memory_cache_evicts_least_recently_used():
+    memory_cache = MemoryCache(max_size=10)
+    memory_cache.put(("dir", "a/1", "bytes"), b"aaaa")
+    memory_cache.put(("dir", "b/1", "bytes"), b"bbbb")
+    memory_cache.get(("dir", "a/1", "bytes"))
+
+    memory_cache.put(("dir", "c/1", "bytes"), b"cccc")
+    memory_cache.put(("dir", "d/1", "bytes"), b"d" * 11)
+
+    assert memory_cache.get(("dir", "a/1", "bytes")) == b"aaaa"
+    assert memory_cache.get(("dir", "b/1", "bytes")) is None
+    assert memory_cache.get(("dir", "d/1", "bytes")) is None
+    assert memory_cache.size == 8
+
+    memory_cache.discard("dir", "a")
+    assert memory_cache.get(("dir", "a/1", "bytes")) is None
+    assert memory_cache.size == 4
+
+
+def test_read_from_cache_uses_memory_cache(cache_dir, params, config_):
+    config_.set("data", "memory_cache", "1")
+    name = "test-memory-cache"
+    cache_data(cache_dir, name, params, b"test", "csv")
+    assert read_from_cache(cache_dir, name, params) == b"test"
+
+    # served from memory without touching the disk
+    shutil.rmtree(_build_file_path(cache_dir, name, params))
+    assert hit_in_cash(cache_dir, name, params)
+    assert read_from_cache(cache_dir, name, params) == b"test"
+
+    # a new version replaces the one in memory
+    cache_data(cache_dir, name, params, b"new", "csv")
+    assert read_from_cache(cache_dir, name, params) == b"new"
+
+    clear_cache(name)
+    assert not hit_in_cash(cache_dir, name, params)
+
+
+def test_file_lock_is_exclusive(cache_dir, params):
+    events = []
+
+    def hold_lock(label):
+        with file_lock(cache_dir, "abc-def", params, poll_interval=0.01):
+            events.append(f"{label} acquired")
+            time.sleep(0.05)
+            events.append(f"{label} released")
+
+    threads = [threading.Thread(target=hold_lock, args=(label,)) for label in "ab"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert events[0].endswith("acquired") and events[1].endswith("released")
+    assert events[2].endswith("acquired") and events[3].endswith("released")
+    assert not list(_build_file_path(cache_dir, "abc-def", params).parent.glob("*.lock"))
+
+
+def test_file_lock_removes_stale_lock(cache_dir, params):
+    data_dir = _build_file_path(cache_dir, "abc-def", params)
+    lock_file = data_dir.with_name(f"{data_dir.name}.lock")
+    lock_file.parent.mkdir(parents=True)
+    lock_file.touch()
+    os.utime(lock_file, (0, 0))
+
+    with file_lock(cache_dir, "abc-def", params, stale_after=60):
+        assert lock_file.read_text() == str(os.getpid())
+
+    assert not lock_file.exists()
@@ -0,0 +1,46 @@
+import pytest
+
+from pystatis import circuit
+from pystatis.circuit import CircuitBreaker
+from pystatis.exception import CircuitOpenError
+
+
+@pytest.fixture()
+def monotonic(mocker):
+    return mocker.patch("pystatis.circuit.time.monotonic", return_value=100.0)
+
+
+def test_circuit_opens_after_consecutive_failures(monotonic):
+    breaker = CircuitBreaker("genesis", failure_threshold=3, cooldown=60, probe=lambda: True)
+
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.before_request()
+
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_circuit_probes_after_cooldown(monotonic, mocker):
+    probe = mocker.Mock(side_effect=[False, True])
+    breaker = CircuitBreaker("genesis", failure_threshold=1, cooldown=60, probe=probe)
+    breaker.record_failure()
+
+    monotonic.return_value = 170.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.state == circuit.OPEN
+
+    # a failed probe starts another cooldown
+    monotonic.return_value = 200.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    probe.assert_called_once()
+
+    monotonic.return_value = 240.0
+    breaker.before_request()
+    assert breaker.is_closed
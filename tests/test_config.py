@@ -150,3 +150,24 @@ def test_supported_db():
     db = config.get_supported_db()
     assert isinstance(db, list)
     assert isinstance(db[0], str)
+
+
+def test_getters_fall_back_to_defaults(mocker):
+    # configs created by older versions lack the newer options
+    mocker.patch.object(config, "config", ConfigParser())
+
+    assert config.get_cache_codec() == (config.DEFAULT_CACHE_CODEC, None)
+    assert config.get_response_ttl("find") == config.DEFAULT_RESPONSE_TTL
+    assert config.get_retry_max_attempts() == config.DEFAULT_RETRY_MAX_ATTEMPTS
+    assert config.get_circuit_cooldown() == config.DEFAULT_CIRCUIT_COOLDOWN
+    assert not config.get_hedge_requests()
+    assert config.get_poll_jitter() == config.DEFAULT_POLL_JITTER
+
+
+def test_negative_response_ttl_disables_the_cache(mocker):
+    parser = ConfigParser()
+    parser.read_dict({"data": {"metadata_ttl": "-1", "cache_compresslevel": "3"}})
+    mocker.patch.object(config, "config", parser)
+
+    assert config.get_response_ttl("metadata") == 0
+    assert config.get_cache_codec() == (config.DEFAULT_CACHE_CODEC, 3)
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+import pytest
+
+from pystatis import hedging
+from pystatis.hedging import LatencyWindow
+
+
+@pytest.fixture()
+def hedge_requests(mocker):
+    parser = mocker.patch("pystatis.config.config")
+    parser.getboolean.return_value = True
+    parser.getfloat.side_effect = lambda section, option, fallback: fallback
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=10)
+    for latency in range(1, 21):
+        window.record(float(latency))
+
+    assert len(window) == 10
+    assert window.percentile(50) == 15
+    assert window.percentile(95) == 20
+
+
+def test_get_hedge_delay(hedge_requests):
+    assert hedging.get_hedge_delay("genesis", "find") is None
+
+    for latency in range(1, 101):
+        hedging.observe("genesis", "find", latency / 100)
+        hedging.observe("genesis", "data", latency / 100)
+
+    assert hedging.get_hedge_delay("genesis", "find") == 0.95
+    assert hedging.get_hedge_delay("genesis", "data") is None
+
+
+def test_get_hedge_delay_disabled_by_default():
+    for latency in range(1, 101):
+        hedging.observe("genesis", "find", latency / 100)
+
+    assert hedging.get_hedge_delay("genesis", "find") is None
+
+
+def test_hedge_uses_faster_response_and_cancels_slower():
+    release = threading.Event()
+    cancelled = threading.Event()
+    responses = iter(["slow", "fast"])
+
+    def send():
+        response = next(responses)
+        if response == "slow":
+            release.wait(5)
+        return response
+
+    def cancel(response):
+        assert response == "slow"
+        cancelled.set()
+
+    assert hedging.hedge(send, delay=0.01, cancel=cancel) == "fast"
+
+    release.set()
+    assert cancelled.wait(5)
+
+
+def test_hedge_does_not_hedge_fast_requests(mocker):
+    send = mocker.Mock(return_value="response")
+
+    assert hedging.hedge(send, delay=5, cancel=mocker.Mock()) == "response"
+    send.assert_called_once()
+
+
+def test_ahedge_cancels_slower_request():
+    cancelled = []
+    delays = iter([5, 0])
+
+    async def send():
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    async def run():
+        result = await hedging.ahedge(send, delay=0.01)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 0
+    assert cancelled == [5]
@@ -4,7 +4,7 @@ from tests.test_http_helper import _generic_request_status
 
 def test_whoami(mocker):
     mocker.patch(
-        "pystatis.helloworld.requests.get",
+        "pystatis.http_helper.requests.Session.get",
         return_value=_generic_request_status(),
     )
     mocker.patch("pystatis.db.get_host", return_value="genesis")
@@ -16,11 +16,11 @@ def test_whoami(mocker):
 
 def test_logincheck(mocker):
     mocker.patch(
-        "pystatis.helloworld.requests.get",
+        "pystatis.http_helper.requests.Session.get",
         return_value=_generic_request_status(),
     )
     mocker.patch(
-        "pystatis.helloworld.requests.post",
+        "pystatis.http_helper.requests.Session.post",
         return_value=_generic_request_status(),
     )
     mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
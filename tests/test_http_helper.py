@@ -1,17 +1,37 @@
+import asyncio
+import io
 import json
 import logging
+import threading
+import time
+from concurrent.futures import Future
 
 import pytest
 import requests
 
-from pystatis.exception import DestatisStatusError
+from pystatis import cache, jobs, throttle
+from pystatis.circuit import CircuitBreaker
+from pystatis.exception import (
+    CircuitOpenError,
+    DestatisStatusError,
+    NoNewerDataError,
+    RetryLimitExceededError,
+)
 from pystatis.http_helper import (
     JOB_TIMEOUT,
     _check_invalid_destatis_status_code,
     _check_invalid_status_code,
+    _get_destatis_status_code,
+    close_sessions,
+    get_async_client,
     get_data_from_endpoint,
     get_data_from_resultfile,
+    get_data_from_resultfile_async,
     get_job_id_from_response,
+    get_session,
+    load_data,
+    load_data_async,
+    revalidate,
 )
 
 
@@ -61,7 +81,9 @@ def test_get_response_from_endpoint(mocker):
     Test once with generic API response, more detailed tests
     of subfunctions and specific cases below.
     """
-    mocker.patch("pystatis.http_helper.requests.post", return_value=_generic_request_status())
+    mocker.patch(
+        "pystatis.http_helper.requests.Session.post", return_value=_generic_request_status()
+    )
     mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
     mocker.patch("pystatis.db.check_credentials_are_set", return_value=True)
 
@@ -72,6 +94,29 @@ def test_get_response_from_endpoint(mocker):
     assert response.status_code == 200
 
 
+def test_get_session_is_reused_per_db():
+    close_sessions()
+
+    session = get_session("genesis")
+
+    assert isinstance(session, requests.Session)
+    assert get_session("genesis") is session
+    assert get_session("regio") is not session
+
+    close_sessions()
+    assert get_session("genesis") is not session
+
+
+def test_get_session_pool_size(mocker):
+    close_sessions()
+    mocker.patch("pystatis.config.get_pool_maxsize", return_value=3)
+
+    adapter = get_session("zensus").get_adapter("https://")
+
+    assert adapter._pool_maxsize == 3
+    close_sessions()
+
+
 def test_check_invalid_status_code_with_error():
     """
     Basic tests to check an error status code (4xx, 5xx)
@@ -204,7 +249,370 @@ def test_get_data_from_resultfile_raises_timeout(mocker):
             "List": [],
         }
     ).encode("UTF-8")
-    mocker.patch("pystatis.http_helper.requests.post", return_value=in_progress_response)
+    mocker.patch("pystatis.http_helper.requests.Session.post", return_value=in_progress_response)
 
     with pytest.raises(TimeoutError):
         get_data_from_resultfile("42153-0001_001597503", {"name": "21111-0001"}, db_name="genesis")
+
+
+def test_get_data_from_resultfile_async_polls_without_blocking(mocker):
+    """The async job polling waits with asyncio.sleep and downloads the result once it is listed."""
+    httpx = pytest.importorskip("httpx")
+    mocker.patch("pystatis.db.get_settings", return_value=("https://host/", "user", "pw"))
+    sleep = mocker.patch("pystatis.http_helper.asyncio.sleep", new=mocker.AsyncMock())
+    blocking_sleep = mocker.patch("pystatis.http_helper.time.sleep")
+
+    job_id = "42153-0001_001597503"
+    results = [[], [{"Code": job_id}]]
+
+    def handler(request):
+        if request.url.path.endswith("catalogue/results"):
+            body = {"Status": {"Code": 0, "Type": "Information"}, "List": results.pop(0)}
+            return httpx.Response(200, json=body)
+        return httpx.Response(200, content=b"data", headers={"Content-Type": "text/csv"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    mocker.patch("pystatis.http_helper.get_async_client", return_value=client)
+
+    response = asyncio.run(
+        get_data_from_resultfile_async(job_id, {"name": "42153-0001"}, db_name="genesis")
+    )
+
+    assert response.content == b"data"
+    sleep.assert_awaited_once()
+    blocking_sleep.assert_not_called()
+
+
+def test_async_clients_are_closed_with_their_loop():
+    async def get_client():
+        return get_async_client("genesis")
+
+    client = asyncio.run(get_client())
+    other_client = asyncio.run(get_client())
+
+    assert client.is_closed
+    assert other_client.is_closed
+    assert other_client is not client
+
+
+def test_load_data_streams_into_cache(mocker, tmp_path):
+    """Data responses are streamed into the cache instead of being read into memory first."""
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    csv_data = b"statistics_code;value\n" + b"12211;1\n" * 1000
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "text/csv"
+    response.raw = io.BytesIO(csv_data)
+    post = mocker.patch("pystatis.http_helper.requests.Session.post", return_value=response)
+
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    data = load_data("data", "tablefile", params, db_name="genesis")
+
+    assert data == csv_data
+    assert post.call_args.kwargs["stream"] is True
+    assert response._content is False  # body was never read into memory as a whole
+    assert cache.hit_in_cash(str(tmp_path), "12211-0001", params)
+
+
+def test_streamed_response_holds_in_flight_slot_until_read(mocker):
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    mocker.patch("pystatis.config.get_rate_limit", return_value=0)
+    mocker.patch("pystatis.config.get_max_in_flight", return_value=1)
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "text/csv"
+    response.raw = io.BytesIO(b"statistics_code;value\n12211;1\n")
+    mocker.patch("pystatis.http_helper.requests.Session.post", return_value=response)
+
+    response = get_data_from_endpoint(
+        "data", "tablefile", {"name": "12211-0001"}, db_name="genesis", stream=True
+    )
+    semaphore = throttle.get_semaphore("genesis")
+    assert not semaphore.acquire(blocking=False)
+
+    assert b"".join(response.iter_content(chunk_size=8)) == b"statistics_code;value\n12211;1\n"
+    assert semaphore.acquire(blocking=False)
+
+
+def test_load_data_starts_job_right_away_for_known_large_request(mocker, tmp_path):
+    """Requests answered with status code 98 before skip the direct request."""
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    jobs.record_large_request(params)
+
+    future = Future()
+    future.set_result(b"data")
+    submit = mocker.patch.object(jobs.JobManager, "submit", return_value=future)
+    get_data = mocker.patch("pystatis.http_helper.get_data_from_endpoint")
+
+    assert load_data("data", "tablefile", params, db_name="genesis") == b"data"
+    submit.assert_called_once_with(params, "genesis")
+    get_data.assert_not_called()
+
+
+def test_load_data_starts_job_through_manager_on_status_98(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    large_response = _generic_request_status(code=98)
+    large_response.headers["Content-Type"] = "application/json"
+    close = mocker.spy(large_response, "close")
+    mocker.patch("pystatis.http_helper.get_data_from_endpoint", return_value=large_response)
+
+    # the job manager caches the data if the job request returns it directly
+    future = Future()
+    future.set_result(b"data")
+    submit = mocker.patch.object(jobs.JobManager, "submit", return_value=future)
+
+    assert load_data("data", "tablefile", params, db_name="genesis") == b"data"
+    submit.assert_called_once_with(params, "genesis")
+    close.assert_called_once()
+    assert jobs.is_large_request(params)
+
+
+def test_load_data_async_starts_job_through_manager_on_status_98(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    large_response = _generic_request_status(code=98)
+    large_response.headers["Content-Type"] = "application/json"
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint_async",
+        new=mocker.AsyncMock(return_value=large_response),
+    )
+    future = Future()
+    future.set_result(b"data")
+    submit = mocker.patch.object(jobs.JobManager, "submit", return_value=future)
+
+    assert asyncio.run(load_data_async("data", "tablefile", params, "genesis")) == b"data"
+    submit.assert_called_once_with(params, "genesis")
+
+    # the next request starts the job right away
+    assert asyncio.run(load_data_async("data", "tablefile", params, "genesis")) == b"data"
+    assert submit.call_count == 2
+    get_data.assert_awaited_once()
+
+
+def test_load_data_refresh_keeps_version_without_newer_data(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    cache.cache_data(str(tmp_path), "12211-0001", params, b"old", "csv")
+    get_data = mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint", side_effect=NoNewerDataError("50")
+    )
+
+    assert load_data("data", "tablefile", params, db_name="genesis", refresh=True) == b"old"
+    assert revalidate(params, "genesis").result(timeout=5) is False
+
+    assert get_data.call_args.args[2]["stand"]
+    entry = cache.get_latest_entry(str(tmp_path), "12211-0001", params)
+    assert entry.checked is not None
+    assert cache.read_from_cache(str(tmp_path), "12211-0001", params) == b"old"
+
+
+def test_revalidate_caches_newer_data(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    cache.cache_data(str(tmp_path), "12211-0001", params, b"old", "csv")
+
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = "text/csv"
+    response.raw = io.BytesIO(b"new")
+    mocker.patch("pystatis.http_helper.get_data_from_endpoint", return_value=response)
+
+    assert revalidate(params, "genesis").result(timeout=5) is True
+    assert cache.read_from_cache(str(tmp_path), "12211-0001", params) == b"new"
+
+
+def test_revalidate_starts_job_for_large_newer_data(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    cache.cache_data(str(tmp_path), "12211-0001", params, b"old", "csv")
+
+    large_response = _generic_request_status(code=98)
+    large_response.headers["Content-Type"] = "application/json"
+    mocker.patch("pystatis.http_helper.get_data_from_endpoint", return_value=large_response)
+    job_response = _generic_request_status(
+        status_content="Der Bearbeitungsauftrag wurde erstellt: 12211-0001_123456789"
+    )
+    job_response.headers["Content-Type"] = "application/json"
+    start_job = mocker.patch("pystatis.http_helper.start_job", return_value=job_response)
+
+    def watch(job_id, params_, db_name):
+        cache.cache_data(str(tmp_path), "12211-0001", params_, b"new", "csv")
+        future = Future()
+        future.set_result(b"new")
+        return future
+
+    watch = mocker.patch.object(jobs.JobManager, "watch", side_effect=watch)
+
+    assert revalidate(params, "genesis").result(timeout=5) is True
+    job_params = start_job.call_args.args[2]
+    assert job_params == {**params, "stand": job_params["stand"]}
+    assert watch.call_args.args[0] == "12211-0001_123456789"
+    assert watch.call_args.args[1] == params
+    assert cache.read_from_cache(str(tmp_path), "12211-0001", params) == b"new"
+
+
+def test_revalidate_large_data_without_newer_data_starts_no_job(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    cache.cache_data(str(tmp_path), "12211-0001", params, b"old", "csv")
+
+    # the server checks the size before `stand`
+    large_response = _generic_request_status(code=98)
+    large_response.headers["Content-Type"] = "application/json"
+    mocker.patch("pystatis.http_helper.get_data_from_endpoint", return_value=large_response)
+    start_job = mocker.patch("pystatis.http_helper.start_job", side_effect=NoNewerDataError("50"))
+    watch = mocker.patch.object(jobs.JobManager, "watch")
+
+    assert revalidate(params, "genesis").result(timeout=5) is False
+    assert start_job.call_args.args[2]["stand"]
+    watch.assert_not_called()
+    assert cache.get_latest_entry(str(tmp_path), "12211-0001", params).checked is not None
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        ("text/csv", b"statistics_code;value\n12211;1\n"),
+        ("", b"statistics_code;value\n12211;1\n"),
+        ("application/zip", b"PK\x03\x04"),
+    ],
+)
+def test_data_responses_are_never_json_decoded(mocker, content_type, body):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    json_ = mocker.spy(response, "json")
+
+    _check_invalid_destatis_status_code(response)
+
+    assert _get_destatis_status_code(response) == 200
+    json_.assert_not_called()
+
+
+def test_json_responses_are_decoded_once(mocker):
+    response = _generic_request_status(code=98, status_type="Warnung")
+    response.headers["Content-Type"] = "application/json"
+    json_ = mocker.spy(response, "json")
+
+    _check_invalid_destatis_status_code(response)
+
+    assert _get_destatis_status_code(response) == 98
+    assert get_job_id_from_response(response) == ""
+    json_.assert_called_once()
+
+
+def test_get_data_from_endpoint_retries_transient_errors(mocker):
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    sleep = mocker.patch("pystatis.http_helper.time.sleep")
+    unavailable = _generic_request_status(status_code=503)
+    unavailable.headers["Retry-After"] = "7"
+    unavailable.raw = io.BytesIO()
+    post = mocker.patch(
+        "pystatis.http_helper.requests.Session.post",
+        side_effect=[
+            requests.exceptions.ConnectionError("connection reset"),
+            unavailable,
+            _generic_request_status(),
+        ],
+    )
+
+    response = get_data_from_endpoint("data", "tablefile", {"name": "12211-0001"}, "genesis")
+
+    assert response.status_code == 200
+    assert post.call_count == 3
+    assert 1 <= sleep.call_args_list[0].args[0] <= 2
+    assert sleep.call_args_list[1].args[0] == 7
+
+
+def test_get_data_from_endpoint_raises_when_retries_run_out(mocker):
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    mocker.patch("pystatis.http_helper.time.sleep")
+    post = mocker.patch(
+        "pystatis.http_helper.requests.Session.post",
+        side_effect=requests.exceptions.ReadTimeout("read timed out"),
+    )
+
+    with pytest.raises(RetryLimitExceededError):
+        get_data_from_endpoint("data", "tablefile", {"name": "12211-0001"}, "genesis")
+
+    assert post.call_count == 4
+
+
+def test_job_start_is_not_retried_after_read_timeout(mocker):
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    mocker.patch("pystatis.http_helper.time.sleep")
+    post = mocker.patch(
+        "pystatis.http_helper.requests.Session.post",
+        side_effect=[
+            requests.exceptions.ConnectTimeout("connect timed out"),
+            requests.exceptions.ReadTimeout("read timed out"),
+        ],
+    )
+
+    # the job may have been started before the response timed out
+    with pytest.raises(RetryLimitExceededError, match="not retried"):
+        get_data_from_endpoint(
+            "data", "tablefile", {"name": "12211-0001", "job": "true"}, "genesis"
+        )
+
+    assert post.call_count == 2
+
+
+def test_get_data_from_endpoint_fails_fast_while_circuit_is_open(mocker):
+    mocker.patch("pystatis.db.get_settings", return_value=("host", "user", "pw"))
+    mocker.patch("pystatis.http_helper.time.sleep")
+    mocker.patch(
+        "pystatis.circuit.get_circuit_breaker",
+        return_value=CircuitBreaker(
+            "genesis", failure_threshold=2, cooldown=60, probe=lambda: True
+        ),
+    )
+    post = mocker.patch(
+        "pystatis.http_helper.requests.Session.post",
+        side_effect=requests.exceptions.ConnectionError("connection refused"),
+    )
+
+    with pytest.raises(CircuitOpenError):
+        get_data_from_endpoint("data", "tablefile", {"name": "12211-0001"}, "genesis")
+    with pytest.raises(CircuitOpenError):
+        get_data_from_endpoint("data", "tablefile", {"name": "12211-0001"}, "genesis")
+
+    assert post.call_count == 2
+
+
+def test_load_data_downloads_identical_concurrent_requests_once(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    started = threading.Event()
+    release = threading.Event()
+
+    def download(*args):
+        started.set()
+        release.wait(5)
+        return b"data"
+
+    download_data = mocker.patch("pystatis.http_helper._download_data", side_effect=download)
+    params = {"name": "12211-0001", "format": "ffcsv"}
+    results = []
+
+    def request():
+        results.append(load_data("data", "tablefile", params, db_name="genesis"))
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # give the other threads time to join the running download
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b"data"] * 4
+    download_data.assert_called_once()
@@ -0,0 +1,171 @@
+import json
+
+import pytest
+import requests
+
+from pystatis import cache
+from pystatis import jobs
+from pystatis.jobs import JobManager, PollingStrategy
+
+
+def _response(body: bytes, content_type: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+def _json_response(body: dict) -> requests.Response:
+    return _response(json.dumps(body).encode("UTF-8"), "application/json")
+
+
+@pytest.fixture()
+def cache_dir(mocker, tmp_path):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture()
+def destatis(mocker):
+    """Fake Destatis API: every job is finished after the second result list request."""
+    calls = []
+
+    def get_data_from_endpoint(endpoint, method, params, db_name=None, stream=False):
+        calls.append((endpoint, method, dict(params)))
+        name = params.get("name", "")
+        if method == "tablefile":
+            content = f"Die Tabelle kann abgerufen werden: {name}_000001"
+            return _json_response({"Status": {"Code": 99, "Content": content}})
+        if method == "results":
+            polls = sum(1 for call in calls if call[1] == "results")
+            started = [call[2]["name"] for call in calls if call[1] == "tablefile"]
+            finished = [{"Code": f"{name}_000001"} for name in started]
+            return _json_response({"List": finished if polls > 1 else []})
+        return _response(f"data of {name}".encode(), "text/csv")
+
+    mocker.patch("pystatis.http_helper.get_data_from_endpoint", side_effect=get_data_from_endpoint)
+    return calls
+
+
+def test_job_manager_polls_all_jobs_together(cache_dir, destatis):
+    names = ["12411-0001", "12411-0002", "12411-0003"]
+
+    with JobManager(polling=PollingStrategy(initial_delay=0.2, jitter=0), max_workers=3) as manager:
+        futures = [manager.submit({"name": name}, db_name="genesis") for name in names]
+        data = [future.result(timeout=5) for future in futures]
+
+    assert data == [f"data of {name}_000001".encode() for name in names]
+
+    polls = [params for _, method, params in destatis if method == "results"]
+    assert len(polls) == 2
+    assert all(params["selection"] == "*" for params in polls)
+
+    for name in names:
+        assert cache.hit_in_cash(cache_dir, name, {"name": name})
+
+
+def test_job_manager_serves_cached_data(cache_dir, destatis):
+    cache.cache_data(cache_dir, "12411-0001", {"name": "12411-0001"}, b"cached", "csv")
+
+    with JobManager() as manager:
+        assert manager.submit({"name": "12411-0001"}, db_name="genesis").result() == b"cached"
+
+    assert destatis == []
+
+
+def test_job_manager_timeout(cache_dir, mocker):
+    mocker.patch(
+        "pystatis.http_helper.get_data_from_endpoint",
+        return_value=_json_response({"List": []}),
+    )
+
+    with JobManager(polling=PollingStrategy(initial_delay=0.01), timeout=0.05) as manager:
+        future = manager.watch("12411-0001_000001", {"name": "12411-0001"}, db_name="genesis")
+
+        with pytest.raises(TimeoutError):
+            future.result(timeout=5)
+
+
+def test_polling_strategy_backs_off():
+    strategy = PollingStrategy(initial_delay=2, factor=2, max_delay=10, jitter=0)
+
+    delays = strategy.delays()
+
+    assert [next(delays) for _ in range(5)] == [2, 4, 8, 10, 10]
+
+
+def test_polling_strategy_jitter():
+    strategy = PollingStrategy(initial_delay=10, jitter=0.1)
+
+    first_delays = {next(strategy.delays()) for _ in range(20)}
+
+    assert len(first_delays) > 1
+    assert all(9 <= delay <= 11 for delay in first_delays)
+
+
+def test_estimate_initial_delay_from_history(cache_dir):
+    strategy = PollingStrategy(initial_delay=5)
+    assert jobs.estimate_initial_delay("12411-0001", strategy) == 5
+
+    for duration in [100, 120, 200]:
+        jobs.record_job_duration("12411-0001", duration)
+
+    assert jobs.estimate_initial_delay("12411-0001", strategy) == pytest.approx(96)
+    assert jobs.estimate_initial_delay("12411-0002", strategy) == 5
+
+
+def test_job_manager_journals_pending_jobs(cache_dir, destatis, mocker):
+    journal_job = mocker.spy(jobs, "journal_job")
+
+    with JobManager(polling=PollingStrategy(initial_delay=0.01, jitter=0)) as manager:
+        assert manager.submit({"name": "12411-0001"}, db_name="genesis").result(timeout=5)
+
+    journal_job.assert_called_once_with("12411-0001_000001", {"name": "12411-0001"}, "genesis")
+    assert jobs.get_journaled_job({"name": "12411-0001"}) is None
+    assert jobs.is_large_request({"name": "12411-0001"})
+
+
+def test_job_manager_resumes_journaled_job(cache_dir, destatis):
+    # the job was started by an earlier process
+    destatis.append(("data", "tablefile", {"name": "12411-0001"}))
+    jobs.journal_job("12411-0001_000001", {"name": "12411-0001"}, "genesis")
+
+    with JobManager(polling=PollingStrategy(initial_delay=0.01, jitter=0)) as manager:
+        future = manager.submit({"name": "12411-0001"}, db_name="genesis")
+
+        assert future.result(timeout=5) == b"data of 12411-0001_000001"
+
+    assert [method for _, method, _ in destatis].count("tablefile") == 1
+    assert jobs.get_journaled_job({"name": "12411-0001"}) is None
+
+
+def test_job_manager_reuses_finished_result(cache_dir, destatis):
+    with JobManager(polling=PollingStrategy(initial_delay=0.01, jitter=0)) as manager:
+        manager.submit({"name": "12411-0001"}, db_name="genesis").result(timeout=5)
+        cache.clear_cache("12411-0001")
+        destatis.clear()
+        # the job finished in the earlier run
+        destatis.append(("data", "tablefile", {"name": "12411-0001"}))
+        destatis.append(("catalogue", "results", {}))
+
+        data = manager.submit({"name": "12411-0001"}, db_name="genesis").result(timeout=5)
+
+    assert data == b"data of 12411-0001_000001"
+    assert [method for _, method, _ in destatis] == [
+        "tablefile",
+        "results",
+        "results",
+        "resultfile",
+    ]
+
+
+def test_job_manager_starts_new_job_if_result_is_gone(cache_dir, destatis):
+    jobs.journal_job("12411-0001_000001", {"name": "12411-0001"}, "genesis")
+    jobs.mark_job_finished({"name": "12411-0001"})
+
+    with JobManager(polling=PollingStrategy(initial_delay=0.01, jitter=0)) as manager:
+        assert manager.submit({"name": "12411-0001"}, db_name="genesis").result(timeout=5)
+
+    assert [method for _, method, _ in destatis].count("tablefile") == 1
@@ -0,0 +1,66 @@
+import json
+import time
+
+from pystatis import response_cache
+from pystatis.http_helper import load_data
+
+
+def test_cache_response(tmp_path):
+    cache_dir = str(tmp_path)
+    params = {"name": "12411-0001", "area": "all"}
+
+    assert response_cache.read_response(cache_dir, "metadata", "table", params, "genesis") is None
+    assert response_cache.cache_response(
+        cache_dir, "metadata", "table", params, "genesis", b'{"Object": {}}'
+    )
+
+    # equivalent params share the cached response, other databases do not
+    assert (
+        response_cache.read_response(
+            cache_dir, "metadata", "table", {"area": " ALL ", "name": "12411-0001"}, "genesis"
+        )
+        == b'{"Object": {}}'
+    )
+    assert response_cache.read_response(cache_dir, "metadata", "table", params, "regio") is None
+
+
+def test_data_defaults_are_kept_in_keys(tmp_path):
+    cache_dir = str(tmp_path)
+    params = {"term": "bevoelkerung", "language": "de", "area": "all"}
+    response_cache.cache_response(cache_dir, "find", "find", params, "genesis", b"{}")
+
+    assert response_cache.read_response(cache_dir, "find", "find", params, "genesis") == b"{}"
+    assert (
+        response_cache.read_response(cache_dir, "find", "find", {"term": "bevoelkerung"}, "genesis")
+        is None
+    )
+
+
+def test_expired_response_is_not_read(tmp_path, mocker):
+    cache_dir = str(tmp_path)
+    params = {"term": "bevoelkerung", "category": "tables"}
+    response_cache.cache_response(cache_dir, "find", "find", params, "genesis", b"{}")
+
+    mocker.patch("pystatis.response_cache.time.time", return_value=time.time() + 25 * 60 * 60)
+
+    assert response_cache.read_response(cache_dir, "find", "find", params, "genesis") is None
+
+
+def test_user_state_is_never_cached(tmp_path):
+    assert response_cache.get_ttl("catalogue", "results") == 0
+    assert response_cache.get_ttl("data", "tablefile") == 0
+    assert not response_cache.cache_response(
+        str(tmp_path), "catalogue", "results", {"selection": "*"}, "genesis", b"{}"
+    )
+
+
+def test_load_data_caches_metadata(tmp_path, mocker):
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    response = mocker.Mock(content=json.dumps({"Object": {"Code": "12411-0001"}}).encode())
+    get_data = mocker.patch("pystatis.http_helper.get_data_from_endpoint", return_value=response)
+
+    for _ in range(2):
+        data = load_data("metadata", "table", {"name": "12411-0001"}, db_name="genesis")
+
+    assert data == response.content
+    get_data.assert_called_once()
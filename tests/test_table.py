@@ -1,3 +1,5 @@
+import asyncio
+import json
 import logging
 import time
 
@@ -777,3 +779,139 @@ def test_get_data_with_job(mocker, caplog, table_name):
     assert "Verarbeitung im Hintergrund abgeschlossen" in caplog.text
 
     assert not table.data.empty
+
+
+@pytest.mark.vcr()
+@pytest.mark.parametrize(
+    "table_name, prettify",
+    [
+        ("12211-Z-11", True),
+        ("12211-Z-11", False),
+    ],
+)
+def test_get_data_from_frame_cache(mocker, table_name: str, prettify: bool):
+    pytest.importorskip("pyarrow")
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    mocker.patch.object(pystatis.config, "get_frame_cache", return_value="parquet")
+    table = pystatis.Table(name=table_name)
+    table.get_data(prettify=prettify, quality="on", compress=False)
+
+    load_data = mocker.patch(
+        "pystatis.table.load_data", return_value=json.dumps(table.metadata).encode()
+    )
+    cached_table = pystatis.Table(name=table_name)
+    cached_table.get_data(prettify=prettify, quality="on", compress=False)
+
+    # only the metadata is requested, the data frame is read from the frame cache
+    load_data.assert_called_once()
+    pd.testing.assert_frame_equal(cached_table.data, table.data)
+    assert cached_table.raw_data == table.raw_data
+
+
+@pytest.mark.vcr()
+@pytest.mark.parametrize("table_name", ["46181-0001"])
+def test_get_data_skips_cache_index_without_frame_cache(mocker, table_name: str):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    mocker.patch.object(pystatis.config, "get_frame_cache", return_value=None)
+    # the calls of the table, not those of `load_data`
+    cache = mocker.patch("pystatis.table.cache", wraps=pystatis.cache)
+
+    table = pystatis.Table(name=table_name)
+    table.get_data(prettify=False, compress=False)
+
+    assert not table.data.empty
+    cache.get_latest_entry.assert_not_called()
+    cache.is_latest_entry.assert_not_called()
+
+
+@pytest.mark.vcr()
+@pytest.mark.parametrize("table_name", ["46181-0001"])
+def test_get_data_from_memory_cache(mocker, table_name: str):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    getfloat = pystatis.config.config.getfloat
+    mocker.patch.object(
+        pystatis.config.config,
+        "getfloat",
+        side_effect=lambda section, option, **kwargs: (
+            10.0 if option == "memory_cache" else getfloat(section, option, **kwargs)
+        ),
+    )
+    table = pystatis.Table(name=table_name)
+    table.get_data(prettify=False, compress=False)
+    column = table.data.columns[0]
+    table.data[column] = None
+
+    load_data = mocker.patch(
+        "pystatis.table.load_data", return_value=json.dumps(table.metadata).encode()
+    )
+    read_from_cache = mocker.spy(pystatis.cache, "read_from_cache")
+    cached_table = pystatis.Table(name=table_name)
+    cached_table.get_data(prettify=False, compress=False)
+
+    # only the metadata is requested, the data frame is a copy of the one in memory
+    load_data.assert_called_once()
+    read_from_cache.assert_not_called()
+    assert cached_table.data[column].notna().all()
+
+
+def test_get_data_skips_frame_of_replaced_version(mocker, tmp_path):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    mocker.patch("pystatis.config.get_cache_dir", return_value=str(tmp_path))
+    memory_cache = pystatis.cache.MemoryCache(max_size=10 * 1024 * 1024)
+    mocker.patch("pystatis.cache._memory_cache", memory_cache)
+    mocker.patch("pystatis.cache.get_memory_cache", return_value=memory_cache)
+    mocker.patch.object(
+        pystatis.Table,
+        "_set_data",
+        lambda self, raw_data_bytes, *args: setattr(
+            self, "data", pd.DataFrame({"raw": [raw_data_bytes]})
+        ),
+    )
+    requests = []
+
+    def load_data(endpoint, method, params, db_name=None, refresh=False):
+        if endpoint == "metadata":
+            return b"{}"
+
+        requests.append(params)
+        if len(requests) == 1:
+            pystatis.cache.cache_data(str(tmp_path), "12211-0001", params, b"old", "csv")
+            return b"old"
+
+        data = pystatis.cache.read_from_cache(str(tmp_path), "12211-0001", params)
+        # a revalidation caches a newer version while the old one is parsed
+        pystatis.cache.cache_data(str(tmp_path), "12211-0001", params, b"new", "csv")
+        return data
+
+    mocker.patch("pystatis.table.load_data", side_effect=load_data)
+    pystatis.Table(name="12211-0001").get_data()
+    memory_cache.clear()
+
+    table = pystatis.Table(name="12211-0001")
+    table.get_data(refresh=True)
+
+    assert table.data["raw"][0] == b"old"
+    key = pystatis.cache.get_cache_key("12211-0001", requests[-1])
+    assert memory_cache.get((str(tmp_path), key, "pretty")) is None
+
+
+@pytest.mark.vcr()
+@pytest.mark.parametrize(
+    "table_name, expected_shape",
+    [
+        ("12211-0001", (225, 21)),
+        ("1000A-0000", (10787, 13)),
+    ],
+)
+def test_aget_data(mocker, table_name: str, expected_shape: tuple[int, int]):
+    mocker.patch.object(pystatis.db, "check_credentials_are_set", return_value=True)
+    table = pystatis.Table(name=table_name)
+
+    async def aget_data():
+        await table.aget_data(prettify=False, compress=False)
+        await pystatis.http_helper.close_async_clients()
+
+    asyncio.run(aget_data())
+
+    assert table.data.shape == expected_shape
+    assert table.metadata["Object"]["Code"] == table_name
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from pystatis import throttle
+from pystatis.throttle import AdaptiveLimit, TokenBucket
+
+
+def test_token_bucket_lines_up_requests(mocker):
+    mocker.patch("pystatis.throttle.time.monotonic", return_value=100.0)
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+
+def test_token_bucket_without_limit():
+    bucket = TokenBucket(rate=0, capacity=1)
+
+    assert all(bucket.reserve() == 0 for _ in range(10))
+
+
+def test_throttle_limits_requests_in_flight(mocker):
+    mocker.patch("pystatis.config.get_rate_limit", return_value=0)
+    mocker.patch("pystatis.config.get_max_in_flight", return_value=2)
+    in_flight = []
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def request():
+        nonlocal max_in_flight
+        with throttle.throttle("genesis"):
+            with lock:
+                in_flight.append(1)
+                max_in_flight = max(max_in_flight, len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_in_flight == 2
+
+
+@pytest.mark.parametrize("db_name, expected", [("genesis", 1.5), ("regio", 5.0)])
+def test_rate_limit_per_database(mocker, db_name, expected):
+    parser = mocker.patch("pystatis.config.config")
+    parser.getfloat.side_effect = lambda section, option, fallback: (
+        1.5 if section == "genesis" else fallback
+    )
+
+    assert throttle.get_token_bucket(db_name).rate == expected
+
+
+def test_adaptive_limit_increases_while_healthy():
+    adaptive_limit = AdaptiveLimit(initial=2, maximum=4)
+
+    for _ in range(20):
+        adaptive_limit.observe(0.5, healthy=True)
+
+    assert adaptive_limit.limit == 4
+
+
+def test_adaptive_limit_decreases_on_errors(mocker):
+    monotonic = mocker.patch("pystatis.throttle.time.monotonic", return_value=100.0)
+    adaptive_limit = AdaptiveLimit(initial=8, maximum=16)
+
+    adaptive_limit.observe(30, healthy=False)
+    assert adaptive_limit.limit == 4
+
+    # errors of the same burst do not decrease the limit again
+    adaptive_limit.observe(30, healthy=False)
+    assert adaptive_limit.limit == 4
+
+    monotonic.return_value = 110.0
+    adaptive_limit.observe(30, healthy=False)
+    assert adaptive_limit.limit == 2
+
+
+def test_adaptive_limit_decreases_on_slow_responses():
+    adaptive_limit = AdaptiveLimit(initial=8, maximum=16)
+    adaptive_limit.observe(1.0, healthy=True)
+
+    adaptive_limit.observe(10.0, healthy=True)
+
+    assert adaptive_limit.limit == 4
+
+
+def test_adaptive_limit_compares_latencies_per_kind():
+    adaptive_limit = AdaptiveLimit(initial=8, maximum=16)
+    adaptive_limit.observe(0.2, healthy=True, kind="metadata/table")
+    adaptive_limit.observe(60.0, healthy=True, kind="data/tablefile")
+
+    # a large download is only slow compared with other downloads
+    adaptive_limit.observe(90.0, healthy=True, kind="data/tablefile")
+    adaptive_limit.observe(0.3, healthy=True, kind="metadata/table")
+
+    assert adaptive_limit.limit == 8
+    assert set(adaptive_limit.latencies) == {"metadata/table", "data/tablefile"}